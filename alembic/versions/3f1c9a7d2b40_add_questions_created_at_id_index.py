@@ -0,0 +1,28 @@
+"""Add questions (created_at, id) index
+
+Revision ID: 3f1c9a7d2b40
+Revises: 778f075f72ef
+Create Date: 2026-10-18 10:12:31.402918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9a7d2b40'
+down_revision: Union[str, None] = '778f075f72ef'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_questions_created_at_id', 'questions', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_questions_created_at_id', table_name='questions')
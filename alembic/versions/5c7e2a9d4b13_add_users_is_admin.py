@@ -0,0 +1,28 @@
+"""Add users.is_admin for admin-only bulk import/export
+
+Revision ID: 5c7e2a9d4b13
+Revises: 9b3f6d2c1e80
+Create Date: 2026-10-18 22:05:31.204117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c7e2a9d4b13'
+down_revision: Union[str, None] = '9b3f6d2c1e80'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('is_admin', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'is_admin')
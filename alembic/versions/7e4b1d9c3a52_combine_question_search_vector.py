@@ -0,0 +1,118 @@
+"""Fold answer text into questions.search_vector and drop answers.search_vector
+
+Revision ID: 7e4b1d9c3a52
+Revises: 5c7e2a9d4b13
+Create Date: 2026-10-19 10:12:44.381920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e4b1d9c3a52'
+down_revision: Union[str, None] = '5c7e2a9d4b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# 질문 하나에 벡터 하나: 제목(A) + 본문(B) + 답변 본문 전체(D)
+# 검색은 이 컬럼 하나만 GIN 으로 찾고 순위를 매긴다 (search.py)
+QUESTION_VECTOR_FUNCTION = """
+    CREATE FUNCTION question_search_vector(question_id integer, title text, content text) RETURNS tsvector AS $$
+        SELECT setweight(to_tsvector('simple', coalesce(title, '')), 'A')
+            || setweight(to_tsvector('simple', coalesce(content, '')), 'B')
+            || setweight(to_tsvector('simple', coalesce(
+                (SELECT string_agg(a.content, ' ') FROM answers a WHERE a.question_id = $1), ''
+            )), 'D')
+    $$ LANGUAGE sql STABLE;
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS answers_search_vector_trigger ON answers")
+    op.execute("DROP FUNCTION IF EXISTS answers_search_vector_update()")
+    op.drop_index('ix_answers_search_vector', table_name='answers', postgresql_using='gin')
+    op.drop_column('answers', 'search_vector')
+
+    op.execute(QUESTION_VECTOR_FUNCTION)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION questions_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := question_search_vector(NEW.id, NEW.title, NEW.content);
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql;
+    """)
+    # 답변이 추가되면 벡터 끝에 붙이고, 수정/삭제되면 그 질문의 벡터를 다시 만든다
+    # (질문 트리거는 title/content 변경에만 걸려 있으므로 여기서의 UPDATE 로 다시 불리지 않는다)
+    op.execute("""
+        CREATE FUNCTION answers_question_vector_update() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                UPDATE questions
+                SET search_vector = coalesce(search_vector, ''::tsvector)
+                    || setweight(to_tsvector('simple', coalesce(NEW.content, '')), 'D')
+                WHERE id = NEW.question_id;
+                RETURN NEW;
+            END IF;
+            UPDATE questions
+            SET search_vector = question_search_vector(id, title, content)
+            WHERE id = OLD.question_id;
+            IF TG_OP = 'UPDATE' AND NEW.question_id <> OLD.question_id THEN
+                UPDATE questions
+                SET search_vector = question_search_vector(id, title, content)
+                WHERE id = NEW.question_id;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER answers_question_vector_trigger
+        AFTER INSERT OR UPDATE OF content, question_id OR DELETE ON answers
+        FOR EACH ROW EXECUTE FUNCTION answers_question_vector_update();
+    """)
+
+    # 기존 행 채우기
+    op.execute("UPDATE questions SET search_vector = question_search_vector(id, title, content)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('answers', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+    op.execute("DROP TRIGGER IF EXISTS answers_question_vector_trigger ON answers")
+    op.execute("DROP FUNCTION IF EXISTS answers_question_vector_update()")
+    op.execute("""
+        CREATE OR REPLACE FUNCTION questions_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := setweight(to_tsvector('simple', coalesce(NEW.title, '')), 'A')
+                || setweight(to_tsvector('simple', coalesce(NEW.content, '')), 'B');
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("DROP FUNCTION IF EXISTS question_search_vector(integer, text, text)")
+    op.execute("""
+        CREATE FUNCTION answers_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := to_tsvector('simple', coalesce(NEW.content, ''));
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER answers_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF content ON answers
+        FOR EACH ROW EXECUTE FUNCTION answers_search_vector_update();
+    """)
+    op.execute(
+        "UPDATE questions SET search_vector = setweight(to_tsvector('simple', coalesce(title, '')), 'A') "
+        "|| setweight(to_tsvector('simple', coalesce(content, '')), 'B')"
+    )
+    op.execute("UPDATE answers SET search_vector = to_tsvector('simple', coalesce(content, ''))")
+    op.create_index('ix_answers_search_vector', 'answers', ['search_vector'], unique=False, postgresql_using='gin')
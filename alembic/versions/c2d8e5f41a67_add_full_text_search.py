@@ -0,0 +1,79 @@
+"""Add full-text search vectors for questions and answers
+
+Revision ID: c2d8e5f41a67
+Revises: a94e17c05d3b
+Create Date: 2026-10-18 15:40:09.512734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2d8e5f41a67'
+down_revision: Union[str, None] = 'a94e17c05d3b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# 한국어 형태소 분석기가 없으므로 'simple' 설정(소문자화 + 단어 분리)을 쓴다
+QUESTIONS_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(NEW.title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(NEW.content, '')), 'B')"
+)
+ANSWERS_VECTOR = "to_tsvector('simple', coalesce(NEW.content, ''))"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('questions', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+    op.add_column('answers', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+
+    op.execute(f"""
+        CREATE FUNCTION questions_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {QUESTIONS_VECTOR};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER questions_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF title, content ON questions
+        FOR EACH ROW EXECUTE FUNCTION questions_search_vector_update();
+    """)
+    op.execute(f"""
+        CREATE FUNCTION answers_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {ANSWERS_VECTOR};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER answers_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF content ON answers
+        FOR EACH ROW EXECUTE FUNCTION answers_search_vector_update();
+    """)
+
+    # 기존 행 채우기
+    op.execute(f"UPDATE questions SET search_vector = {QUESTIONS_VECTOR.replace('NEW.', '')}")
+    op.execute(f"UPDATE answers SET search_vector = {ANSWERS_VECTOR.replace('NEW.', '')}")
+
+    op.create_index('ix_questions_search_vector', 'questions', ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_index('ix_answers_search_vector', 'answers', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_answers_search_vector', table_name='answers', postgresql_using='gin')
+    op.drop_index('ix_questions_search_vector', table_name='questions', postgresql_using='gin')
+    op.execute("DROP TRIGGER IF EXISTS answers_search_vector_trigger ON answers")
+    op.execute("DROP FUNCTION IF EXISTS answers_search_vector_update()")
+    op.execute("DROP TRIGGER IF EXISTS questions_search_vector_trigger ON questions")
+    op.execute("DROP FUNCTION IF EXISTS questions_search_vector_update()")
+    op.drop_column('answers', 'search_vector')
+    op.drop_column('questions', 'search_vector')
@@ -0,0 +1,47 @@
+"""Add hot_score to questions for the hot ranking
+
+Revision ID: e5b71c9a0f24
+Revises: c2d8e5f41a67
+Create Date: 2026-10-18 18:12:40.275113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b71c9a0f24'
+down_revision: Union[str, None] = 'c2d8e5f41a67'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# ranking.hot_score 와 같은 식 (HOT_EPOCH = 2024-01-01, HOT_DECAY_SECONDS = 45000, HOT_ANSWER_WEIGHT = 2)
+HOT_SCORE = """
+    round((
+        log(greatest(
+            (SELECT count(*) FROM likes WHERE likes.question_id = questions.id)
+            + 2 * (SELECT count(*) FROM answers WHERE answers.question_id = questions.id),
+            1
+        ))
+        + extract(epoch FROM coalesce(created_at, now()) - timestamp '2024-01-01') / 45000
+    )::numeric, 7)
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('questions', sa.Column('hot_score', sa.Float(), server_default='0', nullable=False))
+
+    # 기존 행 채우기
+    op.execute(f"UPDATE questions SET hot_score = {HOT_SCORE}")
+
+    op.create_index('ix_questions_hot_score_id', 'questions', ['hot_score', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_questions_hot_score_id', table_name='questions')
+    op.drop_column('questions', 'hot_score')
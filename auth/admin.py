@@ -0,0 +1,37 @@
+"""관리자 권한 부여/회수.
+
+    python -m auth.admin grant alice@example.com
+    python -m auth.admin revoke alice@example.com
+"""
+import argparse
+import sys
+
+import auth.user_cache  # noqa: F401  유저 캐시 무효화 리스너 (Redis 를 쓰면 실행 중인 워커의 캐시도 지운다)
+import crud
+from database import SessionLocal
+
+
+def set_admin(email: str, is_admin: bool) -> bool:
+    with SessionLocal() as db:
+        user = crud.get_user_by_email(db, email)
+        if user is None:
+            return False
+        user.is_admin = is_admin
+        db.commit()
+        return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grant or revoke admin rights")
+    parser.add_argument("action", choices=["grant", "revoke"])
+    parser.add_argument("email")
+    args = parser.parse_args()
+
+    if not set_admin(args.email, args.action == "grant"):
+        print(f"no user with email {args.email}", file=sys.stderr)
+        sys.exit(1)
+    print(f"{args.email}: admin {'granted' if args.action == 'grant' else 'revoked'}")
+
+
+if __name__ == "__main__":
+    main()
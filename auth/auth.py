@@ -1,50 +1,59 @@
-from datetime import datetime, timedelta
-from jose import JWTError, jwt
-from fastapi import Depends, HTTPException, status, Request
+from fastapi import BackgroundTasks, Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from database import SessionLocal
-import models 
-
-# 환경변수 또는 하드코딩으로 우선 정의
-SECRET_KEY = "myjwtsecret"
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 60 # 1시간
+from database import get_db, run_db, run_db_in_new_session
+from auth.hashing import Hasher
+from auth.user_cache import user_cache
+from auth.tokens import InvalidToken, create_access_token, verifier
+import crud
 
+# 서명 키, 토큰 발급/검증/폐기는 auth/tokens.py
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/users/login")
 
-# DB 세션 의존성
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# 이메일/비밀번호 확인 후 유저 반환 (실패 시 None)
+# 저장된 해시가 현재 비용 설정보다 약하면 응답 후 백그라운드에서 새 해시로 교체한다.
+async def authenticate_user(db: Session, email: str, password: str, background_tasks: BackgroundTasks):
+    user = await run_db(db, crud.get_user_by_email, email)
+    if not user:
+        return None
 
-def create_access_token(data: dict, expires_delta: timedelta = None):
-    to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+    verified, new_hash = await Hasher.verify_and_update_async(password, user.password_hash)
+    if not verified:
+        return None
+    if new_hash:
+        background_tasks.add_task(
+            run_db_in_new_session, crud.update_password_hash, user.id, user.password_hash, new_hash
+        )
+    return user
 
 # 현재 로그인한 유저 가져오기 
 # ✅ 쿠키 기반으로 토큰을 읽는 버전
-def get_current_user(request: Request, db: Session = Depends(get_db)):
+async def get_current_user(request: Request, db: Session = Depends(get_db)):
     token = request.cookies.get("access_token")
     if not token:
         raise HTTPException(status_code=401, detail="Not authenticated")
 
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise HTTPException(status_code=401, detail="Invalid token")
-    except JWTError:
+        payload = verifier.verify(token)
+    except InvalidToken:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    user_id: str = payload.get("sub")
+    if user_id is None:
         raise HTTPException(status_code=401, detail="Invalid token")
     
-    user = db.query(models.User).filter(models.User.id == int(user_id)).first()
-    if user is None:
+    # 캐시에 있으면 DB 조회 없이 반환
+    user = user_cache.get(int(user_id))
+    if user is not None:
+        return user
+
+    db_user = await run_db(db, crud.get_user, int(user_id))
+    if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
     
-    return user
+    return user_cache.put(db_user)
+
+# 관리자 전용 라우트 (대량 가져오기/내보내기)
+async def require_admin(current_user = Depends(get_current_user)):
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Admin only")
+    return current_user
@@ -0,0 +1,80 @@
+"""비밀번호 해시 비용 캘리브레이션.
+
+이 호스트에서 해시 1회가 목표 지연(ms) 안에 들어오는 가장 높은 비용을 찾아
+환경변수 형태로 출력한다.
+
+    python -m auth.calibrate --target-ms 250
+    python -m auth.calibrate --scheme argon2 --target-ms 250 --memory-cost 65536
+"""
+import argparse
+import statistics
+import time
+
+from auth.hashing import build_context
+
+SAMPLE_PASSWORD = "calibration-password-1234"
+
+
+def measure(context, samples: int) -> float:
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        context.hash(SAMPLE_PASSWORD)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate_bcrypt(target_ms: float, samples: int, min_rounds: int = 10, max_rounds: int = 16) -> dict:
+    best = min_rounds
+    for rounds in range(min_rounds, max_rounds + 1):
+        elapsed = measure(build_context("bcrypt", bcrypt_rounds=rounds), samples)
+        print(f"bcrypt rounds={rounds}: {elapsed:.1f} ms")
+        if elapsed > target_ms:
+            break
+        best = rounds
+    return {"PASSWORD_SCHEME": "bcrypt", "BCRYPT_ROUNDS": best}
+
+
+def calibrate_argon2(target_ms: float, samples: int, memory_cost: int, parallelism: int, max_time_cost: int = 10) -> dict:
+    best = 1
+    for time_cost in range(1, max_time_cost + 1):
+        context = build_context(
+            "argon2",
+            argon2_memory_cost=memory_cost,
+            argon2_time_cost=time_cost,
+            argon2_parallelism=parallelism,
+        )
+        elapsed = measure(context, samples)
+        print(f"argon2 memory_cost={memory_cost} time_cost={time_cost}: {elapsed:.1f} ms")
+        if elapsed > target_ms:
+            break
+        best = time_cost
+    return {
+        "PASSWORD_SCHEME": "argon2",
+        "ARGON2_MEMORY_COST": memory_cost,
+        "ARGON2_TIME_COST": best,
+        "ARGON2_PARALLELISM": parallelism,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pick password hash cost parameters for a latency budget")
+    parser.add_argument("--scheme", choices=["bcrypt", "argon2"], default="bcrypt")
+    parser.add_argument("--target-ms", type=float, default=250.0)
+    parser.add_argument("--samples", type=int, default=3)
+    parser.add_argument("--memory-cost", type=int, default=65536, help="argon2 memory cost in KiB")
+    parser.add_argument("--parallelism", type=int, default=4, help="argon2 parallelism")
+    args = parser.parse_args()
+
+    if args.scheme == "bcrypt":
+        settings = calibrate_bcrypt(args.target_ms, args.samples)
+    else:
+        settings = calibrate_argon2(args.target_ms, args.samples, args.memory_cost, args.parallelism)
+
+    print()
+    for key, value in settings.items():
+        print(f"{key}={value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,216 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+
 from passlib.context import CryptContext
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+# 비밀번호 해시 비용 설정 (환경변수)
+# 값은 `python -m auth.calibrate` 로 이 호스트의 지연 목표에 맞춰 고른다.
+# 설정을 올리면 기존 해시는 다음 로그인 때 needs_update 판정을 받아 새 비용으로 다시 저장된다.
+PASSWORD_SCHEME = os.getenv("PASSWORD_SCHEME", "bcrypt")  # bcrypt | argon2
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "65536"))  # KiB
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "3"))
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "4"))
+
+
+def _require_argon2():
+    # passlib 은 첫 해시/검증 때에야 백엔드를 찾으므로, 시작할 때 확인해서 첫 로그인이 500 이 되지 않게 한다
+    from passlib.exc import MissingBackendError
+    from passlib.hash import argon2
+
+    try:
+        argon2.get_backend()
+    except MissingBackendError:
+        raise RuntimeError(
+            "PASSWORD_SCHEME=argon2 needs the argon2-cffi package (pip install argon2-cffi), "
+            "or set PASSWORD_SCHEME=bcrypt"
+        ) from None
+
+
+def build_context(
+    scheme: str = PASSWORD_SCHEME,
+    bcrypt_rounds: int = BCRYPT_ROUNDS,
+    argon2_memory_cost: int = ARGON2_MEMORY_COST,
+    argon2_time_cost: int = ARGON2_TIME_COST,
+    argon2_parallelism: int = ARGON2_PARALLELISM,
+) -> CryptContext:
+    # 첫 번째 scheme 으로 새 해시를 만들고, 나머지는 검증만 한 뒤 업그레이드 대상으로 본다
+    schemes = ["argon2", "bcrypt"] if scheme == "argon2" else ["bcrypt"]
+    if scheme == "argon2":
+        _require_argon2()
+    return CryptContext(
+        schemes=schemes,
+        deprecated="auto",
+        bcrypt__rounds=bcrypt_rounds,
+        argon2__memory_cost=argon2_memory_cost,
+        argon2__time_cost=argon2_time_cost,
+        argon2__parallelism=argon2_parallelism,
+    )
+
+
+pwd_context = build_context()
+
+# bcrypt 전용 프로세스 풀 설정
+# 요청 스레드/이벤트 루프가 해시 계산(수백 ms CPU)을 기다리지 않도록 별도 프로세스에서 계산한다.
+# 실행 중 + 대기 중인 작업이 HASH_WORKERS + HASH_MAX_QUEUE 를 넘으면 바로 HasherOverloaded 를 던진다.
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(min(4, os.cpu_count() or 1))))  # 0 이면 스레드풀 사용
+HASH_MAX_QUEUE = int(os.getenv("HASH_MAX_QUEUE", "16"))
+
+
+class HasherOverloaded(Exception):
+    pass
+
+
+def _timed(fn, *args):
+    # 워커 프로세스 안에서 실행: 결과와 함께 시작 시각, 계산 시간을 돌려준다
+    started_at = time.time()
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, started_at, time.perf_counter() - start
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def _verify_and_update(plain_password: str, hashed_password: str):
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def _noop():
+    return None
+
+
+class HashPool:
+    def __init__(self, workers: int = HASH_WORKERS, max_queue: int = HASH_MAX_QUEUE):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.hash_seconds_total = 0.0
+        self.queue_wait_seconds_total = 0.0
+        self.queue_wait_seconds_max = 0.0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # 스레드가 여럿 떠 있는 서버 프로세스를 fork 하지 않도록 forkserver 로 워커를 띄운다
+                # (forkserver 는 스레드 없는 서버 프로세스에서 fork 하고, 이 모듈을 미리 불러 둔다).
+                # 워커는 spawn 처럼 __main__ 을 다시 불러오므로, 스크립트에서 쓸 때는 __main__ 가드가 필요하다.
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+                if context.get_start_method() == "forkserver":
+                    context.set_forkserver_preload([__name__])
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+            return self._executor
+
+    def _replace_broken(self, executor):
+        # 워커가 죽으면(OOM kill 등) 풀 전체가 BrokenProcessPool 상태로 남으므로 새 풀로 바꾼다
+        with self._lock:
+            if self._executor is not executor:
+                return  # 다른 요청이 이미 바꿨다
+            self._executor = None
+        logger.warning("password hash pool is broken, restarting it")
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _submit(self, fn, *args):
+        for attempt in range(2):
+            executor = self._get_executor()
+            try:
+                return await asyncio.wrap_future(executor.submit(_timed, fn, *args))
+            except BrokenProcessPool:
+                self._replace_broken(executor)
+                if attempt:
+                    raise
+
+    async def start(self):
+        """앱 시작 때 풀과 워커를 미리 띄운다 (첫 로그인이 워커 기동을 기다리지 않게)."""
+        if self.workers > 0:
+            await self._submit(_noop)
+
+    async def run(self, fn, *args):
+        with self._lock:
+            if self.in_flight >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise HasherOverloaded("password hashing queue is full")
+            self.in_flight += 1
+
+        submitted_at = time.time()
+        try:
+            if self.workers > 0:
+                result, started_at, elapsed = await self._submit(fn, *args)
+            else:
+                result, started_at, elapsed = await run_in_threadpool(_timed, fn, *args)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+        wait = max(0.0, started_at - submitted_at)
+        with self._lock:
+            self.completed += 1
+            self.hash_seconds_total += elapsed
+            self.queue_wait_seconds_total += wait
+            self.queue_wait_seconds_max = max(self.queue_wait_seconds_max, wait)
+        return result
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "hash_seconds_total": self.hash_seconds_total,
+                "queue_wait_seconds_total": self.queue_wait_seconds_total,
+                "queue_wait_seconds_max": self.queue_wait_seconds_max,
+            }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+hash_pool = HashPool()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 class Hasher:
     @staticmethod
     def hash_password(password: str) -> str:
-        return pwd_context.hash(password)
-    
+        return _hash(password)
+
     @staticmethod
     def verify_password(plain_password: str, hashed_password: str) -> bool:
-        return pwd_context.verify(plain_password, hashed_password)
-    
-    
\ No newline at end of file
+        return _verify(plain_password, hashed_password)
+
+    # 요청 처리 경로에서는 아래 async 버전을 사용한다 (프로세스 풀에서 실행)
+    @staticmethod
+    async def hash_password_async(password: str) -> str:
+        return await hash_pool.run(_hash, password)
+
+    @staticmethod
+    async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+        return await hash_pool.run(_verify, plain_password, hashed_password)
+
+    # 검증과 함께, 현재 비용 설정보다 약한 해시면 새 해시를 만들어 돌려준다 (아니면 None)
+    @staticmethod
+    async def verify_and_update_async(plain_password: str, hashed_password: str):
+        return await hash_pool.run(_verify_and_update, plain_password, hashed_password)
@@ -0,0 +1,217 @@
+import asyncio
+import hashlib
+import logging
+import math
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional
+
+from jose import JWTError, jwt
+
+from database import run_db_in_new_session
+import crud
+
+# JWT 발급/검증
+# - 키 교체: JWT_KEYS="kid1:secret1,kid2:secret2" 처럼 여러 키를 두고, 새 토큰은 JWT_ACTIVE_KID 로 서명한다.
+#   검증은 토큰 헤더의 kid 로 키를 고르므로 예전 키로 서명된 토큰도 만료될 때까지 통과한다.
+#   (kid 없는 예전 토큰은 활성 키로 검증한다)
+# - 검증 캐시: 한 번 서명을 확인한 토큰은 LRU 에 payload 를 두고, 다음부터는 키(kid)가 남아 있는지와
+#   만료 시각만 본다.
+# - 폐기 목록: 로그아웃한 토큰의 jti 를 revoked_tokens 테이블에 넣고, 각 워커는 블룸 필터 + 정확한 집합을
+#   JWT_REVOCATION_REFRESH 초마다 DB 에서 다시 만든다. 요청마다 DB 를 보지 않고, 대부분의 토큰은
+#   블룸 필터에서 바로 "폐기 안 됨" 으로 끝난다. 다른 워커의 로그아웃은 다음 갱신 때 반영된다.
+#   (갱신 도중 이 워커에서 폐기한 jti 는 새 목록에 합쳐서 잃지 않는다)
+#   갱신은 읽기만 한다. 만료된 폐기 행은 로그아웃(crud.revoke_token) 때 지운다.
+
+logger = logging.getLogger(__name__)
+
+ALGORITHM = "HS256"
+ACCESS_TOKEN_EXPIRE_MINUTES = 60  # 1시간
+JWT_VERIFY_CACHE_SIZE = int(os.getenv("JWT_VERIFY_CACHE_SIZE", "10000"))
+JWT_REVOCATION_REFRESH = float(os.getenv("JWT_REVOCATION_REFRESH", "30"))  # 초
+JWT_REVOCATION_CAPACITY = int(os.getenv("JWT_REVOCATION_CAPACITY", "100000"))
+JWT_REVOCATION_FP_RATE = 0.01
+
+
+def _load_keys() -> dict:
+    raw = os.getenv("JWT_KEYS", "")
+    keys = {}
+    for item in raw.split(","):
+        if ":" in item:
+            kid, secret = item.split(":", 1)
+            keys[kid.strip()] = secret.strip()
+    if not keys:
+        keys["default"] = os.getenv("JWT_SECRET_KEY", "myjwtsecret")
+    return keys
+
+
+JWT_KEYS = _load_keys()
+JWT_ACTIVE_KID = os.getenv("JWT_ACTIVE_KID") or next(iter(JWT_KEYS))
+if JWT_ACTIVE_KID not in JWT_KEYS:
+    raise RuntimeError(f"JWT_ACTIVE_KID {JWT_ACTIVE_KID!r} is not in JWT_KEYS")
+
+
+class InvalidToken(Exception):
+    pass
+
+
+class BloomFilter:
+    def __init__(self, capacity: int = JWT_REVOCATION_CAPACITY, fp_rate: float = JWT_REVOCATION_FP_RATE):
+        self.size = max(8, int(-capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RevocationList:
+    def __init__(self):
+        self._bloom = BloomFilter()
+        self._exact = set()
+        # 갱신이 DB 를 읽는 동안 이 워커에서 폐기한 jti. 읽은 목록에 없을 수 있으므로 replace() 때 합친다.
+        self._added_during_refresh = None
+        self._lock = threading.Lock()
+        self._task = None
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        if not jti:
+            return False
+        bloom, exact = self._bloom, self._exact
+        return jti in bloom and jti in exact
+
+    def add(self, jti: str):
+        with self._lock:
+            self._bloom.add(jti)
+            self._exact.add(jti)
+            if self._added_during_refresh is not None:
+                self._added_during_refresh.add(jti)
+
+    def replace(self, jtis):
+        exact = set(jtis)
+        bloom = BloomFilter()
+        for jti in exact:
+            bloom.add(jti)
+        with self._lock:
+            for jti in self._added_during_refresh or ():
+                bloom.add(jti)
+                exact.add(jti)
+            self._added_during_refresh = None
+            self._bloom, self._exact = bloom, exact
+
+    def refresh(self, db):
+        with self._lock:
+            self._added_during_refresh = set()
+        self.replace(crud.get_revoked_jtis(db))
+
+    async def start(self):
+        await run_db_in_new_session(self.refresh)
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(JWT_REVOCATION_REFRESH)
+            try:
+                await run_db_in_new_session(self.refresh)
+            except Exception:
+                logger.exception("revocation list refresh failed")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+revocations = RevocationList()
+
+
+class TokenVerifier:
+    def __init__(self, keys: dict = JWT_KEYS, maxsize: int = JWT_VERIFY_CACHE_SIZE):
+        self.keys = keys
+        self.maxsize = maxsize
+        self._cache = OrderedDict()  # token -> (kid, payload)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _decode(self, token: str):
+        try:
+            kid = jwt.get_unverified_header(token).get("kid") or JWT_ACTIVE_KID
+            key = self.keys.get(kid)
+            if key is None:
+                raise InvalidToken("unknown key id")
+            return kid, jwt.decode(token, key, algorithms=[ALGORITHM])
+        except JWTError as exc:
+            raise InvalidToken(str(exc))
+
+    def verify(self, token: str) -> dict:
+        """서명, 만료, 폐기 여부를 확인한 payload. 실패하면 InvalidToken."""
+        with self._lock:
+            item = self._cache.get(token)
+            if item is not None:
+                self._cache.move_to_end(token)
+        if item is None:
+            self.misses += 1
+            kid, payload = self._decode(token)
+            with self._lock:
+                self._cache[token] = (kid, payload)
+                while len(self._cache) > self.maxsize:
+                    self._cache.popitem(last=False)
+        else:
+            self.hits += 1
+            kid, payload = item
+            # 키 교체로 JWT_KEYS 에서 빠진 키의 토큰은 캐시에 있어도 통과시키지 않는다
+            if kid not in self.keys:
+                with self._lock:
+                    self._cache.pop(token, None)
+                raise InvalidToken("unknown key id")
+            if payload.get("exp") is not None and payload["exp"] < time.time():
+                with self._lock:
+                    self._cache.pop(token, None)
+                raise InvalidToken("token expired")
+        if revocations.is_revoked(payload.get("jti")):
+            raise InvalidToken("token revoked")
+        return payload
+
+
+verifier = TokenVerifier()
+
+
+def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
+    to_encode = data.copy()
+    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
+    return jwt.encode(to_encode, JWT_KEYS[JWT_ACTIVE_KID], algorithm=ALGORITHM, headers={"kid": JWT_ACTIVE_KID})
+
+
+def revoke(db, token: str) -> bool:
+    """토큰을 폐기한다 (로그아웃). 이미 잘못된 토큰이거나 jti 가 없는 예전 토큰이면 False."""
+    try:
+        payload = verifier.verify(token)
+    except InvalidToken:
+        return False
+    jti = payload.get("jti")
+    if not jti:
+        return False
+    crud.revoke_token(db, jti, datetime.utcfromtimestamp(payload["exp"]))
+    revocations.add(jti)
+    return True
@@ -0,0 +1,241 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+import models
+
+# 인증된 유저 캐시
+# get_current_user 가 매 요청마다 users 테이블을 조회하지 않도록 user id 로 유저 정보를 캐시한다.
+# 프로세스 안의 LRU(TTL) 캐시를 먼저 보고, USER_CACHE_REDIS_URL 이 있으면 워커끼리 공유하는
+# Redis 캐시를 두 번째 단계로 사용한다. 유저가 수정/삭제되면 두 캐시 모두에서 지운다.
+# 다른 워커의 프로세스 캐시는 Redis pub/sub 로 지운 키를 받아서 함께 지운다 (start() 로 구독 시작).
+# Redis 없이 여러 워커를 띄우면 다른 워커의 프로세스 캐시는 USER_CACHE_TTL 동안 옛 값을 볼 수 있다.
+
+logger = logging.getLogger(__name__)
+
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "60"))  # 초
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+USER_CACHE_REDIS_URL = os.getenv("USER_CACHE_REDIS_URL")
+
+
+class CachedUser:
+    """캐시에서 꺼낸 유저. 라우트에서 쓰는 속성만 가진다 (비밀번호 해시는 캐시하지 않음)."""
+
+    __slots__ = ("id", "username", "email", "is_admin")
+
+    def __init__(self, id: int, username: str, email: str, is_admin: bool = False):
+        self.id = id
+        self.username = username
+        self.email = email
+        self.is_admin = is_admin
+
+    def to_dict(self) -> dict:
+        return {"id": self.id, "username": self.username, "email": self.email, "is_admin": self.is_admin}
+
+
+class MemoryBackend:
+    def __init__(self, maxsize: int = USER_CACHE_SIZE, ttl: int = USER_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: dict):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class RedisBackend:
+    """redis-py 호환 클라이언트(get/set/delete/publish/pubsub)를 쓰는 공유 캐시.
+
+    Redis 장애가 인증 실패로 이어지지 않도록 오류는 캐시 미스로 취급한다.
+    delete 는 지운 키를 채널에 알려서 다른 워커가 프로세스 캐시에서도 지우게 한다.
+    """
+
+    def __init__(self, client, ttl: int = USER_CACHE_TTL, prefix: str = "qna:user:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.channel = prefix + "invalidate"
+
+    def get(self, key: str) -> Optional[dict]:
+        try:
+            raw = self.client.get(self.prefix + key)
+        except Exception:
+            return None
+        if raw is None:
+            return None
+        return json.loads(raw)
+
+    def set(self, key: str, value: dict):
+        try:
+            self.client.set(self.prefix + key, json.dumps(value), ex=self.ttl)
+        except Exception:
+            pass
+
+    def delete(self, key: str):
+        try:
+            self.client.delete(self.prefix + key)
+            self.client.publish(self.channel, key)
+        except Exception:
+            pass
+
+    def clear(self):
+        pass
+
+    def listen(self, on_invalidate, on_reset, stop: threading.Event):
+        """다른 워커가 지운 키마다 on_invalidate(key) 를 부른다 (stop 이 설정될 때까지 스레드에서 실행).
+
+        구독이 끊긴 동안의 알림은 잃어버리므로, 다시 구독할 때 on_reset() 으로 프로세스 캐시를 비운다.
+        """
+        connected = True
+        while not stop.is_set():
+            pubsub = None
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                if not connected:
+                    on_reset()
+                    connected = True
+                while not stop.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is None or message.get("type") != "message":
+                        continue
+                    data = message["data"]
+                    on_invalidate(data.decode() if isinstance(data, bytes) else data)
+            except Exception:
+                if connected:
+                    logger.exception("user cache invalidation channel failed, retrying")
+                connected = False
+                stop.wait(1)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+
+class UserCache:
+    def __init__(self, local: MemoryBackend, shared=None):
+        self.local = local
+        self.shared = shared
+        self.hits = 0
+        self.misses = 0
+        self._stop = threading.Event()
+        self._listener = None
+
+    def start(self):
+        """공유 캐시가 있으면 다른 워커의 무효화 알림 구독을 시작한다."""
+        if self.shared is None or not hasattr(self.shared, "listen") or self._listener is not None:
+            return
+        self._stop.clear()
+        self._listener = threading.Thread(
+            target=self.shared.listen,
+            args=(self.local.delete, self.local.clear, self._stop),
+            name="user-cache-invalidation",
+            daemon=True
+        )
+        self._listener.start()
+
+    def stop(self):
+        if self._listener is None:
+            return
+        self._stop.set()
+        self._listener.join(timeout=5)
+        self._listener = None
+
+    def get(self, user_id: int) -> Optional[CachedUser]:
+        key = str(user_id)
+        value = self.local.get(key)
+        if value is None and self.shared is not None:
+            value = self.shared.get(key)
+            if value is not None:
+                self.local.set(key, value)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return CachedUser(**value)
+
+    def put(self, user) -> CachedUser:
+        cached = CachedUser(user.id, user.username, user.email, bool(user.is_admin))
+        key = str(user.id)
+        self.local.set(key, cached.to_dict())
+        if self.shared is not None:
+            self.shared.set(key, cached.to_dict())
+        return cached
+
+    def invalidate(self, user_id: int):
+        key = str(user_id)
+        self.local.delete(key)
+        if self.shared is not None:
+            self.shared.delete(key)
+
+    def clear(self):
+        self.local.clear()
+        if self.shared is not None:
+            self.shared.clear()
+
+
+def _shared_backend():
+    if not USER_CACHE_REDIS_URL:
+        return None
+    import redis  # 선택 의존성
+
+    return RedisBackend(redis.Redis.from_url(USER_CACHE_REDIS_URL))
+
+
+user_cache = UserCache(MemoryBackend(), _shared_backend())
+
+
+# 유저 정보가 바뀌거나 삭제되면 캐시에서 지운다.
+# commit 전에는 다른 요청이 아직 옛 행을 읽어 다시 캐시할 수 있으므로 commit 후에 한 번 더 지운다.
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _invalidate_user(mapper, connection, target):
+    user_cache.invalidate(target.id)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("user_cache_evict", set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    for user_id in session.info.pop("user_cache_evict", ()):
+        user_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back(session):
+    session.info.pop("user_cache_evict", None)
@@ -0,0 +1,17 @@
+"""부하 테스트 / 벤치마크.
+
+    python -m bench.seed --users 200 --questions 5000 --answers 3 --likes 5
+    python -m bench --scenario index,detail,like --concurrency 20 --duration 10 --out results.json
+    python -m bench --target http://127.0.0.1:8000 --compare results.json
+    python -m bench.templates --iterations 2000
+
+벤치마크는 앱의 DATABASE_URL 대신 BENCH_DATABASE_URL(기본 ./bench.sqlite)을 쓴다.
+seed --reset 이 테이블을 지우므로 운영/개발 DB 를 실수로 가리키지 않게 따로 둔다.
+앱을 import 하기 전에 설정해야 하므로 bench 모듈을 가장 먼저 import 한다.
+"""
+import os
+
+BENCH_DEFAULT_DATABASE_URL = "sqlite:///bench.sqlite"
+BENCH_DATABASE_URL = os.getenv("BENCH_DATABASE_URL", BENCH_DEFAULT_DATABASE_URL)
+
+os.environ["DATABASE_URL"] = BENCH_DATABASE_URL
@@ -0,0 +1,198 @@
+"""시나리오 실행기: 가상 사용자 N 명이 정해진 시간 동안 요청을 반복하고 지연 시간 분포를 모은다."""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+import bench  # noqa: F401  DATABASE_URL 을 BENCH_DATABASE_URL 로
+import httpx
+from sqlalchemy import select
+
+from bench.scenarios import NEEDS_LOGIN, SCENARIOS, UserState, login
+from database import SessionLocal, engine
+from models import Question
+
+
+def percentile(sorted_values, p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(p / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies, statuses: Counter, errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    count = len(latencies)
+    return {
+        "requests": count,
+        "errors": errors,
+        "rps": round(count / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(sum(latencies) / count * 1000, 3) if count else 0.0,
+        "max_ms": round(latencies[-1] * 1000, 3) if count else 0.0,
+        "statuses": {str(status): n for status, n in sorted(statuses.items())},
+    }
+
+
+async def _virtual_user(make_client, scenario, state: UserState, warmup_until: float, deadline: float, record):
+    async with make_client() as client:
+        if scenario.__name__ in NEEDS_LOGIN:
+            await login(client, state)
+        while True:
+            start = time.perf_counter()
+            if start >= deadline:
+                return
+            try:
+                response = await scenario(client, state)
+                status = response.status_code
+            except httpx.HTTPError:
+                status = None
+            if start >= warmup_until:
+                record(time.perf_counter() - start, status)
+
+
+async def run_scenario(make_client, name: str, question_ids, users: int, concurrency: int,
+                       duration: float, warmup: float, seed: int) -> dict:
+    scenario = SCENARIOS[name]
+    latencies = []
+    statuses = Counter()
+    errors = 0
+
+    def record(latency, status):
+        nonlocal errors
+        latencies.append(latency)
+        statuses[status or "error"] += 1
+        if status is None or status >= 500:
+            errors += 1
+
+    rng = random.Random(seed)
+    now = time.perf_counter()
+    warmup_until = now + warmup
+    deadline = warmup_until + duration
+    await asyncio.gather(*[
+        _virtual_user(make_client, scenario, UserState(i % users, random.Random(rng.random()), question_ids),
+                      warmup_until, deadline, record)
+        for i in range(concurrency)
+    ])
+    return summarize(latencies, statuses, errors, duration)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> bool:
+    """p95 가 threshold(%) 넘게 나빠진 시나리오가 있으면 False."""
+    ok = True
+    print(f"\n{'scenario':<12} {'rps':>22} {'p95 ms':>24}")
+    for name, now in current["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if before is None:
+            continue
+        rps_delta = (now["rps"] - before["rps"]) / before["rps"] * 100 if before["rps"] else 0.0
+        p95_delta = (now["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100 if before["p95_ms"] else 0.0
+        flag = ""
+        if p95_delta > threshold:
+            flag = "  REGRESSION"
+            ok = False
+        print(f"{name:<12} {before['rps']:>8} -> {now['rps']:>8} ({rps_delta:+5.1f}%) "
+              f"{before['p95_ms']:>8} -> {now['p95_ms']:>8} ({p95_delta:+5.1f}%){flag}")
+    return ok
+
+
+async def run(args) -> dict:
+    with SessionLocal() as db:
+        question_ids = list(db.scalars(select(Question.id).order_by(Question.id)))
+    if not question_ids:
+        raise SystemExit("no questions in the database, run python -m bench.seed first")
+
+    if args.target == "asgi":
+        from main import app
+
+        transport = httpx.ASGITransport(app=app)
+
+        def make_client():
+            return httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=args.timeout)
+        lifespan = app.router.lifespan_context(app)
+    else:
+        limits = httpx.Limits(max_connections=None)
+
+        def make_client():
+            return httpx.AsyncClient(base_url=args.target, timeout=args.timeout, limits=limits)
+        lifespan = None
+
+    results = {}
+    if lifespan is not None:
+        await lifespan.__aenter__()
+    try:
+        for name in args.scenario.split(","):
+            print(f"running {name} (concurrency={args.concurrency}, {args.duration}s)...", flush=True)
+            results[name] = await run_scenario(
+                make_client, name, question_ids, args.users, args.concurrency,
+                args.duration, args.warmup, args.seed,
+            )
+            summary = results[name]
+            print(f"  {summary['requests']} req, {summary['rps']} req/s, p50 {summary['p50_ms']} ms, "
+                  f"p95 {summary['p95_ms']} ms, p99 {summary['p99_ms']} ms, errors {summary['errors']}")
+    finally:
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "target": args.target,
+            "database": engine.dialect.name,
+            "questions": len(question_ids),
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "users": args.users,
+            "seed": args.seed,
+            "python": platform.python_version(),
+        },
+        "scenarios": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run load scenarios against the app")
+    parser.add_argument("--scenario", default="index,detail,api_list",
+                        help=f"comma separated: {', '.join(SCENARIOS)}")
+    parser.add_argument("--target", default="asgi", help="'asgi' (in-process) or a base URL such as http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=1.0, help="seconds excluded from the results")
+    parser.add_argument("--users", type=int, default=200, help="number of seeded users to log in as")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="write results as JSON")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="p95 regression threshold in percent")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.scenario.split(",") if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario: {', '.join(unknown)}")
+
+    result = asyncio.run(run(args))
+    if args.out:
+        with open(args.out, "w") as file:
+            json.dump(result, file, indent=2)
+        print(f"results written to {args.out}")
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        if not compare(baseline, result, args.threshold):
+            sys.exit(1)
@@ -0,0 +1,77 @@
+"""벤치마크 시나리오.
+
+시나리오는 (client, state) 를 받아 요청 하나를 보내고 응답을 돌려주는 async 함수다.
+state 는 가상 사용자 하나의 상태(로그인한 사용자 번호, 난수 생성기, 질문 id 범위)다.
+"""
+from bench.seed import BENCH_PASSWORD, user_email
+
+# 상세 페이지는 API 와 같은 URL 이므로 브라우저처럼 HTML 을 요청한다
+PAGE_HEADERS = {"Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8"}
+
+
+class UserState:
+    def __init__(self, index: int, rng, question_ids):
+        self.index = index
+        self.rng = rng
+        self.question_ids = question_ids
+
+    def question_id(self) -> int:
+        # 앞쪽(최근) 질문에 요청이 몰리도록 치우친 분포
+        position = int(len(self.question_ids) * self.rng.random() ** 3)
+        return self.question_ids[-1 - position]
+
+
+async def login(client, state: UserState):
+    response = await client.post(
+        "/users/login", data={"username": user_email(state.index), "password": BENCH_PASSWORD}
+    )
+    if response.status_code == 200:
+        client.cookies.set("access_token", response.json()["access_token"])
+    return response
+
+
+async def index(client, state: UserState):
+    return await client.get("/")
+
+
+async def index_hot(client, state: UserState):
+    return await client.get("/?sort=hot")
+
+
+async def api_list(client, state: UserState):
+    return await client.get("/questions/", params={"limit": 20})
+
+
+async def detail(client, state: UserState):
+    return await client.get(f"/questions/{state.question_id()}", headers=PAGE_HEADERS)
+
+
+async def search(client, state: UserState):
+    return await client.get("/questions/search", params={"q": state.rng.choice(["python", "fastapi", "body"])})
+
+
+async def like(client, state: UserState):
+    # 이미 누른 좋아요(400)도 정상 응답으로 센다
+    return await client.post(f"/questions/{state.question_id()}/like")
+
+
+async def answer(client, state: UserState):
+    return await client.post(
+        f"/questions/{state.question_id()}/answer",
+        data={"content": f"bench answer from user {state.index}"},
+    )
+
+
+SCENARIOS = {
+    "index": index,
+    "index_hot": index_hot,
+    "api_list": api_list,
+    "detail": detail,
+    "search": search,
+    "login": login,
+    "like": like,
+    "answer": answer,
+}
+
+# 로그인이 필요한 시나리오 (가상 사용자가 시작할 때 한 번 로그인한다)
+NEEDS_LOGIN = {"detail", "like", "answer"}
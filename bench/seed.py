@@ -0,0 +1,117 @@
+"""벤치마크용 데이터 생성 (같은 --seed 면 같은 데이터).
+
+사용자 비밀번호는 모두 BENCH_PASSWORD 이고, 해시는 한 번만 계산해서 재사용한다.
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from bench import BENCH_DEFAULT_DATABASE_URL
+from sqlalchemy import func, insert, select
+
+from auth.hashing import Hasher
+from database import Base, SessionLocal, engine
+from models import Answer, Like, Question, User
+from ranking import hot_score
+
+BENCH_PASSWORD = "bench-password"
+CHUNK = 5000
+
+
+def user_email(index: int) -> str:
+    return f"bench{index}@example.com"
+
+
+def _insert_chunks(db, model, rows):
+    for start in range(0, len(rows), CHUNK):
+        db.execute(insert(model), rows[start:start + CHUNK])
+
+
+def seed(users: int, questions: int, answers: int, likes: int, seed: int = 1, reset: bool = False,
+         force: bool = False) -> dict:
+    rng = random.Random(seed)
+    if reset:
+        # 기본 bench.sqlite 가 아닌 DB 는 --force 없이 지우지 않는다
+        if str(engine.url) != BENCH_DEFAULT_DATABASE_URL and not force:
+            raise SystemExit(
+                f"refusing to drop all tables in {engine.url.render_as_string(hide_password=True)}; "
+                "pass --force to reset a database other than the default bench.sqlite"
+            )
+        Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    with SessionLocal() as db:
+        if db.scalar(select(func.count(User.id)).where(User.email == user_email(0))):
+            raise SystemExit("bench data already exists (use --reset to recreate)")
+
+        password_hash = Hasher.hash_password(BENCH_PASSWORD)
+        _insert_chunks(db, User, [
+            {"username": f"bench{i}", "email": user_email(i), "password_hash": password_hash}
+            for i in range(users)
+        ])
+        user_ids = list(db.scalars(select(User.id).where(User.email.like("bench%@example.com")).order_by(User.id)))
+
+        # 최근 30일에 고르게 퍼진 질문, 질문마다 답변 0..2*answers 개, 좋아요 0..2*likes 개
+        now = datetime.utcnow()
+        question_rows = []
+        counts = []
+        for i in range(questions):
+            created_at = now - timedelta(seconds=rng.randint(0, 30 * 24 * 3600))
+            answer_count = rng.randint(0, 2 * answers)
+            like_count = min(rng.randint(0, 2 * likes), len(user_ids))
+            counts.append((answer_count, like_count))
+            question_rows.append({
+                "title": f"Benchmark question {i} about python and fastapi",
+                "content": f"Question body {i}. " * rng.randint(5, 40),
+                "user_id": rng.choice(user_ids),
+                "created_at": created_at,
+                "hot_score": hot_score(like_count, answer_count, created_at),
+            })
+        _insert_chunks(db, Question, question_rows)
+        question_ids = list(db.scalars(
+            select(Question.id).where(Question.title.like("Benchmark question %")).order_by(Question.id)
+        ))
+
+        answer_rows = []
+        like_rows = []
+        for question_id, (answer_count, like_count) in zip(question_ids, counts):
+            for j in range(answer_count):
+                answer_rows.append({
+                    "content": f"Answer {j} to question {question_id}. " * rng.randint(2, 20),
+                    "question_id": question_id,
+                    "user_id": rng.choice(user_ids),
+                    "created_at": now,
+                })
+            for user_id in rng.sample(user_ids, like_count):
+                like_rows.append({"question_id": question_id, "user_id": user_id})
+        _insert_chunks(db, Answer, answer_rows)
+        _insert_chunks(db, Like, like_rows)
+        db.commit()
+
+    return {
+        "users": len(user_ids),
+        "questions": len(question_rows),
+        "answers": len(answer_rows),
+        "likes": len(like_rows),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed the database with benchmark data")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--questions", type=int, default=5000)
+    parser.add_argument("--answers", type=int, default=3, help="average answers per question")
+    parser.add_argument("--likes", type=int, default=5, help="average likes per question")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--reset", action="store_true", help="drop and recreate all tables first")
+    parser.add_argument("--force", action="store_true", help="allow --reset on a BENCH_DATABASE_URL other than bench.sqlite")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = seed(args.users, args.questions, args.answers, args.likes, args.seed, args.reset, args.force)
+    print(f"seeded {result} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""템플릿 렌더링 벤치마크 (DB 없이 가짜 데이터로 렌더링만 잰다).
+
+    python -m bench.templates --iterations 2000 --out templates.json
+
+- cold: 새 Environment 에서 모든 템플릿을 처음 불러오는 시간 (바이트코드 캐시 없음 / 있음)
+- render: 템플릿별 렌더링 시간 분포와 렌더링 한 번당 CPU 시간
+"""
+import argparse
+import json
+import tempfile
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import bench  # noqa: F401  DATABASE_URL 을 BENCH_DATABASE_URL 로
+from bench.runner import percentile
+from markupsafe import Markup
+from templating import TEMPLATE_DIR, create_environment, warmup
+
+
+def _contexts(questions: int, answers: int) -> dict:
+    now = datetime(2025, 1, 1)
+    user = SimpleNamespace(id=1, username="bench_user", email="bench@example.com")
+    answer_rows = [
+        SimpleNamespace(id=i, content=f"answer {i} " * 20, user=user, created_at=now,
+                        question=SimpleNamespace(id=1, title="question title"))
+        for i in range(answers)
+    ]
+    question_rows = [
+        SimpleNamespace(id=i, title=f"question {i} title", content="content " * 50, created_at=now - timedelta(minutes=i),
+                        likes_count=i % 7, answers_count=answers, answers=answer_rows, user=user)
+        for i in range(questions)
+    ]
+    request = SimpleNamespace(cookies={"access_token": "x"})
+    return {
+        "_question_list.html": {"questions": question_rows, "next_cursor": "abc", "prev_cursor": "def", "limit": questions, "sort": "new"},
+        "_question_detail.html": {"question": question_rows[0]},
+        "index.html": {"request": request, "question_list": Markup("<div>list</div>" * questions)},
+        "question_detail.html": {"request": request, "question_id": 1, "question_title": "question title",
+                                 "question_html": Markup("<div>detail</div>" * answers)},
+        "my_questions.html": {"request": request, "questions": question_rows},
+        "my_answers.html": {"request": request, "answers": answer_rows},
+        "my_page.html": {"request": request, "user": user},
+        "edit_question.html": {"request": request, "question": question_rows[0]},
+        "login.html": {"request": request},
+    }
+
+
+def cold_start(directory: str = TEMPLATE_DIR) -> dict:
+    def load(cache_dir: str) -> float:
+        env = create_environment(directory, cache_dir=cache_dir)
+        start = time.perf_counter()
+        warmup(env)
+        return (time.perf_counter() - start) * 1000
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        no_cache = load("")
+        load(cache_dir)  # 바이트코드 캐시 채우기 (첫 워커)
+        with_cache = load(cache_dir)  # 다른 워커 / 재시작
+    return {"compile_ms": round(no_cache, 3), "bytecode_cache_ms": round(with_cache, 3)}
+
+
+def render(iterations: int, questions: int, answers: int, directory: str = TEMPLATE_DIR) -> dict:
+    env = create_environment(directory, cache_dir="")
+    warmup(env)
+    results = {}
+    for name, context in _contexts(questions, answers).items():
+        template = env.get_template(name)
+        latencies = []
+        cpu_start = time.process_time()
+        for _ in range(iterations):
+            start = time.perf_counter()
+            template.render(**context)
+            latencies.append(time.perf_counter() - start)
+        cpu = time.process_time() - cpu_start
+        latencies.sort()
+        results[name] = {
+            "p50_us": round(percentile(latencies, 50) * 1e6, 2),
+            "p99_us": round(percentile(latencies, 99) * 1e6, 2),
+            "mean_us": round(sum(latencies) / iterations * 1e6, 2),
+            "cpu_us": round(cpu / iterations * 1e6, 2),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark template compile and render times")
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--questions", type=int, default=20, help="questions per list page")
+    parser.add_argument("--answers", type=int, default=10, help="answers per question")
+    parser.add_argument("--out", help="write results as JSON")
+    args = parser.parse_args()
+
+    result = {"cold": cold_start(), "render": render(args.iterations, args.questions, args.answers)}
+    print(f"cold start: compile {result['cold']['compile_ms']} ms, "
+          f"from bytecode cache {result['cold']['bytecode_cache_ms']} ms")
+    print(f"{'template':<24} {'p50_us':>9} {'p99_us':>9} {'mean_us':>9} {'cpu_us':>9}")
+    for name, row in result["render"].items():
+        print(f"{name:<24} {row['p50_us']:>9} {row['p99_us']:>9} {row['mean_us']:>9} {row['cpu_us']:>9}")
+    if args.out:
+        with open(args.out, "w") as file:
+            json.dump(result, file, indent=2)
+        print(f"results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
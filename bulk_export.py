@@ -0,0 +1,105 @@
+import csv
+import io
+import json
+import os
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import select
+
+from database import AsyncSessionLocal, SessionLocal
+from models import Answer, Like, Question
+
+# 질문/답변/좋아요 스트리밍 내보내기 (NDJSON / CSV)
+# ORM 객체 대신 필요한 컬럼만 서버 측 커서(yield_per = stream_results)로 EXPORT_BATCH_SIZE 행씩 읽고,
+# 배치마다 바로 직렬화해서 내보내므로 전체 데이터를 내보내도 메모리 사용량이 일정하다.
+# 응답을 보내는 동안 커넥션을 쥐고 있어야 해서 요청 세션(get_db)이 아니라 자체 세션을 연다.
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+FORMATS = ("ndjson", "csv")
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+EXPORTS = {
+    "questions": (Question, [Question.id, Question.user_id, Question.title, Question.content, Question.created_at, Question.updated_at]),
+    "answers": (Answer, [Answer.id, Answer.question_id, Answer.user_id, Answer.content, Answer.created_at, Answer.updated_at]),
+    "likes": (Like, [Like.id, Like.question_id, Like.user_id]),
+}
+
+
+def has_created_at(kind: str) -> bool:
+    model, _ = EXPORTS[kind]
+    return hasattr(model, "created_at")
+
+
+def _naive_utc(value: datetime) -> datetime:
+    # DB 의 DateTime 컬럼은 timezone 없는 UTC
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def export_query(kind: str, user_id: Optional[int] = None, since: Optional[datetime] = None, until: Optional[datetime] = None):
+    model, columns = EXPORTS[kind]
+    stmt = select(*columns)
+    if user_id is not None:
+        stmt = stmt.where(model.user_id == user_id)
+    if since is not None:
+        stmt = stmt.where(model.created_at >= _naive_utc(since))
+    if until is not None:
+        stmt = stmt.where(model.created_at < _naive_utc(until))
+    return stmt.order_by(model.id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+
+def column_names(kind: str):
+    return [column.key for column in EXPORTS[kind][1]]
+
+
+def _value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def encode(fmt: str, names, rows) -> str:
+    if fmt == "ndjson":
+        return "".join(
+            json.dumps({name: _value(value) for name, value in zip(names, row)}, ensure_ascii=False) + "\n"
+            for row in rows
+        )
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([_value(value) for value in row] for row in rows)
+    return buffer.getvalue()
+
+
+def _header(fmt: str, names) -> Optional[str]:
+    if fmt != "csv":
+        return None
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(names)
+    return buffer.getvalue()
+
+
+def iter_export(kind: str, fmt: str, **filters):
+    """sync 모드: StreamingResponse 가 스레드풀에서 한 배치씩 꺼내 간다."""
+    names = column_names(kind)
+    header = _header(fmt, names)
+    if header:
+        yield header
+    with SessionLocal() as db:
+        result = db.execute(export_query(kind, **filters))
+        for rows in result.partitions():
+            yield encode(fmt, names, rows)
+
+
+async def aiter_export(kind: str, fmt: str, **filters):
+    """async 모드: AsyncSession.stream 으로 같은 쿼리를 서버 측 커서로 읽는다."""
+    names = column_names(kind)
+    header = _header(fmt, names)
+    if header:
+        yield header
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(export_query(kind, **filters))
+        async for rows in result.partitions():
+            yield encode(fmt, names, rows)
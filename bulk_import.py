@@ -0,0 +1,287 @@
+"""질문/답변 대량 가져오기 (NDJSON / CSV).
+
+행을 하나씩 검증해서 BULK_CHUNK_SIZE 개씩 모은 뒤, 청크 하나를 한 번의 executemany INSERT
+(psycopg2 로 붙은 PostgreSQL 에서는 COPY) 와 한 번의 commit 으로 넣는다.
+crud.create_question 처럼 행마다 commit/refresh 를 하지 않는다.
+잘못된 행은 건너뛰고 줄 번호와 이유를 결과에 남긴다.
+
+    python -m bulk_import questions questions.ndjson
+    python -m bulk_import answers answers.csv --chunk-size 5000
+
+CSV 는 첫 줄이 헤더(title,content,user_id,created_at / content,question_id,user_id,created_at)다.
+"""
+import argparse
+import codecs
+import csv
+import io
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+from pydantic import ValidationError
+from sqlalchemy import String, insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from fragment_cache import fragment_cache
+from models import Answer, Question, User
+from ranking import hot_score, hot_scores
+import schemas
+import search
+
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "1000"))
+BULK_USE_COPY = os.getenv("BULK_USE_COPY", "1") == "1"
+MAX_REPORTED_ERRORS = 100
+
+FORMATS = ("ndjson", "csv")
+KINDS = {
+    "questions": (Question, schemas.QuestionImport),
+    "answers": (Answer, schemas.AnswerImport),
+}
+
+
+class RowParser:
+    """입력 줄을 (줄 번호, 행 dict 또는 에러 메시지) 로 바꾼다.
+
+    CSV 는 따옴표 안에 줄바꿈이 있으면 따옴표 짝이 맞을 때까지 다음 줄을 이어 붙인다.
+    """
+
+    def __init__(self, fmt: str):
+        self.fmt = fmt
+        self.line_no = 0
+        self.header = None
+        self._pending = []
+        self._start = 0
+
+    def feed(self, line: str):
+        self.line_no += 1
+        if self.fmt == "ndjson":
+            if not line.strip():
+                return None
+            try:
+                row = json.loads(line)
+            except ValueError as exc:
+                return self.line_no, f"invalid JSON: {exc}"
+            if not isinstance(row, dict):
+                return self.line_no, "expected a JSON object"
+            return self.line_no, row
+
+        if not self._pending:
+            self._start = self.line_no
+        self._pending.append(line)
+        record = "".join(self._pending)
+        if record.count('"') % 2:
+            return None
+        self._pending = []
+        if not record.strip():
+            return None
+        values = next(csv.reader([record]))
+        if self.header is None:
+            self.header = [value.strip() for value in values]
+            return None
+        if len(values) != len(self.header):
+            return self._start, f"expected {len(self.header)} columns, got {len(values)}"
+        # 빈 칸도 빈 문자열로 넘긴다. 헤더에 없는 컬럼만 빠진 값이다 (빈 칸 해석은 Importer.add)
+        return self._start, dict(zip(self.header, values))
+
+    def finish(self):
+        if self._pending:
+            self._pending = []
+            return self._start, "unterminated quoted field"
+        return None
+
+
+def _format_errors(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()
+    )
+
+
+class Importer:
+    """검증된 행을 모았다가 flush() 때 청크 하나를 한 트랜잭션으로 넣는다.
+
+    마지막 청크까지 넣은 뒤 invalidate() 를 한 번 불러 캐시와 검색 역색인을 비운다.
+    """
+
+    def __init__(self, kind: str, user_id: int = None, chunk_size: int = BULK_CHUNK_SIZE):
+        self.model, self.schema = KINDS[kind]
+        self.user_id = user_id  # 지정하면 모든 행의 작성자를 이 사용자로 한다
+        self.chunk_size = chunk_size
+        self.inserted = 0
+        self.failed = 0
+        self.errors = []
+        self._rows = []  # (줄 번호, 컬럼 값)
+        # 생략할 수 있는 컬럼(user_id, created_at)의 빈 칸은 값 없음으로 본다. 텍스트 컬럼의 빈 칸은 빈 문자열이다.
+        self._optional = {name for name, field in self.schema.model_fields.items() if not field.is_required()}
+
+    def _error(self, line_no: int, message: str, count: int = 1):
+        self.failed += count
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line_no, "error": message})
+
+    def add(self, line_no: int, row) -> bool:
+        """행 하나를 검증해서 쌓는다. 청크가 찼으면 True."""
+        if isinstance(row, str):
+            self._error(line_no, row)
+            return False
+        row = {key: None if value == "" and key in self._optional else value for key, value in row.items()}
+        if self.user_id is not None:
+            row = {**row, "user_id": self.user_id}
+        try:
+            values = self.schema.model_validate(row).model_dump()
+        except ValidationError as exc:
+            self._error(line_no, _format_errors(exc))
+            return False
+        if values["user_id"] is None:
+            self._error(line_no, "user_id: Field required")
+            return False
+        if values["created_at"] is None:
+            values["created_at"] = datetime.now(timezone.utc).replace(tzinfo=None)
+        elif values["created_at"].tzinfo is not None:
+            values["created_at"] = values["created_at"].astimezone(timezone.utc).replace(tzinfo=None)
+        if self.model is Question:
+            values["hot_score"] = hot_score(0, 0, values["created_at"])
+        self._rows.append((line_no, values))
+        return len(self._rows) >= self.chunk_size
+
+    def _check_references(self, db: Session, rows):
+        # 없는 사용자/질문을 가리키는 행은 청크 전체를 실패시키지 않도록 미리 걸러낸다
+        user_ids = {values["user_id"] for _, values in rows}
+        users = {user_id for (user_id,) in db.query(User.id).filter(User.id.in_(user_ids))}
+        questions = None
+        if self.model is Answer:
+            question_ids = {values["question_id"] for _, values in rows}
+            questions = {question_id for (question_id,) in db.query(Question.id).filter(Question.id.in_(question_ids))}
+
+        valid = []
+        for line_no, values in rows:
+            if values["user_id"] not in users:
+                self._error(line_no, f"user_id: user {values['user_id']} does not exist")
+            elif questions is not None and values["question_id"] not in questions:
+                self._error(line_no, f"question_id: question {values['question_id']} does not exist")
+            else:
+                valid.append((line_no, values))
+        return valid
+
+    def flush(self, db: Session):
+        rows, self._rows = self._rows, []
+        if not rows:
+            return
+        rows = self._check_references(db, rows)
+        if not rows:
+            db.rollback()
+            return
+        try:
+            _insert(db, self.model.__table__, [values for _, values in rows])
+            db.commit()
+        except SQLAlchemyError as exc:
+            db.rollback()
+            reason = getattr(exc, "orig", None) or exc
+            self._error(rows[0][0], f"chunk of {len(rows)} rows (lines {rows[0][0]}-{rows[-1][0]}) failed: {reason}", len(rows))
+            return
+        self.inserted += len(rows)
+        if self.model is Answer:
+            hot_scores.mark({values["question_id"] for _, values in rows})
+
+    def invalidate(self):
+        # 매퍼 이벤트를 거치지 않으므로 캐시와 검색 역색인은 직접 비운다 (가져오기 전체에 한 번)
+        if self.inserted:
+            fragment_cache.clear()
+            search.index.reset()
+
+    def result(self) -> dict:
+        return {"inserted": self.inserted, "failed": self.failed, "errors": self.errors}
+
+
+def _insert(db: Session, table, rows):
+    bind = db.get_bind()
+    if BULK_USE_COPY and bind.dialect.name == "postgresql" and bind.dialect.driver == "psycopg2":
+        _copy(db, table, rows)
+    else:
+        # 2.0 의 insertmanyvalues 로 여러 행짜리 INSERT ... VALUES 로 묶여 실행된다
+        db.execute(insert(table), rows)
+
+
+def _copy(db: Session, table, rows):
+    columns = list(rows[0])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for values in rows:
+        writer.writerow([values[column] for column in columns])
+    buffer.seek(0)
+
+    # csv 모듈은 빈 문자열을 따옴표 없이 쓰고, COPY 는 따옴표 없는 빈 값을 NULL 로 읽는다.
+    # 텍스트 컬럼은 FORCE_NOT_NULL 로 빈 문자열 그대로 넣는다 (NOT NULL 제약 위반 방지).
+    options = "FORMAT csv"
+    text_columns = [column for column in columns if isinstance(table.c[column].type, String)]
+    if text_columns:
+        options += f", FORCE_NOT_NULL ({', '.join(text_columns)})"
+
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH ({options})", buffer)
+    finally:
+        cursor.close()
+
+
+async def iter_lines(chunks):
+    """바이트 청크 스트림(request.stream())을 줄 단위 문자열로 바꾼다."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line + "\n"
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer
+
+
+def import_file(db: Session, kind: str, stream, fmt: str, chunk_size: int = BULK_CHUNK_SIZE) -> dict:
+    importer = Importer(kind, chunk_size=chunk_size)
+    parser = RowParser(fmt)
+    try:
+        for line in stream:
+            record = parser.feed(line)
+            if record is not None and importer.add(*record):
+                importer.flush(db)
+        record = parser.finish()
+        if record is not None:
+            importer.add(*record)
+        importer.flush(db)
+    finally:
+        importer.invalidate()
+    return importer.result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import questions or answers from NDJSON/CSV")
+    parser.add_argument("kind", choices=sorted(KINDS))
+    parser.add_argument("path", help="input file, - for stdin")
+    parser.add_argument("--format", choices=FORMATS, help="defaults to the file extension (ndjson)")
+    parser.add_argument("--chunk-size", type=int, default=BULK_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    fmt = args.format or ("csv" if args.path.endswith(".csv") else "ndjson")
+    if args.path == "-":
+        stream = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8-sig", newline="")
+    else:
+        stream = open(args.path, encoding="utf-8-sig", newline="")
+    with stream, SessionLocal() as db:
+        result = import_file(db, args.kind, stream, fmt, args.chunk_size)
+        # 앱의 주기 갱신이 없으므로 답변이 달린 질문의 hot 점수는 여기서 바로 갱신한다
+        hot_scores.refresh(db)
+
+    print(f"inserted={result['inserted']} failed={result['failed']}")
+    for error in result["errors"]:
+        print(f"line {error['line']}: {error['error']}", file=sys.stderr)
+    if len(result["errors"]) >= MAX_REPORTED_ERRORS:
+        print(f"(only the first {MAX_REPORTED_ERRORS} errors are shown)", file=sys.stderr)
+    sys.exit(1 if result["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
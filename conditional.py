@@ -0,0 +1,40 @@
+import hashlib
+
+from fastapi import Request, Response
+
+# 조건부 GET (ETag / If-None-Match)
+# 라우트는 먼저 가벼운 버전 조회(id, 시각, 개수만)로 ETag 를 만들고,
+# 클라이언트가 가진 버전과 같으면 본문을 읽거나 직렬화하지 않고 304 를 돌려준다.
+# ETag 는 약한 검증자(W/)다. 같은 버전이 gzip 으로도, 압축 없이도 나가므로 바이트 단위로 같다고 할 수 없다.
+# Last-Modified 는 보내지 않는다. 초 단위라 같은 초의 두 번째 쓰기를 놓치고,
+# 답변 삭제처럼 최신 시각이 뒤로 가는 변경은 If-Modified-Since 로 알아챌 수 없다.
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _opaque(tag: str) -> str:
+    # If-None-Match 는 약한 비교를 한다 (W/ 를 떼고 비교)
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = [_opaque(tag.strip()) for tag in if_none_match.split(",")]
+    return _opaque(etag) in tags
+
+
+def set_validators(response: Response, etag: str):
+    response.headers["ETag"] = etag
+
+
+def not_modified_response(etag: str) -> Response:
+    response = Response(status_code=304)
+    set_validators(response, etag)
+    return response
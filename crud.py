@@ -1,7 +1,58 @@
-from sqlalchemy.orm import Session
-from models import Question, User, Answer
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session, defer, undefer, joinedload, noload, selectinload
+from models import Question, User, Answer, Like, RevokedToken
+from pagination import Page, paginate
+import events
+from fragment_cache import fragment_cache
+from ranking import hot_scores, refresh_hot_scores
+from like_buffer import like_buffer
 import schemas
 
+# crud 함수는 모두 동기 Session 을 받는다.
+# 라우트에서는 database.run_db(db, crud.함수, ...) 로 호출해서 sync/async 모드 모두에서 쓴다.
+# 응답 직렬화는 세션 밖에서 일어나므로, 반환하는 객체는 응답에 필요한 관계까지 모두 로딩해 둔다.
+# 질문/답변/좋아요를 쓰는 함수는 commit 후 HTML 조각 캐시를 무효화한다.
+# 답변/좋아요는 commit 후 실시간 이벤트(events.hub)도 보낸다.
+
+# 유저 조회
+def get_user(db: Session, user_id: int):
+    return db.query(User).filter(User.id == user_id).first()
+
+def get_user_by_email(db: Session, email: str):
+    return db.query(User).filter(User.email == email).first()
+
+# 유저 생성
+def create_user(db: Session, username: str, email: str, password_hash: str):
+    db_user = User(username=username, email=email, password_hash=password_hash)
+    db.add(db_user)
+    db.commit()
+    db.refresh(db_user)
+    return db_user
+
+# 비밀번호 해시 교체 (로그인 시 재해시)
+# 그 사이 비밀번호가 바뀌었으면 덮어쓰지 않도록 기존 해시가 같을 때만 바꾼다.
+def update_password_hash(db: Session, user_id: int, old_hash: str, new_hash: str):
+    db.query(User).filter(User.id == user_id, User.password_hash == old_hash).update(
+        {User.password_hash: new_hash}, synchronize_session=False
+    )
+    db.commit()
+
+# 토큰 폐기 (로그아웃)
+# 만료된 폐기 행은 여기서만 지운다 (같은 commit, expires_at 인덱스로 찾는다).
+# 워커들의 주기 갱신(get_revoked_jtis)은 읽기만 한다.
+def revoke_token(db: Session, jti: str, expires_at: datetime):
+    db.query(RevokedToken).filter(RevokedToken.expires_at < datetime.utcnow()).delete(synchronize_session=False)
+    if db.get(RevokedToken, jti) is None:
+        db.add(RevokedToken(jti=jti, expires_at=expires_at))
+    db.commit()
+
+# 아직 만료되지 않은 폐기 토큰 id (읽기 전용)
+def get_revoked_jtis(db: Session):
+    now = datetime.utcnow()
+    return [jti for (jti,) in db.query(RevokedToken.jti).filter(RevokedToken.expires_at >= now)]
+
 # 질문 생성
 def create_question(db: Session, question: schemas.QuestionCreate, user_id: int):
     db_question = Question(
@@ -10,26 +61,140 @@ def create_question(db: Session, question: schemas.QuestionCreate, user_id: int)
         user_id=user_id
     )
     db.add(db_question)
+    db.flush()
+    refresh_hot_scores(db, [db_question.id])
     db.commit()
-    db.refresh(db_question)
-    return db_question
+    fragment_cache.invalidate_question(db_question.id)
+    return get_question(db, db_question.id)
 
-# 질문 전체 조회
-def get_questions(db: Session, skip: int = 0, limit: int = 10):
-    questions = db.query(Question).offset(skip).limit(limit).all()
-
-    for q in questions:
-        q.likes_count = len(q.likes)
+# 좋아요/답변 수를 같은 SELECT 안에서 함께 계산
+# 이미 세션에 있는 객체도 수를 다시 읽도록 populate_existing 을 건다 (아래 merge_pending_likes 가 값을 더하므로)
+def with_counts(query):
+    return query.options(undefer(Question.likes_count), undefer(Question.answers_count)).populate_existing()
 
+# 아직 DB 에 쓰지 않은 좋아요(like_buffer)를 좋아요 수에 더한다
+def merge_pending_likes(questions):
+    if like_buffer.enabled:
+        for question in questions:
+            question.likes_count += like_buffer.pending_count(question.id)
     return questions
 
+# API 의 희소 필드셋(fields=...)에 없는 작성자/본문은 DB 에서 읽지 않는다 (None 이면 전체)
+def field_options(model, fields=None):
+    if fields is None:
+        return [joinedload(model.user)]
+    options = [joinedload(model.user) if "user" in fields else noload(model.user)]
+    if "content" not in fields:
+        options.append(defer(model.content))
+    return options
+
+# 정렬 방식별 커서 키 (new: 최신순, hot: ranking.hot_score 순). 둘 다 복합 인덱스가 있다.
+SORT_KEYS = {
+    "new": [Question.created_at, Question.id],
+    "hot": [Question.hot_score, Question.id],
+}
+
+# 질문 전체 조회 (커서 페이지네이션)
+# pending=False 면 like_buffer 의 대기분을 더하지 않는다 (fragment_cache 에 넣을 HTML 용, like_buffer.py 참고)
+def get_questions(db: Session, cursor: Optional[str] = None, limit: int = 10, sort: str = "new", fields=None,
+                  pending: bool = True) -> Page:
+    query = with_counts(db.query(Question)).options(*field_options(Question, fields))
+    page = paginate(query, SORT_KEYS[sort], cursor=cursor, limit=limit, sort=sort)
+    if pending:
+        merge_pending_likes(page.items)
+    return page
+
+# 조건부 GET 용 버전 조회: 본문/작성자 없이 버전을 이루는 값만 읽는다
+VERSION_COLUMNS = (Question.id, Question.created_at, Question.updated_at, Question.likes_count, Question.answers_count)
+
+def _version(row):
+    return tuple(row) + (like_buffer.pending_count(row.id),)
+
+def get_questions_version(db: Session, cursor: Optional[str] = None, limit: int = 10, sort: str = "new"):
+    keys = SORT_KEYS[sort]
+    columns = VERSION_COLUMNS + tuple(key for key in keys if key not in VERSION_COLUMNS)
+    page = paginate(db.query(*columns), keys, cursor=cursor, limit=limit, sort=sort)
+    return [_version(row) for row in page.items]
+
+def get_question_version(db: Session, question_id: int):
+    row = db.query(*VERSION_COLUMNS).filter(Question.id == question_id).first()
+    return _version(row) if row else None
+
+def get_answers_version(db: Session, question_id: int):
+    row = (
+        db.query(
+            func.count(Answer.id),
+            func.max(Answer.id),
+            func.max(func.coalesce(Answer.updated_at, Answer.created_at)),
+        )
+        .filter(Answer.question_id == question_id)
+        .one()
+    )
+    return tuple(row)
+
 # 질문 단건 조회
-def get_question(db: Session, question_id: int):
-    q = db.query(Question).filter(Question.id == question_id).first()
-    if q:
-        q.likes_count = len(q.likes)
+def get_question(db: Session, question_id: int, fields=None):
+    question = (
+        with_counts(db.query(Question))
+        .options(*field_options(Question, fields))
+        .filter(Question.id == question_id)
+        .first()
+    )
+    if question is not None:
+        merge_pending_likes([question])
+    return question
+
+# 여러 질문 한 번에 조회 (id -> 질문). 작성자가 필요 없으면 user 는 읽지 않고 None 으로 둔다.
+def get_questions_by_ids(db: Session, question_ids, with_authors: bool = True):
+    user_option = joinedload(Question.user) if with_authors else noload(Question.user)
+    rows = (
+        with_counts(db.query(Question))
+        .options(user_option)
+        .filter(Question.id.in_(question_ids))
+        .all()
+    )
+    return {row.id: row for row in merge_pending_likes(rows)}
+
+# 질문 상세 페이지용 조회 (답변과 답변 작성자까지 함께 로딩)
+def get_question_detail(db: Session, question_id: int, pending: bool = True):
+    question = (
+        with_counts(db.query(Question))
+        .options(selectinload(Question.answers).joinedload(Answer.user))
+        .filter(Question.id == question_id)
+        .first()
+    )
+    if question is not None and pending:
+        merge_pending_likes([question])
+    return question
+
+# 내가 쓴 질문 한 건 (수정/삭제 권한 확인용)
+def get_user_question(db: Session, question_id: int, user_id: int):
+    return db.query(Question).filter(Question.id == question_id, Question.user_id == user_id).first()
+
+# 내가 쓴 질문 목록
+def get_questions_by_user(db: Session, user_id: int):
+    questions = (
+        with_counts(db.query(Question))
+        .options(joinedload(Question.user))
+        .filter(Question.user_id == user_id)
+        .all()
+    )
+    return merge_pending_likes(questions)
+
+# 질문 수정
+def update_question(db: Session, question: Question, title: str, content: str):
+    question.title = title
+    question.content = content
+    db.commit()
+    fragment_cache.invalidate_question(question.id)
+    return get_question(db, question.id)
 
-    return q
+# 질문 삭제
+def delete_question(db: Session, question: Question):
+    question_id = question.id
+    db.delete(question)
+    db.commit()
+    fragment_cache.invalidate_question(question_id)
 
 # 답변 생성
 def create_answer(db: Session, answer: schemas.AnswerCreate, question_id: int, user_id: int):
@@ -40,11 +205,72 @@ def create_answer(db: Session, answer: schemas.AnswerCreate, question_id: int, u
     )
     db.add(db_answer)
     db.commit()
-    db.refresh(db_answer)
+    hot_scores.mark([question_id])
+    fragment_cache.invalidate_question(question_id)
+    db_answer = (
+        db.query(Answer)
+        .options(joinedload(Answer.user))
+        .filter(Answer.id == db_answer.id)
+        .populate_existing()
+        .first()
+    )
+    events.hub.publish(events.answer_created(db_answer))
     return db_answer
 
-# 특정 질문의 답변 조회 
-def get_answers_by_question(db: Session, question_id: int):
-    return db.query(Answer).filter(Answer.question_id == question_id).all()
+# 특정 질문의 답변 조회
+def get_answers_by_question(db: Session, question_id: int, fields=None):
+    return (
+        db.query(Answer)
+        .options(*field_options(Answer, fields))
+        .filter(Answer.question_id == question_id)
+        .all()
+    )
+
+# 여러 질문의 답변을 한 번에 조회 (질문 id -> 답변 목록, 답변은 id 순)
+def get_answers_by_questions(db: Session, question_ids, with_authors: bool = True):
+    user_option = joinedload(Answer.user) if with_authors else noload(Answer.user)
+    rows = (
+        db.query(Answer)
+        .options(user_option)
+        .filter(Answer.question_id.in_(question_ids))
+        .order_by(Answer.question_id, Answer.id)
+        .populate_existing()
+        .all()
+    )
+    answers = {question_id: [] for question_id in question_ids}
+    for row in rows:
+        answers[row.question_id].append(row)
+    return answers
+
+# 내가 쓴 답변 목록 (답변이 달린 질문 제목까지 함께 로딩)
+def get_answers_by_user(db: Session, user_id: int):
+    return (
+        db.query(Answer)
+        .options(joinedload(Answer.user), joinedload(Answer.question))
+        .filter(Answer.user_id == user_id)
+        .all()
+    )
 
+# 좋아요 조회
+# LIKE_BUFFER 를 켜면 좋아요 라우트는 이 조회 없이 like_buffer.add() 로 쌓는다 (중복은 flush 가 거른다).
+def get_like(db: Session, user_id: int, question_id: int):
+    return db.query(Like).filter_by(user_id=user_id, question_id=question_id).first()
 
+# 좋아요 생성
+def create_like(db: Session, user_id: int, question_id: int):
+    like = Like(user_id=user_id, question_id=question_id)
+    db.add(like)
+    db.commit()
+    hot_scores.mark([question_id])
+    fragment_cache.invalidate_question(question_id)
+    events.hub.publish(events.likes_changed(question_id, 1))
+    return like
+
+# 좋아요 취소
+def delete_like(db: Session, like: Like):
+    question_id = like.question_id
+    db.delete(like)
+    db.commit()
+    hot_scores.mark([question_id])
+    fragment_cache.invalidate_question(question_id)
+    events.hub.publish(events.likes_changed(question_id, -1))
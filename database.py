@@ -1,10 +1,430 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.sql.dml import UpdateBase
+from starlette.concurrency import run_in_threadpool
+from contextvars import ContextVar
+import asyncio
+import logging
 import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL, echo=True)
-SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+# 커넥션 풀 / 엔진 설정 (환경변수)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # 초, -1 이면 사용 안 함
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))  # 0 이면 사용 안 함
+DB_ECHO = os.getenv("DB_ECHO", "0") == "1"
+
+# DB_ASYNC=1 이면 asyncpg/aiosqlite 드라이버로 AsyncSession 을 사용한다.
+# 요청이 DB 응답을 기다리는 동안 스레드풀 워커를 붙잡지 않는다.
+DB_ASYNC = os.getenv("DB_ASYNC", "0") == "1"
+
+# 읽기 전용 복제본 (쉼표로 구분, 비어 있으면 모든 요청이 primary 를 쓴다)
+# GET/HEAD 요청의 읽기는 복제본으로, 쓰기와 그 밖의 요청은 primary 로 보낸다.
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+DATABASE_REPLICA_WEIGHTS = [int(weight) for weight in os.getenv("DATABASE_REPLICA_WEIGHTS", "").split(",") if weight.strip()]
+DB_REPLICA_CHECK_INTERVAL = float(os.getenv("DB_REPLICA_CHECK_INTERVAL", "5"))  # 초
+DB_REPLICA_MAX_LAG = float(os.getenv("DB_REPLICA_MAX_LAG", "0"))  # 초, PostgreSQL 만, 0 이면 사용 안 함
+DB_PRIMARY_PIN_SECONDS = int(os.getenv("DB_PRIMARY_PIN_SECONDS", "5"))
+DB_PRIMARY_PIN_COOKIE = "db_primary"
+
+
+def to_async_url(url: str) -> str:
+    if url.startswith("postgres://"):
+        url = "postgresql://" + url[len("postgres://"):]
+    if url.startswith("postgresql://") or url.startswith("postgresql+psycopg2://"):
+        return "postgresql+asyncpg://" + url.split("://", 1)[1]
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url[len("sqlite://"):]
+    return url
+
+
+class PoolStats:
+    """커넥션 풀 checkout 횟수와 대기 시간 누적값."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_max": self.wait_seconds_max,
+            }
+
+
+class _TimedPoolMixin:
+    # 풀에서 커넥션을 얻기까지 기다린 시간을 잰다
+    stats: PoolStats
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except Exception:
+            self.stats.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.stats.record_wait(time.perf_counter() - start)
+        return conn
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _engine_options(url: str, is_async: bool = False) -> dict:
+    options = {"echo": DB_ECHO}
+    if url.startswith("sqlite"):
+        return options
+
+    options.update(
+        poolclass=TimedAsyncQueuePool if is_async else TimedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+    if DB_STATEMENT_TIMEOUT_MS > 0:
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+
+def _track_pool(sync_engine):
+    pool = sync_engine.pool
+    if not isinstance(pool, _TimedPoolMixin):
+        return
+    pool.stats = PoolStats()
+
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(dbapi_conn, record, proxy):
+        with pool.stats._lock:
+            pool.stats.checkouts += 1
+
+    @event.listens_for(pool, "checkin")
+    def _on_checkin(dbapi_conn, record):
+        with pool.stats._lock:
+            pool.stats.checkins += 1
+
+
+class Replica:
+    def __init__(self, url: str, weight: int = 1):
+        self.url = url
+        self.weight = weight
+        self.healthy = True
+        self.current_weight = 0
+        self.engine = create_engine(url, **_engine_options(url))
+        _track_pool(self.engine)
+        self.async_engine = None
+        if DB_ASYNC:
+            async_url = to_async_url(url)
+            self.async_engine = create_async_engine(async_url, **_engine_options(async_url, is_async=True))
+            _track_pool(self.async_engine.sync_engine)
+        # 요청 중에 연결이 끊기면 다음 헬스 체크까지 기다리지 않고 바로 뺀다
+        for eng in self.sync_engines():
+            event.listen(eng, "handle_error", self._on_error)
+
+    def sync_engines(self):
+        engines = [self.engine]
+        if self.async_engine is not None:
+            engines.append(self.async_engine.sync_engine)
+        return engines
+
+    def _on_error(self, context):
+        if context.is_disconnect and self.healthy:
+            self.healthy = False
+            logger.warning("replica %s disconnected, routing reads to other databases", self.engine.url)
+
+    def check(self) -> bool:
+        try:
+            with self.engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                if DB_REPLICA_MAX_LAG > 0 and conn.dialect.name == "postgresql":
+                    lag = conn.execute(text(
+                        "SELECT COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+                    )).scalar()
+                    return float(lag) <= DB_REPLICA_MAX_LAG
+            return True
+        except Exception:
+            return False
+
+
+class ReplicaSet:
+    """복제본 목록. 살아 있는 복제본 중에서 가중 라운드 로빈(smooth weighted round-robin)으로 고른다."""
+
+    def __init__(self, urls, weights):
+        self.replicas = [Replica(url, weights[i] if i < len(weights) else 1) for i, url in enumerate(urls)]
+        self._lock = threading.Lock()
+        self._task = None
+
+    def __bool__(self):
+        return bool(self.replicas)
+
+    def choose(self):
+        """다음 복제본. 살아 있는 복제본이 없으면 None (primary 를 쓴다)."""
+        with self._lock:
+            healthy = [replica for replica in self.replicas if replica.healthy and replica.weight > 0]
+            if not healthy:
+                return None
+            total = 0
+            best = None
+            for replica in healthy:
+                replica.current_weight += replica.weight
+                total += replica.weight
+                if best is None or replica.current_weight > best.current_weight:
+                    best = replica
+            best.current_weight -= total
+            return best
+
+    def check(self):
+        for replica in self.replicas:
+            healthy = replica.check()
+            if healthy != replica.healthy:
+                logger.warning("replica %s is now %s", replica.engine.url, "up" if healthy else "down")
+                replica.healthy = healthy
+
+    async def start(self):
+        if self.replicas:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await run_in_threadpool(self.check)
+            await asyncio.sleep(DB_REPLICA_CHECK_INTERVAL)
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def sync_engines(self):
+        return [eng for replica in self.replicas for eng in replica.sync_engines()]
+
+
+replicas = ReplicaSet(DATABASE_REPLICA_URLS, DATABASE_REPLICA_WEIGHTS)
+
+class RoutingState:
+    __slots__ = ("read_replica", "wrote")
+
+    def __init__(self, read_replica: bool):
+        self.read_replica = read_replica
+        self.wrote = False
+
+
+# 현재 요청의 라우팅 상태 (ReplicaRoutingMiddleware 가 만든다, 요청 밖에서는 None = primary)
+_routing: ContextVar = ContextVar("db_routing", default=None)
+
+
+def use_primary():
+    """읽은 값으로 바로 쓰는 GET 라우트(좋아요 등)에 dependencies 로 건다."""
+    state = _routing.get()
+    if state is not None:
+        state.read_replica = False
+
+
+def is_pinned(request) -> bool:
+    """최근에 DB 에 쓴 브라우저인지 (primary 고정 쿠키가 있는지)."""
+    return DB_PRIMARY_PIN_COOKIE in request.cookies
+
+
+def read_from_replica(db) -> bool:
+    """세션이 복제본에서 읽었는지. 복제 지연으로 옛 값일 수 있으므로 공유 캐시에 넣으면 안 된다."""
+    session = db.sync_session if isinstance(db, AsyncSession) else db
+    replica = getattr(session, "_replica", None)
+    return replica is not None and replica is not _UNSET
+
+
+_UNSET = object()
+
+
+class RoutingSession(Session):
+    """읽기 요청의 SELECT 를 복제본으로 보내는 세션.
+
+    첫 쿼리 때 복제본 하나를 골라 세션이 끝날 때까지 같은 복제본을 쓰고,
+    flush 나 INSERT/UPDATE/DELETE 가 한 번이라도 나가면 그 뒤로는 primary 만 쓴다 (자기 쓰기 읽기).
+    """
+
+    use_async_engine = False
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._replica = _UNSET
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or isinstance(clause, UpdateBase):
+            self._replica = None
+            state = _routing.get()
+            if state is not None:
+                state.wrote = True
+        elif self._replica is _UNSET:
+            state = _routing.get()
+            self._replica = replicas.choose() if state is not None and state.read_replica else None
+        if self._replica is None or self._replica is _UNSET:
+            return super().get_bind(mapper=mapper, clause=clause, **kw)
+        if self.use_async_engine:
+            return self._replica.async_engine.sync_engine
+        return self._replica.engine
+
+
+class AsyncRoutingSession(RoutingSession):
+    use_async_engine = True
+
+
+class ReplicaRoutingMiddleware:
+    """GET/HEAD 요청은 복제본에서 읽게 하고, DB 에 쓴 요청 뒤에는 primary 고정 쿠키를 붙인다.
+
+    쿠키가 있는 동안(DB_PRIMARY_PIN_SECONDS) 그 브라우저의 읽기도 primary 로 가서,
+    답변을 쓰고 상세 페이지로 리다이렉트되었을 때 복제 지연 때문에 답변이 안 보이는 일이 없다.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        pinned = False
+        for name, value in scope.get("headers") or []:
+            if name == b"cookie" and f"{DB_PRIMARY_PIN_COOKIE}=".encode() in value:
+                pinned = True
+                break
+        state = RoutingState(read_replica=scope["method"] in ("GET", "HEAD") and not pinned)
+        token = _routing.set(state)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and state.wrote:
+                cookie = f"{DB_PRIMARY_PIN_COOKIE}=1; Max-Age={DB_PRIMARY_PIN_SECONDS}; Path=/; HttpOnly; SameSite=Lax"
+                message = {**message, "headers": [*message.get("headers", []), (b"set-cookie", cookie.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _routing.reset(token)
+
+
+engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
+_track_pool(engine)
+# 응답 직렬화가 이벤트 루프에서 일어나므로 commit 후 속성을 만료시키지 않는다
+SessionLocal = sessionmaker(bind=engine, class_=RoutingSession, autocommit=False, autoflush=False, expire_on_commit=False)
+
+async_engine = None
+AsyncSessionLocal = None
+if DB_ASYNC:
+    ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or to_async_url(DATABASE_URL)
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **_engine_options(ASYNC_DATABASE_URL, is_async=True))
+    _track_pool(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine, sync_session_class=AsyncRoutingSession, autoflush=False, expire_on_commit=False
+    )
 
 Base = declarative_base()
+
+
+def all_sync_engines():
+    """이벤트 리스너(쿼리 예산, 지표)를 걸어야 하는 모든 엔진."""
+    engines = [engine]
+    if async_engine is not None:
+        engines.append(async_engine.sync_engine)
+    return engines + replicas.sync_engines()
+
+
+def pool_metrics() -> dict:
+    """엔진별 커넥션 풀 상태 (사용 중/유휴 커넥션 수, checkout 대기 시간)."""
+    engines = {"sync": engine}
+    if async_engine is not None:
+        engines["async"] = async_engine.sync_engine
+    for i, replica in enumerate(replicas.replicas):
+        engines[f"replica{i}"] = replica.engine
+        if replica.async_engine is not None:
+            engines[f"replica{i}_async"] = replica.async_engine.sync_engine
+
+    metrics = {}
+    for name, eng in engines.items():
+        pool = eng.pool
+        data = {"status": pool.status()}
+        if isinstance(pool, QueuePool):
+            data.update(
+                size=pool.size(),
+                checked_out=pool.checkedout(),
+                checked_in=pool.checkedin(),
+                overflow=pool.overflow(),
+            )
+        if isinstance(pool, _TimedPoolMixin):
+            data.update(pool.stats.snapshot())
+        metrics[name] = data
+    return metrics
+
+
+# DB 세션 의존성 (요청당 세션 하나)
+async def get_db():
+    if DB_ASYNC:
+        async with AsyncSessionLocal() as db:
+            yield db
+    else:
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+
+async def run_db_in_new_session(fn, *args, **kwargs):
+    """요청 세션과 별개의 새 세션에서 fn(session, ...) 을 실행한다 (백그라운드 작업용)."""
+    if DB_ASYNC:
+        async with AsyncSessionLocal() as db:
+            return await db.run_sync(fn, *args, **kwargs)
+
+    def _run():
+        with SessionLocal() as db:
+            return fn(db, *args, **kwargs)
+    return await run_in_threadpool(_run)
+
+
+async def run_db(db, fn, *args, **kwargs):
+    """crud 함수 fn(session, ...) 을 현재 모드에 맞게 실행한다.
+
+    async 모드에서는 AsyncSession.run_sync 로 이벤트 루프 위에서 실행하고,
+    sync 모드에서는 스레드풀에서 실행한다.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
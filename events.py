@@ -0,0 +1,202 @@
+import asyncio
+import json
+import logging
+import os
+import uuid
+from collections import defaultdict
+
+from database import DATABASE_URL
+
+# 실시간 이벤트 허브 (Server-Sent Events 용 프로세스 내 pub/sub)
+# 쓰기 경로(crud, like_buffer)가 commit 후 publish() 하면 "all" 토픽과 "question:{id}" 토픽의
+# 구독자 큐로 전달된다. publish() 는 스레드풀(sync 모드)에서도 불리므로 call_soon_threadsafe 로 넘긴다.
+# EVENTS_PG_BRIDGE=1 이면 PostgreSQL LISTEN/NOTIFY 로 다른 워커에도 전달한다.
+
+logger = logging.getLogger(__name__)
+
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "100"))
+EVENTS_MAX_SUBSCRIBERS = int(os.getenv("EVENTS_MAX_SUBSCRIBERS", "1000"))
+EVENTS_PG_BRIDGE = os.getenv("EVENTS_PG_BRIDGE", "0") == "1"
+EVENTS_CHANNEL = "qa_events"
+NOTIFY_MAX_BYTES = 7900  # NOTIFY payload 는 8000 바이트 미만
+
+WORKER_ID = uuid.uuid4().hex
+
+
+class TooManySubscribers(Exception):
+    pass
+
+
+class Subscription:
+    def __init__(self, hub, topic: str):
+        self.hub = hub
+        self.topic = topic
+        self.queue = asyncio.Queue(maxsize=EVENTS_QUEUE_SIZE)
+        self.dropped = 0
+
+    def put(self, event: dict):
+        # 느린 구독자 때문에 허브가 막히지 않도록 가장 오래된 이벤트를 버린다
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.hub.unsubscribe(self)
+
+
+class EventHub:
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._count = 0
+        self._loop = None
+        self._bridge = None
+        self.published = 0
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        if EVENTS_PG_BRIDGE and DATABASE_URL and DATABASE_URL.startswith("postgres"):
+            self._bridge = PgBridge(self)
+            await self._bridge.start()
+
+    async def stop(self):
+        if self._bridge is not None:
+            await self._bridge.stop()
+            self._bridge = None
+        self._loop = None
+
+    def full(self) -> bool:
+        return self._count >= EVENTS_MAX_SUBSCRIBERS
+
+    def subscribe(self, topic: str) -> Subscription:
+        if self.full():
+            raise TooManySubscribers()
+        subscription = Subscription(self, topic)
+        self._subscribers[topic].add(subscription)
+        self._count += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self._subscribers.get(subscription.topic)
+        if subscribers and subscription in subscribers:
+            subscribers.discard(subscription)
+            self._count -= 1
+            if not subscribers:
+                del self._subscribers[subscription.topic]
+
+    def publish(self, event: dict):
+        """어느 스레드에서든 부를 수 있다. 허브가 시작되지 않았으면(CLI 등) 무시한다."""
+        loop = self._loop
+        if loop is None:
+            return
+        event = {**event, "origin": WORKER_ID}
+        try:
+            loop.call_soon_threadsafe(self._publish, event)
+        except RuntimeError:
+            pass  # 루프가 이미 닫힘
+
+    def _publish(self, event: dict):
+        self.published += 1
+        self.dispatch(event)
+        if self._bridge is not None:
+            self._bridge.notify(event)
+
+    def dispatch(self, event: dict):
+        for topic in ("all", f"question:{event['question_id']}"):
+            for subscription in list(self._subscribers.get(topic, ())):
+                subscription.put(event)
+
+
+def _asyncpg_dsn(url: str) -> str:
+    return "postgresql://" + url.split("://", 1)[1]
+
+
+class PgBridge:
+    """워커 간 전달용 LISTEN/NOTIFY. 자기 워커가 보낸 이벤트(origin)는 이미 전달했으므로 건너뛴다."""
+
+    def __init__(self, hub: EventHub):
+        self.hub = hub
+        self._conn = None
+        self._task = None
+        self._send_lock = asyncio.Lock()  # asyncpg 연결 하나에서 쿼리는 한 번에 하나만
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        import asyncpg  # 브리지를 켤 때만 필요
+
+        while True:
+            try:
+                self._conn = await asyncpg.connect(_asyncpg_dsn(DATABASE_URL))
+                closed = asyncio.Event()
+                self._conn.add_termination_listener(lambda conn: closed.set())
+                await self._conn.add_listener(EVENTS_CHANNEL, self._on_notify)
+                await closed.wait()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("event bridge connection failed, retrying")
+            self._conn = None
+            await asyncio.sleep(1)
+
+    def _on_notify(self, conn, pid, channel, payload):
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            return
+        if event.get("origin") != WORKER_ID:
+            self.hub.dispatch(event)
+
+    def notify(self, event: dict):
+        conn = self._conn
+        if conn is None or conn.is_closed():
+            return
+        payload = json.dumps(event, ensure_ascii=False, default=str)
+        if len(payload.encode()) > NOTIFY_MAX_BYTES:
+            # 긴 답변은 본문 없이 보내고, 클라이언트가 새로 읽도록 표시한다
+            event = {key: value for key, value in event.items() if key != "answer"}
+            event["truncated"] = True
+            payload = json.dumps(event, default=str)
+        asyncio.create_task(self._send(conn, payload))
+
+    async def _send(self, conn, payload: str):
+        try:
+            async with self._send_lock:
+                await conn.execute("SELECT pg_notify($1, $2)", EVENTS_CHANNEL, payload)
+        except Exception:
+            logger.exception("event bridge notify failed")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._conn is not None and not self._conn.is_closed():
+            await self._conn.close()
+
+
+hub = EventHub()
+
+
+# 쓰기 경로에서 쓰는 이벤트 모양
+def answer_created(answer) -> dict:
+    return {
+        "type": "answer",
+        "question_id": answer.question_id,
+        "answer": {
+            "id": answer.id,
+            "content": answer.content,
+            "created_at": answer.created_at.isoformat() if answer.created_at else None,
+            "user": {"id": answer.user.id, "username": answer.user.username} if answer.user else None,
+        },
+    }
+
+
+def likes_changed(question_id: int, delta: int) -> dict:
+    return {"type": "like", "question_id": question_id, "delta": delta}
@@ -0,0 +1,69 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# 렌더링된 HTML 조각 캐시
+# 메인 목록(커서별)과 질문 상세 페이지의 본문 HTML 을 LRU 로 보관한다.
+# 질문/답변/좋아요를 쓰는 crud 함수가 commit 후 invalidate_question() 을 호출한다.
+# 캐시는 워커 프로세스마다 따로 있으므로, 다른 워커의 쓰기는 TTL 안에서만 늦게 반영된다.
+
+FRAGMENT_CACHE_SIZE = int(os.getenv("FRAGMENT_CACHE_SIZE", "1000"))
+FRAGMENT_CACHE_TTL = float(os.getenv("FRAGMENT_CACHE_TTL", "60"))  # 초, 0 이면 만료 없음
+
+
+class FragmentCache:
+    def __init__(self, maxsize: int = FRAGMENT_CACHE_SIZE, ttl: float = FRAGMENT_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        # 무효화할 때마다 올라가는 버전. 렌더링 도중 무효화가 끼어들면 그 결과는 저장하지 않는다.
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            expires_at, value = item
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, version: int):
+        with self._lock:
+            if version != self.version:
+                return
+            expires_at = time.monotonic() + self.ttl if self.ttl > 0 else None
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate_question(self, question_id: int):
+        self.invalidate_questions((question_id,))
+
+    def invalidate_questions(self, question_ids):
+        # 목록 페이지에도 제목/좋아요/답변 수가 나오므로 목록은 모두 지운다
+        with self._lock:
+            self.version += 1
+            for question_id in question_ids:
+                self._data.pop(("question", question_id), None)
+            for key in [k for k in self._data if k[0] == "index"]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self.version += 1
+            self._data.clear()
+
+
+fragment_cache = FragmentCache()
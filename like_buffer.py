@@ -0,0 +1,317 @@
+import asyncio
+import fcntl
+import glob
+import logging
+import os
+import threading
+import uuid
+from collections import Counter
+
+from sqlalchemy import delete, insert, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from database import run_db_in_new_session
+import events
+from fragment_cache import fragment_cache
+from models import Like, Question
+from ranking import hot_scores
+
+# 좋아요 write-behind 버퍼 (LIKE_BUFFER=1 일 때만 사용)
+# 좋아요 요청은 (user_id, question_id) 를 메모리에 쌓고 바로 응답하고,
+# 백그라운드 작업이 LIKE_FLUSH_INTERVAL 초마다 또는 LIKE_FLUSH_SIZE 개가 쌓이면
+# INSERT ... ON CONFLICT DO NOTHING 한 번과 commit 한 번으로 모아서 넣는다.
+# 아직 DB 에 없는 좋아요는 pending_count() 로 API 의 좋아요 수 조회에 더해진다.
+# 좋아요 라우트는 DB 를 조회하지 않는다. 중복은 버퍼(add 가 False)와 flush 의 ON CONFLICT DO NOTHING 이 거른다.
+# 이미 DB 에 있는 좋아요를 다시 누르면 flush 전까지 대기분으로 세고, flush 가 실제로 들어가지 않은 만큼
+# 좋아요 수 -1 이벤트를 보내 SSE 구독자의 수를 바로잡는다.
+# 대기분은 워커마다 따로 세므로, 워커끼리 공유되는 값처럼 캐시하면 안 된다. 그래서 HTML 조각
+# (fragment_cache)은 DB 에 들어간 좋아요만 세고, flush 가 commit 한 뒤에 해당 질문의 조각을 지운다.
+# 즉 HTML 페이지의 좋아요 수는 최대 LIKE_FLUSH_INTERVAL 초 늦게 반영된다 (SSE 로는 바로 전달된다).
+#
+# 프로세스가 죽어도 잃지 않도록 쌓은 좋아요를 워커별 저널 파일에 먼저 적는다.
+# 취소('-')도 insert 를 commit 하기 전에 저널에 적는다. 복구는 쌍마다 마지막 기록을 따라
+# '+' 면 넣고 '-' 면 DB 에서 지우므로, insert commit 과 취소분 delete 사이에 죽어도 취소를 잃지 않는다.
+# 저널은 flush 가 끝날 때마다 남은 대기분(추가와 취소)만으로 다시 쓰고, 시작할 때 주인 없는(flock 이 풀린)
+# 저널이 있으면 그 내용을 DB 에 반영하고 지운다.
+
+logger = logging.getLogger(__name__)
+
+LIKE_BUFFER = os.getenv("LIKE_BUFFER", "0") == "1"
+LIKE_FLUSH_INTERVAL = float(os.getenv("LIKE_FLUSH_INTERVAL", "1.0"))  # 초
+LIKE_FLUSH_SIZE = int(os.getenv("LIKE_FLUSH_SIZE", "500"))
+LIKE_JOURNAL_DIR = os.getenv("LIKE_JOURNAL_DIR", "like_journal")  # 빈 값이면 저널을 쓰지 않는다
+LIKE_JOURNAL_FSYNC = os.getenv("LIKE_JOURNAL_FSYNC", "0") == "1"
+
+
+def _insert_ignore(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return pg_insert(Like).on_conflict_do_nothing(index_elements=["user_id", "question_id"])
+    if dialect == "sqlite":
+        return sqlite_insert(Like).on_conflict_do_nothing(index_elements=["user_id", "question_id"])
+    return None
+
+
+def insert_likes(db: Session, pairs) -> set:
+    """(user_id, question_id) 묶음을 한 번에 넣는다. 이미 있는 좋아요와 삭제된 질문은 건너뛴다.
+
+    실제로 들어간 쌍을 돌려준다 (RETURNING 을 못 쓰는 DB 에서는 시도한 쌍 전부).
+    """
+    question_ids = {question_id for _, question_id in pairs}
+    existing = set(db.scalars(select(Question.id).where(Question.id.in_(question_ids))))
+    rows = [{"user_id": user_id, "question_id": question_id} for user_id, question_id in pairs if question_id in existing]
+    if not rows:
+        return set()
+    stmt = _insert_ignore(db)
+    if stmt is None:
+        # ON CONFLICT 를 지원하지 않는 DB 에서는 이미 있는 쌍을 먼저 걸러낸다
+        keys = [(row["user_id"], row["question_id"]) for row in rows]
+        found = set(db.execute(select(Like.user_id, Like.question_id).where(tuple_(Like.user_id, Like.question_id).in_(keys))))
+        rows = [row for row, key in zip(rows, keys) if key not in found]
+        stmt = insert(Like)
+    elif db.get_bind().dialect.insert_executemany_returning:
+        result = db.execute(stmt.returning(Like.user_id, Like.question_id), rows)
+        return {tuple(row) for row in result}
+    if rows:
+        db.execute(stmt, rows)
+    return {(row["user_id"], row["question_id"]) for row in rows}
+
+
+def delete_likes(db: Session, pairs):
+    db.execute(delete(Like).where(tuple_(Like.user_id, Like.question_id).in_(list(pairs))))
+
+
+class Journal:
+    """워커별 추가 전용 저널. 한 줄에 '+ user_id question_id' 또는 '- user_id question_id'."""
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.path = os.path.join(directory, f"likes-{os.getpid()}-{uuid.uuid4().hex[:8]}.journal")
+        self._file = open(self.path, "a")
+        fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    def write(self, op: str, user_id: int, question_id: int):
+        self._file.write(f"{op} {user_id} {question_id}\n")
+        self._file.flush()
+        if LIKE_JOURNAL_FSYNC:
+            os.fsync(self._file.fileno())
+
+    def rewrite(self, pairs, removals=()):
+        # 남은 대기분만으로 새 파일을 만든 뒤 원자적으로 바꾼다 (잠금은 새 파일로 옮긴다)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as tmp:
+            for user_id, question_id in removals:
+                tmp.write(f"- {user_id} {question_id}\n")
+            for user_id, question_id in pairs:
+                tmp.write(f"+ {user_id} {question_id}\n")
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        new_file = open(tmp_path, "a")
+        fcntl.flock(new_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        os.replace(tmp_path, self.path)
+        old_file, self._file = self._file, new_file
+        old_file.close()
+
+    def close(self, remove: bool):
+        if remove:
+            os.remove(self.path)
+        self._file.close()
+
+    def orphans(self):
+        """잠금이 풀린(죽은 워커의) 저널에서 아직 반영되지 않은 좋아요와 취소를 읽는다."""
+        for path in glob.glob(os.path.join(self.directory, "likes-*.journal")):
+            if path == self.path:
+                continue
+            with open(path) as file:
+                try:
+                    fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue  # 살아 있는 다른 워커의 저널
+                last = {}  # 쌍마다 마지막 기록
+                for line in file:
+                    parts = line.split()
+                    if len(parts) != 3:
+                        continue  # 쓰다 만 마지막 줄
+                    last[(int(parts[1]), int(parts[2]))] = parts[0]
+                pairs = {key for key, op in last.items() if op == "+"}
+                removals = {key for key, op in last.items() if op == "-"}
+                yield path, pairs, removals
+
+
+class LikeBuffer:
+    def __init__(self, enabled: bool = LIKE_BUFFER, flush_interval: float = LIKE_FLUSH_INTERVAL,
+                 flush_size: int = LIKE_FLUSH_SIZE, journal_dir: str = LIKE_JOURNAL_DIR):
+        self.enabled = enabled
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.journal_dir = journal_dir
+        self.journal = None
+        self._lock = threading.Lock()
+        self._pending = set()    # 아직 flush 하지 않은 좋아요
+        self._inflight = set()   # flush 중인 좋아요
+        self._cancelled = set()  # flush 중에 취소된 좋아요 (commit 후 지운다)
+        self._removals = set()   # 대기 중에 취소된 좋아요 (예전에 DB 에 들어갔을 수 있으므로 flush 때 지운다)
+        self._counts = Counter()  # question_id -> pending + inflight 개수
+        self._wakeup = None
+        self._task = None
+        self.flushed = 0
+
+    def add(self, user_id: int, question_id: int) -> bool:
+        """좋아요를 쌓는다. 이미 대기 중이면 False."""
+        key = (user_id, question_id)
+        with self._lock:
+            if key in self._pending or (key in self._inflight and key not in self._cancelled):
+                return False
+            if self.journal is not None:
+                self.journal.write("+", user_id, question_id)
+            if key in self._cancelled:
+                self._cancelled.discard(key)
+            else:
+                self._pending.add(key)
+                self._removals.discard(key)
+            self._counts[question_id] += 1
+            full = len(self._pending) >= self.flush_size
+        events.hub.publish(events.likes_changed(question_id, 1))
+        if full and self._wakeup is not None:
+            self._wakeup.set()
+        return True
+
+    def discard(self, user_id: int, question_id: int) -> bool:
+        """아직 DB 에 들어가지 않은 좋아요를 취소한다. 대기 중인 게 없으면 False.
+
+        다시 누른 좋아요였다면 DB 의 예전 좋아요도 flush 때 지운다.
+        """
+        key = (user_id, question_id)
+        with self._lock:
+            if key in self._pending:
+                self._pending.discard(key)
+                self._removals.add(key)
+            elif key in self._inflight and key not in self._cancelled:
+                self._cancelled.add(key)
+            else:
+                return False
+            if self.journal is not None:
+                self.journal.write("-", user_id, question_id)
+            self._counts[question_id] -= 1
+            if self._counts[question_id] <= 0:
+                del self._counts[question_id]
+        events.hub.publish(events.likes_changed(question_id, -1))
+        return True
+
+    def pending_count(self, question_id: int) -> int:
+        if not self._counts:
+            return 0
+        with self._lock:
+            return self._counts.get(question_id, 0)
+
+    def flush(self, db: Session):
+        with self._lock:
+            if not self._pending and not self._removals:
+                return
+            batch, self._pending = self._pending, set()
+            removals, self._removals = self._removals, set()
+            self._inflight = batch
+        try:
+            # 취소를 먼저 지워야 같은 쌍을 다시 누른 좋아요가 남는다
+            if removals:
+                delete_likes(db, removals)
+            inserted = insert_likes(db, batch) if batch else set()
+            db.commit()
+        except Exception:
+            db.rollback()
+            with self._lock:
+                # 실패한 묶음은 다음 flush 때 다시 시도한다 (저널에도 그대로 남아 있다)
+                self._pending |= batch - self._cancelled
+                self._removals |= removals - self._pending
+                self._cancelled.clear()
+                self._inflight = set()
+            raise
+
+        with self._lock:
+            cancelled, self._cancelled = self._cancelled & batch, set()
+            self._inflight = set()
+            for _, question_id in batch - cancelled:
+                self._counts[question_id] -= 1
+                if self._counts[question_id] <= 0:
+                    del self._counts[question_id]
+        if cancelled:
+            try:
+                delete_likes(db, cancelled)
+                db.commit()
+            except Exception:
+                db.rollback()
+                with self._lock:
+                    self._removals |= cancelled - self._pending
+                raise
+        # 이미 DB 에 있던 좋아요(다시 누름)는 대기분으로 셌으므로 SSE 구독자에게 되돌린다
+        for _, question_id in batch - cancelled - inserted:
+            events.hub.publish(events.likes_changed(question_id, -1))
+        question_ids = {question_id for _, question_id in batch | removals}
+        hot_scores.mark(question_ids)
+        fragment_cache.invalidate_questions(question_ids)
+        self.flushed += len(inserted - cancelled)
+        if self.journal is not None:
+            with self._lock:
+                self.journal.rewrite(self._pending, self._removals)
+
+    def recover(self, db: Session):
+        """죽은 워커가 남긴 저널을 DB 에 반영한다."""
+        for path, pairs, removals in self.journal.orphans():
+            if pairs or removals:
+                if removals:
+                    delete_likes(db, removals)
+                if pairs:
+                    insert_likes(db, pairs)
+                db.commit()
+                logger.info("recovered %d pending likes and %d unlikes from %s", len(pairs), len(removals), path)
+                question_ids = {question_id for _, question_id in pairs | removals}
+                hot_scores.mark(question_ids)
+                fragment_cache.invalidate_questions(question_ids)
+            os.remove(path)
+
+    async def start(self):
+        if not self.enabled:
+            return
+        if self.journal_dir:
+            self.journal = Journal(self.journal_dir)
+            await run_db_in_new_session(self.recover)
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await run_db_in_new_session(self.flush)
+            except Exception:
+                logger.exception("like flush failed, will retry")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        remaining = True
+        try:
+            await run_db_in_new_session(self.flush)
+            with self._lock:
+                remaining = bool(self._pending or self._removals)
+        finally:
+            if self.journal is not None:
+                # 다 넣었으면 저널을 지우고, 남았으면 다음 시작 때 복구하도록 둔다
+                self.journal.close(remove=not remaining)
+                self.journal = None
+
+
+like_buffer = LikeBuffer()
@@ -1,91 +1,217 @@
-from fastapi import FastAPI, Request, Depends, Form, Path
-from routers import questions, answers, users, likes
-from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, FastAPI, HTTPException, Request, Depends, Form, Path, Query
+from routers import questions, answers, users, likes, imports, exports, events as event_routes, metrics as metrics_routes, profiling as profiling_routes
 from sqlalchemy.orm import Session
-from fastapi.responses import RedirectResponse
+from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.routing import APIRoute
+from starlette.datastructures import Headers
+from starlette.routing import Match
 from starlette.status import HTTP_302_FOUND
+from markupsafe import Markup
 from models import User
-from auth.auth import create_access_token
-from auth.hashing import Hasher
+from auth.auth import authenticate_user, create_access_token
+from auth.hashing import Hasher, HasherOverloaded, hash_pool
 from auth.auth import get_current_user
+from auth.tokens import revocations, revoke
+from auth.user_cache import user_cache
 
-from database import SessionLocal
-from models import Question, Answer, Like
+from database import (
+    ReplicaRoutingMiddleware, all_sync_engines, get_db, is_pinned, read_from_replica, replicas, run_db, use_primary
+)
+from fragment_cache import fragment_cache
+from like_buffer import like_buffer
+from ranking import hot_scores
+from events import hub
+from query_budget import QueryBudgetMiddleware, instrument, query_budget
+from metrics import MetricsMiddleware, instrument_engine
+from templating import templates, warmup
+from negotiation import prefers_html
+from static_assets import static_files
+from serialization import GZIP_LEVEL, GZIP_MIN_SIZE, FastJSONResponse
+import profiling
+import crud
+import schemas
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warmup(templates.env)
+    await hash_pool.start()
+    await replicas.start()
+    await revocations.start()
+    user_cache.start()
+    await hub.start()
+    await hot_scores.start()
+    await like_buffer.start()
+    yield
+    await like_buffer.stop()
+    await hot_scores.stop()
+    await hub.stop()
+    user_cache.stop()
+    await revocations.stop()
+    await replicas.stop()
+    hash_pool.shutdown()
 
-# 정적 파일
-app.mount("/static", StaticFiles(directory="static"), name="static")
+# API 응답은 FastJSONResponse (serialization.py), GZIP_MIN_SIZE 이상이면 gzip 압축
+# (SSE 와 이미 압축된 정적 파일은 GZipMiddleware 가 건너뛴다)
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_SIZE, compresslevel=GZIP_LEVEL)
 
-# 템플릿 폴더
-templates = Jinja2Templates(directory="templates")
+# 비밀번호 해시 대기열이 가득 차면 기다리지 않고 바로 503
+@app.exception_handler(HasherOverloaded)
+async def hasher_overloaded_handler(request: Request, exc: HasherOverloaded):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please retry"},
+        headers={"Retry-After": "1"}
+    )
+
+# 요청당 SQL 실행 횟수 검사 (N+1 방지)
+for db_engine in all_sync_engines():
+    instrument(db_engine)
+app.add_middleware(QueryBudgetMiddleware)
+
+# 라우트별 응답 시간, 요청당 SQL 횟수/시간, 템플릿 렌더링 시간 (/metrics)
+for db_engine in all_sync_engines():
+    instrument_engine(db_engine)
+app.add_middleware(MetricsMiddleware)
+
+# 읽기 전용 복제본 라우팅 (DATABASE_REPLICA_URLS 가 있을 때만)
+if replicas:
+    app.add_middleware(ReplicaRoutingMiddleware)
+
+# 샘플링 프로파일러 (PROFILE_ENABLED=1 일 때만, 트레이스는 /admin/profiles)
+if profiling.PROFILE_ENABLED:
+    for db_engine in all_sync_engines():
+        profiling.instrument_engine(db_engine)
+    app.add_middleware(profiling.ProfilingMiddleware)
+
+# 정적 파일 (python -m static_assets 로 빌드한 해시 파일과 압축본, 빌드가 없으면 static/)
+app.mount("/static", static_files(), name="static")
 
-# DB 세션 의존성
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# HTML 페이지 라우트: Accept 가 text/html 을 JSON 보다 원할 때만 맞는다.
+# 그 밖의 요청은 같은 경로의 API 라우트로 넘어간다.
+class HTMLPageRoute(APIRoute):
+    def matches(self, scope):
+        match, child_scope = super().matches(scope)
+        if match is Match.FULL and not prefers_html(Headers(scope=scope).get("accept")):
+            return Match.NONE, {}
+        return match, child_scope
 
-@app.get("/questions/{question_id}")
-def question_detail(
+
+pages = APIRouter(route_class=HTMLPageRoute)
+
+# 질문 상세 (로그인 필요)
+# 본문 HTML 은 fragment_cache 에 질문 id 별로 저장되어, 캐시 적중 시 질문/답변을 DB 에서 조회하지 않는다.
+# 조각에는 사용자별 내용이 없으므로 누가 채운 캐시든 모두가 함께 쓴다 (로그인 메뉴는 바깥 템플릿이 매번 그린다).
+# 캐시에 넣는 HTML 의 좋아요 수는 DB 에 들어간 것만 센다 (like_buffer 대기분은 flush 후에 보인다).
+# 캐시를 채우는 조회는 primary 에서 한다. 복제본의 옛 값을 새 버전으로 캐시하면 방금 쓴 사람도
+# 리다이렉트 후에 그 캐시를 보게 된다. primary 고정 쿠키가 있으면 캐시를 보지 않는다.
+# 같은 URL 의 JSON API(routers/questions.py)와는 Accept 헤더로 나뉜다 (HTMLPageRoute)
+@pages.get("/questions/{question_id:int}", dependencies=[query_budget(3)], include_in_schema=False)
+async def question_detail(
     request: Request,
     question_id: int = Path(...),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    question = db.query(Question).filter(Question.id == question_id).first()
-    return templates.TemplateResponse("question_detail.html", {
-        "request": request,
-        "question": question
+    key = ("question", question_id)
+    pinned = is_pinned(request)
+    cached = None if pinned else fragment_cache.get(key)
+    if cached is None:
+        version = fragment_cache.version
+        use_primary()
+        question = await run_db(db, crud.get_question_detail, question_id, pending=False)
+        if question is None:
+            raise HTTPException(status_code=404, detail="Question not found")
+        html = templates.get_template("_question_detail.html").render(question=question)
+        cached = (question.title, html)
+        if not read_from_replica(db):
+            fragment_cache.set(key, cached, version)
+
+    title, html = cached
+    response = templates.TemplateResponse(request, "question_detail.html", {
+        "question_id": question_id,
+        "question_title": title,
+        "question_html": Markup(html)
     })
+    response.headers["Vary"] = "Accept"
+    return response
+
+app.include_router(pages)
 
 # API 라우터 등록
 app.include_router(questions.router)
 app.include_router(answers.router)
 app.include_router(users.router)
 app.include_router(likes.router)
+app.include_router(imports.router)
+app.include_router(exports.router)
+app.include_router(event_routes.router)
+app.include_router(metrics_routes.router)
+app.include_router(profiling_routes.router)
 
-# 메인 페이지 
-@app.get("/")
-def index(request: Request, db: Session = Depends(get_db)):
-    questions = db.query(Question).order_by(Question.created_at.desc()).all()
-    return templates.TemplateResponse("index.html", {"request": request, "questions": questions})
+# 메인 페이지 (목록 HTML 은 커서별로 fragment_cache 에 저장, 캐시 규칙은 질문 상세와 같다)
+@app.get("/", dependencies=[query_budget(1)])
+async def index(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    sort: str = Query("new", pattern="^(new|hot)$"),
+    db: Session = Depends(get_db)
+):
+    key = ("index", sort, cursor, limit)
+    html = None if is_pinned(request) else fragment_cache.get(key)
+    if html is None:
+        version = fragment_cache.version
+        use_primary()
+        page = await run_db(db, crud.get_questions, cursor=cursor, limit=limit, sort=sort, pending=False)
+        html = templates.get_template("_question_list.html").render(
+            questions=page.items,
+            next_cursor=page.next_cursor,
+            prev_cursor=page.prev_cursor,
+            limit=limit,
+            sort=sort
+        )
+        if not read_from_replica(db):
+            fragment_cache.set(key, html, version)
+
+    return templates.TemplateResponse(request, "index.html", {
+        "question_list": Markup(html)
+    })
 
 
 @app.get("/form-create-question")
 def show_form(request: Request):
-    return templates.TemplateResponse("create_question_test.html", {"request": request})
+    return templates.TemplateResponse(request, "create_question_test.html")
 
 @app.post("/form-create-question")
-def save_form(
+async def save_form(
     request: Request,
     title: str = Form(...),
     content: str = Form(...),
     db: Session = Depends(get_db)
 ):
-    question = Question(title=title, content=content, user_id=1)  # 임시 user_id
-    db.add(question)
-    db.commit()
+    question = schemas.QuestionCreate(title=title, content=content)
+    await run_db(db, crud.create_question, question, user_id=1)  # 임시 user_id
     return RedirectResponse(url="/", status_code=302)
 
 @app.get("/form-login")
 def login_form(request: Request):
-    return templates.TemplateResponse("login.html", {"request": request})
+    return templates.TemplateResponse(request, "login.html")
 
 @app.post("/form-login")
-def login_submit(
+async def login_submit(
     request: Request,
+    background_tasks: BackgroundTasks,
     username: str = Form(...),
     password: str = Form(...),
     db: Session = Depends(get_db)
 ):
-    user = db.query(User).filter(User.email == username).first()
-    if not user or not Hasher.verify_password(password, user.password_hash):
-        return templates.TemplateResponse("login.html", {
-            "request": request,
+    user = await authenticate_user(db, username, password, background_tasks)
+    if not user:
+        return templates.TemplateResponse(request, "login.html", {
             "error": "이메일 또는 비밀번호가 잘못되었습니다."
         })
 
@@ -96,10 +222,10 @@ def login_submit(
 
 @app.get("/form-signup")
 def signup_form(request: Request):
-    return templates.TemplateResponse("signup.html", {"request": request})
+    return templates.TemplateResponse(request, "signup.html")
 
 @app.post("/form-signup")
-def signup_submit(
+async def signup_submit(
     request: Request,
     username: str = Form(...),
     email: str = Form(...),
@@ -107,98 +233,90 @@ def signup_submit(
     db: Session = Depends(get_db)
 ):
     # 이메일 중복 확인
-    user = db.query(User).filter(User.email == email).first()
+    user = await run_db(db, crud.get_user_by_email, email)
     if user:
-        return templates.TemplateResponse("signup.html", {
-            "request": request,
+        return templates.TemplateResponse(request, "signup.html", {
             "error": "이미 존재하는 이메일입니다."
         })
 
-    new_user = User(
-        username=username,
-        email=email,
-        password_hash=Hasher.hash_password(password)
-    )
-    db.add(new_user)
-    db.commit()
+    password_hash = await Hasher.hash_password_async(password)
+    await run_db(db, crud.create_user, username=username, email=email, password_hash=password_hash)
     return RedirectResponse(url="/", status_code=302)
 
+# 로그아웃: 쿠키를 지우고 토큰도 폐기해서, 복사해 둔 토큰으로 다시 들어올 수 없게 한다
 @app.get("/logout")
-def logout():
+async def logout(request: Request, db: Session = Depends(get_db)):
+    token = request.cookies.get("access_token")
+    if token:
+        await run_db(db, revoke, token)
     response = RedirectResponse(url="/", status_code=302)
     response.delete_cookie("access_token")
     return response
 
 @app.get("/users/me")
-def read_my_page(request: Request, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    return templates.TemplateResponse("my_page.html", {
-        "request": request,
+def read_my_page(request: Request, current_user: User = Depends(get_current_user)):
+    return templates.TemplateResponse(request, "my_page.html", {
         "user": current_user
     })
 
-from auth.auth import get_current_user
-
 @app.get("/my-page")
 def my_page(request: Request, current_user: User = Depends(get_current_user)):
-    return templates.TemplateResponse("my_page.html", {
-        "request": request,
+    return templates.TemplateResponse(request, "my_page.html", {
         "user": current_user
     })
 
 # 내가 쓴 질문 보기
-@app.get("/my/questions")
-def my_questions(request: Request, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    questions = db.query(Question).filter(Question.user_id == current_user.id).all()
-    return templates.TemplateResponse("my_questions.html", {"request": request, "questions": questions})
+@app.get("/my/questions", dependencies=[query_budget(2)])
+async def my_questions(request: Request, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    questions = await run_db(db, crud.get_questions_by_user, user_id=current_user.id)
+    return templates.TemplateResponse(request, "my_questions.html", {"questions": questions})
 
 # 내가 쓴 답변 보기
-@app.get("/my/answers")
-def my_answers(request: Request, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    answers = db.query(Answer).filter(Answer.user_id == current_user.id).all()
-    return templates.TemplateResponse("my_answers.html", {"request": request, "answers": answers})
+@app.get("/my/answers", dependencies=[query_budget(2)])
+async def my_answers(request: Request, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    answers = await run_db(db, crud.get_answers_by_user, user_id=current_user.id)
+    return templates.TemplateResponse(request, "my_answers.html", {"answers": answers})
 
 # 질문 수정 폼
 @app.get("/questions/{question_id}/edit")
-def edit_question_form(question_id: int, request: Request, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    question = db.query(Question).filter(Question.id == question_id, Question.user_id == current_user.id).first()
+async def edit_question_form(question_id: int, request: Request, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    question = await run_db(db, crud.get_user_question, question_id, user_id=current_user.id)
     if not question:
         return RedirectResponse(url="/", status_code=HTTP_302_FOUND)
-    return templates.TemplateResponse("edit_question.html", {"request": request, "question": question})
+    return templates.TemplateResponse(request, "edit_question.html", {"question": question})
 
 # 질문 수정 처리
 @app.post("/questions/{question_id}/edit")
-def update_question(question_id: int, request: Request, title: str = Form(...), content: str = Form(...), db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    question = db.query(Question).filter(Question.id == question_id, Question.user_id == current_user.id).first()
+async def update_question(question_id: int, request: Request, title: str = Form(...), content: str = Form(...), db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    question = await run_db(db, crud.get_user_question, question_id, user_id=current_user.id)
     if question:
-        question.title = title
-        question.content = content
-        db.commit()
+        await run_db(db, crud.update_question, question, title=title, content=content)
     return RedirectResponse(url="/", status_code=HTTP_302_FOUND)
 
 # 질문 삭제
 @app.post("/questions/{question_id}/delete")
-def delete_question(question_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    question = db.query(Question).filter(Question.id == question_id, Question.user_id == current_user.id).first()
+async def delete_question(question_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    question = await run_db(db, crud.get_user_question, question_id, user_id=current_user.id)
     if question:
-        db.delete(question)
-        db.commit()
+        await run_db(db, crud.delete_question, question)
     return RedirectResponse(url="/", status_code=HTTP_302_FOUND)
 
 # 답변 작성 처리
 @app.post("/questions/{question_id}/answer")
-def create_answer(question_id: int, content: str = Form(...), db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    new_answer = Answer(content=content, question_id=question_id, user_id=current_user.id)
-    db.add(new_answer)
-    db.commit()
+async def create_answer(question_id: int, content: str = Form(...), db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    answer = schemas.AnswerCreate(content=content)
+    await run_db(db, crud.create_answer, answer, question_id=question_id, user_id=current_user.id)
     return RedirectResponse(url=f"/questions/{question_id}", status_code=HTTP_302_FOUND)
 
 # 좋아요 처리
-@app.get("/questions/{question_id}/like")
-def like_question(question_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    existing_like = db.query(Like).filter(Like.user_id == current_user.id, Like.question_id == question_id).first()
+@app.get("/questions/{question_id}/like", dependencies=[Depends(use_primary)])
+async def like_question(question_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    if like_buffer.enabled:
+        # DB 를 조회하지 않는다. 이미 누른 좋아요는 버퍼와 flush 의 ON CONFLICT DO NOTHING 이 거른다
+        like_buffer.add(current_user.id, question_id)
+        return RedirectResponse(url=f"/questions/{question_id}", status_code=HTTP_302_FOUND)
+
+    existing_like = await run_db(db, crud.get_like, user_id=current_user.id, question_id=question_id)
     if not existing_like:
-        new_like = Like(user_id=current_user.id, question_id=question_id)
-        db.add(new_like)
-        db.commit()
+        await run_db(db, crud.create_like, user_id=current_user.id, question_id=question_id)
     return RedirectResponse(url=f"/questions/{question_id}", status_code=HTTP_302_FOUND)
-
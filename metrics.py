@@ -0,0 +1,266 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from jinja2 import Template
+from sqlalchemy import event
+
+from auth.hashing import hash_pool
+from database import pool_metrics
+
+# 요청 단위 성능 지표 (Prometheus 텍스트 형식, /metrics)
+# - 라우트별 응답 시간 히스토그램
+# - 요청당 SQL 실행 횟수 / DB 시간 (before/after_cursor_execute 이벤트)
+# - 템플릿 렌더링 시간 (jinja2 Template.render)
+# - 비밀번호 해시 풀, 커넥션 풀 상태는 /metrics 를 읽을 때 스냅샷에서 만든다
+# METRICS_DEBUG_HEADERS=1 이면 응답에 X-Query-Count, Server-Timing 헤더를 붙인다.
+
+METRICS_DEBUG_HEADERS = os.getenv("METRICS_DEBUG_HEADERS", "0") == "1"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_labels(self.labelnames, key)} {value}"
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {}  # labels -> [버킷별 개수..., 합계, 개수]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            data = self._values.get(key)
+            if data is None:
+                data = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            if index < len(self.buckets):
+                data[index] += 1
+            data[-2] += value
+            data[-1] += 1
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            items = [(key, list(data)) for key, data in self._values.items()]
+        for key, data in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, data):
+                cumulative += count
+                le = 'le="%s"' % bound
+                yield f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}"
+            le = 'le="+Inf"'
+            yield f"{self.name}_bucket{_labels(self.labelnames, key, le)} {data[-1]}"
+            yield f"{self.name}_sum{_labels(self.labelnames, key)} {data[-2]}"
+            yield f"{self.name}_count{_labels(self.labelnames, key)} {data[-1]}"
+
+
+http_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route", "status")
+)
+db_statements = Histogram(
+    "db_statements_per_request", "SQL statements executed per request", ("route",), COUNT_BUCKETS
+)
+db_time = Histogram("db_time_per_request_seconds", "Time spent in SQL per request", ("route",))
+db_statements_total = Counter("db_statements_total", "SQL statements executed")
+template_time = Histogram("template_render_seconds", "Jinja2 template render time", ("template",))
+
+REGISTRY = [http_duration, db_statements, db_time, db_statements_total, template_time]
+
+
+class RequestStats:
+    __slots__ = ("statements", "db_seconds", "template_seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+
+
+_current: ContextVar = ContextVar("request_stats", default=None)
+
+
+def current_stats():
+    return _current.get()
+
+
+# SQL 실행 시간
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    db_statements_total.inc()
+    stats = _current.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += elapsed
+
+
+def _handle_error(context):
+    # 실패한 문장은 after_cursor_execute 가 불리지 않으므로 시작 시각만 버린다
+    starts = context.connection.info.get("query_start") if context.connection is not None else None
+    if starts:
+        starts.pop()
+
+
+def instrument_engine(engine):
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+# 템플릿 렌더링 시간 (TemplateResponse 와 get_template().render() 모두 Template.render 를 거친다)
+class TimedTemplate(Template):
+    def render(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().render(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            template_time.observe(elapsed, template=self.name or "<string>")
+            stats = _current.get()
+            if stats is not None:
+                stats.template_seconds += elapsed
+
+
+def instrument_templates(env):
+    env.template_class = TimedTemplate
+
+
+def _route_of(scope) -> str:
+    # 경로 그대로 쓰면 /questions/1, /questions/2 ... 로 라벨이 끝없이 늘어나므로 라우트 패턴을 쓴다
+    route = scope.get("route")
+    return getattr(route, "path", None) or "<unmatched>"
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if METRICS_DEBUG_HEADERS:
+                    total = (time.perf_counter() - start) * 1000
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-query-count", str(stats.statements).encode()))
+                    headers.append((b"server-timing", (
+                        f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.statements} queries", '
+                        f"tpl;dur={stats.template_seconds * 1000:.2f}, "
+                        f"total;dur={total:.2f}"
+                    ).encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            route = _route_of(scope)
+            http_duration.observe(time.perf_counter() - start, method=scope["method"], route=route, status=status)
+            db_statements.observe(stats.statements, route=route)
+            db_time.observe(stats.db_seconds, route=route)
+
+
+def _snapshot_lines():
+    hashing = hash_pool.snapshot()
+    yield "# HELP password_hash_seconds_total Time spent hashing/verifying passwords in the hash pool"
+    yield "# TYPE password_hash_seconds_total counter"
+    yield f"password_hash_seconds_total {hashing['hash_seconds_total']}"
+    yield "# HELP password_hash_queue_wait_seconds_total Time hash jobs waited for a pool worker"
+    yield "# TYPE password_hash_queue_wait_seconds_total counter"
+    yield f"password_hash_queue_wait_seconds_total {hashing['queue_wait_seconds_total']}"
+    yield "# HELP password_hash_completed_total Completed hash jobs"
+    yield "# TYPE password_hash_completed_total counter"
+    yield f"password_hash_completed_total {hashing['completed']}"
+    yield "# HELP password_hash_rejected_total Hash jobs rejected because the queue was full"
+    yield "# TYPE password_hash_rejected_total counter"
+    yield f"password_hash_rejected_total {hashing['rejected']}"
+    yield "# HELP password_hash_in_flight Hash jobs queued or running"
+    yield "# TYPE password_hash_in_flight gauge"
+    yield f"password_hash_in_flight {hashing['in_flight']}"
+
+    pools = pool_metrics()
+    gauges = {
+        "size": "db_pool_size",
+        "checked_out": "db_pool_checked_out",
+        "overflow": "db_pool_overflow",
+    }
+    counters = {
+        "checkouts": "db_pool_checkouts_total",
+        "timeouts": "db_pool_timeouts_total",
+        "wait_seconds_total": "db_pool_wait_seconds_total",
+    }
+    for key, name in gauges.items():
+        yield f"# TYPE {name} gauge"
+        for engine_name, data in pools.items():
+            if key in data:
+                yield f'{name}{{engine="{engine_name}"}} {data[key]}'
+    for key, name in counters.items():
+        yield f"# TYPE {name} counter"
+        for engine_name, data in pools.items():
+            if key in data:
+                yield f'{name}{{engine="{engine_name}"}} {data[key]}'
+
+
+def render() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    lines.extend(_snapshot_lines())
+    return "\n".join(lines) + "\n"
@@ -1,7 +1,19 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, func, UniqueConstraint
-from sqlalchemy.orm import relationship
+from sqlalchemy import Boolean, Column, Integer, Float, String, Text, ForeignKey, DateTime, false, func, UniqueConstraint, Index, select
+from sqlalchemy.orm import relationship, column_property, deferred
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.dialects.sqlite import DATETIME as SQLITE_DATETIME
 from database import Base
 
+# 전문 검색용 tsvector 컬럼 (PostgreSQL 트리거가 제목/본문/답변으로 채운다, 다른 DB 에서는 비어 있는 텍스트 컬럼)
+SearchVector = TSVECTOR().with_variant(Text(), "sqlite")
+
+# 작성/수정 시각. SQLite 는 시각을 문자열로 비교하므로, server_default(CURRENT_TIMESTAMP)와 같은
+# 초 단위 형식으로 저장해야 커서 비교((created_at, id) < (...))가 같은 초의 행을 제대로 가른다.
+Timestamp = DateTime().with_variant(
+    SQLITE_DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"),
+    "sqlite",
+)
+
 class User(Base):
     __tablename__ = "users"
 
@@ -9,6 +21,8 @@ class User(Base):
     username = Column(String(50), unique=True, nullable=False)
     email = Column(String(100), unique=True, nullable=False)
     password_hash = Column(String(128), nullable=False)
+    # 관리자 전용 API(대량 가져오기/내보내기) 권한, python -m auth.admin 으로 부여한다
+    is_admin = Column(Boolean, nullable=False, default=False, server_default=false())
 
     questions = relationship("Question", back_populates="user")
     answers = relationship("Answer", back_populates="user")
@@ -20,24 +34,35 @@ class Question(Base):
     id = Column(Integer, primary_key=True)
     title = Column(String(200), nullable=False)
     content = Column(Text, nullable=False)
-    created_at = Column(DateTime, server_default=func.now())
-    updated_at = Column(DateTime, onupdate=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
+    updated_at = Column(Timestamp, onupdate=func.now())
+    search_vector = deferred(Column(SearchVector))
+    # "hot" 정렬 점수 (ranking.py, 좋아요/답변이 바뀔 때 갱신)
+    hot_score = Column(Float, nullable=False, server_default="0")
 
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     user = relationship("User", back_populates="questions")
     answers = relationship("Answer", back_populates="question", cascade="all, delete-orphan")
     likes = relationship("Like", back_populates="question", cascade="all, delete-orphan")
 
+    # 최신순 / hot 순 커서 페이지네이션용 복합 인덱스
+    __table_args__ = (
+        Index('ix_questions_created_at_id', 'created_at', 'id'),
+        Index('ix_questions_hot_score_id', 'hot_score', 'id'),
+        # GIN 은 PostgreSQL 에만 만든다 (SQLite 에서는 쓸모없는 b-tree 가 될 뿐이다)
+        Index('ix_questions_search_vector', 'search_vector', postgresql_using='gin').ddl_if(dialect='postgresql'),
+    )
+
 class Answer(Base):
     __tablename__ = "answers"
 
     id = Column(Integer, primary_key=True)
     content = Column(Text, nullable=False)
-    created_at = Column(DateTime, server_default=func.now())
-    updated_at = Column(DateTime, onupdate=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
+    updated_at = Column(Timestamp, onupdate=func.now())
 
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    question_id = Column(Integer, ForeignKey("questions.id"), nullable=False)
+    question_id = Column(Integer, ForeignKey("questions.id"), nullable=False, index=True)
 
     user = relationship("User", back_populates='answers')
     question = relationship("Question", back_populates="answers")
@@ -47,10 +72,28 @@ class Like(Base):
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    question_id = Column(Integer, ForeignKey("questions.id"), nullable=False)
+    question_id = Column(Integer, ForeignKey("questions.id"), nullable=False, index=True)
 
     user = relationship("User", back_populates="likes")
     question = relationship("Question", back_populates="likes")
 
     __table_args__ = (UniqueConstraint('user_id', 'question_id', name='unique_like'),)
-     
\ No newline at end of file
+
+# 로그아웃으로 폐기된 토큰 (auth/tokens.py 가 주기적으로 읽어 메모리에 둔다)
+# 만료 시각이 지나면 토큰 자체가 무효라서 행을 지워도 된다.
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String(32), primary_key=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+# 좋아요/답변 수는 상관 서브쿼리로 목록 쿼리 안에서 함께 계산한다.
+# deferred 라서 필요한 쿼리에서만 undefer() 로 불러온다.
+Question.likes_count = column_property(
+    select(func.count(Like.id)).where(Like.question_id == Question.id).correlate_except(Like).scalar_subquery(),
+    deferred=True
+)
+Question.answers_count = column_property(
+    select(func.count(Answer.id)).where(Answer.question_id == Question.id).correlate_except(Answer).scalar_subquery(),
+    deferred=True
+)
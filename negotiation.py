@@ -0,0 +1,29 @@
+from typing import Dict, Optional
+
+# Accept / Accept-Encoding 헤더 파싱
+# "text/html,application/xml;q=0.9,*/*;q=0.8" -> {"text/html": 1.0, "application/xml": 0.9, "*/*": 0.8}
+
+
+def qvalues(header: Optional[str]) -> Dict[str, float]:
+    values = {}
+    for item in (header or "").split(","):
+        token, *params = [part.strip() for part in item.split(";")]
+        if not token:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        values[token.lower()] = q
+    return values
+
+
+def prefers_html(accept: Optional[str]) -> bool:
+    # 브라우저는 text/html 을 명시한다. */* 만 보내는 API 클라이언트(curl, httpx 기본값)는 JSON 을 받는다.
+    values = qvalues(accept)
+    html = values.get("text/html", 0.0)
+    return html > 0 and html > values.get("application/json", 0.0)
@@ -0,0 +1,104 @@
+import base64
+import json
+from datetime import datetime
+from typing import List, NamedTuple, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import literal, tuple_
+
+# 커서(keyset) 페이지네이션
+# 정렬 키 컬럼 값들을 불투명한 문자열로 인코딩해서 주고받는다.
+# OFFSET 과 달리 건너뛴 행을 스캔하지 않으므로 N 번째 페이지도 첫 페이지와 같은 비용이다.
+# 커서에는 정렬 이름도 넣어서, 다른 정렬의 커서를 받으면 엉뚱한 페이지 대신 400 을 돌려준다.
+
+NEXT = "n"
+PREV = "p"
+
+
+class Page(NamedTuple):
+    items: list
+    next_cursor: Optional[str]
+    prev_cursor: Optional[str]
+
+
+def _dump_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _load_value(value):
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(values, direction: str, sort: Optional[str] = None) -> str:
+    payload = {"v": [_dump_value(v) for v in values], "d": direction}
+    if sort is not None:
+        payload["s"] = sort
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int, sort: Optional[str] = None):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values = [_load_value(v) for v in payload["v"]]
+        direction = payload["d"]
+        cursor_sort = payload.get("s")
+    except (ValueError, KeyError, TypeError, AttributeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if len(values) != size or direction not in (NEXT, PREV):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if cursor_sort != sort:
+        raise HTTPException(status_code=400, detail="Cursor was issued for a different sort order")
+    return values, direction
+
+
+def paginate(query, keys: List, cursor: Optional[str] = None, limit: int = 10, sort: Optional[str] = None) -> Page:
+    """keys 컬럼들의 내림차순으로 query 를 한 페이지만 조회한다.
+
+    keys 는 (created_at, id) 처럼 마지막 컬럼이 유일한 조합이어야 한다.
+    sort 는 커서에 함께 넣는 정렬 이름이다 (같은 sort 로만 다음 페이지를 읽을 수 있다).
+    """
+    key_tuple = tuple_(*keys)
+    direction = NEXT
+    if cursor:
+        values, direction = decode_cursor(cursor, len(keys), sort)
+        # 커서 값은 컬럼 타입으로 바인딩한다 (DB 에 저장된 형식과 같게)
+        bound = tuple_(*[literal(value, key.type) for key, value in zip(keys, values)])
+        if direction == NEXT:
+            query = query.filter(key_tuple < bound)
+        else:
+            query = query.filter(key_tuple > bound)
+
+    if direction == NEXT:
+        query = query.order_by(*[k.desc() for k in keys])
+    else:
+        query = query.order_by(*[k.asc() for k in keys])
+
+    # 한 건 더 읽어서 다음(이전) 페이지가 있는지 확인
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if direction == PREV:
+        rows.reverse()
+
+    def key_of(row):
+        return [getattr(row, k.key) for k in keys]
+
+    next_cursor = prev_cursor = None
+    if rows:
+        if direction == NEXT:
+            if has_more:
+                next_cursor = encode_cursor(key_of(rows[-1]), NEXT, sort)
+            if cursor:
+                prev_cursor = encode_cursor(key_of(rows[0]), PREV, sort)
+        else:
+            if has_more:
+                prev_cursor = encode_cursor(key_of(rows[0]), PREV, sort)
+            next_cursor = encode_cursor(key_of(rows[-1]), NEXT, sort)
+
+    return Page(rows, next_cursor, prev_cursor)
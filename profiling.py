@@ -0,0 +1,274 @@
+"""운영 환경 요청 프로파일링 (PROFILE_ENABLED=1 일 때만 미들웨어를 건다).
+
+프로파일을 뜨는 요청:
+- PROFILE_SAMPLE_RATE 비율로 무작위 샘플링한 요청
+- 서명된 X-Profile 헤더가 붙은 요청 (python -m profiling sign 으로 만든다)
+프로파일은 요청이 도는 동안 이벤트 루프 스레드를 cProfile(또는 pyinstrument)로 기록한다.
+한 번에 한 요청만 프로파일하고, 그동안 같은 루프에서 돈 다른 요청도 함께 잡힐 수 있다.
+sync 모드의 crud 는 스레드풀에서 돌기 때문에 cProfile 에는 대기 시간으로만 보이고,
+대신 함께 기록되는 SQL 문장과 실행 시간으로 본다.
+
+PROFILE_SLOW_MS 를 넘은 요청은 샘플링되지 않았어도 SQL 목록과 시간만 담은 트레이스를 남긴다.
+트레이스는 PROFILE_DIR 에 JSON 으로 저장하고, 최근 PROFILE_MAX_TRACES 개만 남긴다(링 버퍼).
+/admin/profiles 에서 목록과 내용을 볼 수 있다 (Authorization: Bearer PROFILE_ADMIN_TOKEN).
+
+    python -m profiling sign --ttl 600
+"""
+import argparse
+import cProfile
+import hashlib
+import hmac
+import io
+import json
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+from sqlalchemy import event
+from starlette.concurrency import run_in_threadpool
+
+PROFILE_ENABLED = os.getenv("PROFILE_ENABLED", "0") == "1"
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0.0"))
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "0"))  # 0 이면 사용 안 함
+PROFILE_ENGINE = os.getenv("PROFILE_ENGINE", "cprofile")  # cprofile | pyinstrument
+PROFILE_SECRET = os.getenv("PROFILE_SECRET", "")
+PROFILE_ADMIN_TOKEN = os.getenv("PROFILE_ADMIN_TOKEN", "")
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_MAX_TRACES = int(os.getenv("PROFILE_MAX_TRACES", "100"))
+PROFILE_MAX_STATEMENTS = 200
+PROFILE_TOP_FUNCTIONS = 60
+
+TRACE_ID_RE = re.compile(r"^[0-9]{8}T[0-9]{12}-[0-9a-f]{8}$")
+
+
+# 서명된 X-Profile 헤더: "<만료 unix 시각>.<hmac-sha256 hex>"
+def sign_profile_token(ttl: int = 600, secret: str = PROFILE_SECRET) -> str:
+    expires = str(int(time.time()) + ttl)
+    digest = hmac.new(secret.encode(), expires.encode(), hashlib.sha256).hexdigest()
+    return f"{expires}.{digest}"
+
+
+def verify_profile_token(token: str, secret: str = PROFILE_SECRET) -> bool:
+    # 헤더는 latin-1 로 풀리므로 아무 문자나 올 수 있다 (compare_digest 는 ASCII 가 아닌 str 에 TypeError)
+    if not secret or not token or "." not in token or not token.isascii():
+        return False
+    expires, digest = token.split(".", 1)
+    expected = hmac.new(secret.encode(), expires.encode(), hashlib.sha256).hexdigest()
+    if not hmac.compare_digest(digest.encode(), expected.encode()):
+        return False
+    return expires.isdigit() and int(expires) >= time.time()
+
+
+class Trace:
+    __slots__ = ("statements", "truncated")
+
+    def __init__(self):
+        self.statements = []
+        self.truncated = 0
+
+
+_current: ContextVar = ContextVar("profile_trace", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("profile_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    trace = _current.get()
+    starts = conn.info.get("profile_start")
+    if trace is None or not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    if len(trace.statements) < PROFILE_MAX_STATEMENTS:
+        trace.statements.append({"sql": statement, "ms": round(elapsed * 1000, 3), "executemany": executemany})
+    else:
+        trace.truncated += 1
+
+
+def _handle_error(context):
+    starts = context.connection.info.get("profile_start") if context.connection is not None else None
+    if starts:
+        starts.pop()
+
+
+def instrument_engine(engine):
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+class _CProfiler:
+    def __init__(self):
+        self._profile = cProfile.Profile()
+
+    def start(self):
+        self._profile.enable()
+
+    def stop(self) -> str:
+        self._profile.disable()
+        out = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=out)
+        stats.sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+        return out.getvalue()
+
+
+class _PyinstrumentProfiler:
+    def __init__(self):
+        from pyinstrument import Profiler  # 선택 의존성
+
+        self._profiler = Profiler(async_mode="enabled")
+
+    def start(self):
+        self._profiler.start()
+
+    def stop(self) -> str:
+        self._profiler.stop()
+        return self._profiler.output_text(unicode=True)
+
+
+def _new_profiler():
+    if PROFILE_ENGINE == "pyinstrument":
+        return _PyinstrumentProfiler()
+    return _CProfiler()
+
+
+class TraceStore:
+    """PROFILE_DIR 아래 JSON 파일로 된 링 버퍼. 파일 이름이 시각 순이라 이름순 = 시간순이다."""
+
+    def __init__(self, directory: str = PROFILE_DIR, max_traces: int = PROFILE_MAX_TRACES):
+        self.directory = directory
+        self.max_traces = max_traces
+        self._lock = threading.Lock()
+
+    def _path(self, trace_id: str) -> str:
+        return os.path.join(self.directory, f"{trace_id}.json")
+
+    def save(self, data: dict):
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self._path(data["id"]), "w") as file:
+                json.dump(data, file)
+            names = sorted(name for name in os.listdir(self.directory) if name.endswith(".json"))
+            for name in names[:-self.max_traces]:
+                os.remove(os.path.join(self.directory, name))
+
+    def list(self):
+        if not os.path.isdir(self.directory):
+            return []
+        items = []
+        for name in sorted(os.listdir(self.directory), reverse=True):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, name)) as file:
+                    data = json.load(file)
+            except (OSError, ValueError):
+                continue
+            items.append({key: data[key] for key in ("id", "time", "method", "path", "status", "duration_ms", "reason")})
+            items[-1]["statements"] = len(data["sql"])
+        return items
+
+    def get(self, trace_id: str):
+        if not TRACE_ID_RE.match(trace_id):
+            return None
+        try:
+            with open(self._path(trace_id)) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+
+store = TraceStore()
+_profile_lock = threading.Lock()
+
+
+class ProfilingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        reason = None
+        headers = dict(scope.get("headers") or [])
+        if verify_profile_token(headers.get(b"x-profile", b"").decode("latin-1")):
+            reason = "header"
+        elif PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+            reason = "sampled"
+
+        profiler = None
+        if reason is not None and _profile_lock.acquire(blocking=False):
+            profiler = _new_profiler()
+        elif reason is not None:
+            reason = None  # 다른 요청을 프로파일 중
+
+        trace = Trace()
+        token = _current.set(trace)
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        profile_text = None
+        try:
+            if profiler is not None:
+                profiler.start()
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                if profiler is not None:
+                    profile_text = profiler.stop()
+                    _profile_lock.release()
+        finally:
+            _current.reset(token)
+            duration_ms = (time.perf_counter() - start) * 1000
+            if reason is None and PROFILE_SLOW_MS and duration_ms >= PROFILE_SLOW_MS:
+                reason = "slow"
+            if reason is not None:
+                now = datetime.now(timezone.utc)
+                data = {
+                    "id": f"{now:%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}",
+                    "time": now.isoformat(),
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "query": scope.get("query_string", b"").decode("latin-1"),
+                    "status": status,
+                    "duration_ms": round(duration_ms, 3),
+                    "reason": reason,
+                    "sql": trace.statements,
+                    "sql_truncated": trace.truncated,
+                    "sql_ms": round(sum(item["ms"] for item in trace.statements), 3),
+                    "profile": profile_text,
+                }
+                await run_in_threadpool(store.save, data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profiling helpers")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sign = sub.add_parser("sign", help="print a signed X-Profile header value")
+    sign.add_argument("--ttl", type=int, default=600, help="seconds the token stays valid")
+    args = parser.parse_args()
+
+    if args.command == "sign":
+        if not PROFILE_SECRET:
+            raise SystemExit("PROFILE_SECRET is not set")
+        print(sign_profile_token(args.ttl))
+
+
+if __name__ == "__main__":
+    main()
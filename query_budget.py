@@ -0,0 +1,101 @@
+import logging
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from fastapi import Depends
+from sqlalchemy import event
+
+# 요청당 SQL 실행 횟수 예산(query budget)
+# 라우트에 dependencies=[query_budget(n)] 으로 예산을 선언해 두면, 요청 하나가 실행한
+# SQL 문 개수가 예산을 넘는지 미들웨어가 검사한다. N+1 쿼리가 다시 생기는 것을 막기 위한 장치로,
+# QUERY_BUDGET_ENFORCE=1 (테스트 모드)이면 예외를 던지고 아니면 경고 로그만 남긴다.
+
+logger = logging.getLogger(__name__)
+
+enforce = os.getenv("QUERY_BUDGET_ENFORCE", "0") == "1"
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryCounter:
+    def __init__(self):
+        self.statements = []
+        self.budget = None
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+_current: ContextVar = ContextVar("query_counter", default=None)
+
+
+def current_counter():
+    return _current.get()
+
+
+@contextmanager
+def uncounted():
+    """캐시 워밍업처럼 요청과 무관한 1회성 쿼리를 예산에서 제외한다."""
+    token = _current.set(None)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    counter = _current.get()
+    if counter is not None:
+        counter.statements.append(statement)
+
+
+def instrument(engine):
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+
+
+def query_budget(limit: int):
+    def set_budget():
+        counter = _current.get()
+        if counter is not None:
+            counter.budget = limit
+    return Depends(set_budget)
+
+
+class QueryBudgetMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        counter = QueryCounter()
+        token = _current.set(counter)
+
+        async def send_wrapper(message):
+            # 응답을 보내기 시작하는 시점에는 핸들러의 쿼리가 모두 끝나 있다
+            if message["type"] == "http.response.start":
+                _check(scope, counter)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+
+
+def _check(scope, counter: QueryCounter):
+    if counter.budget is None or counter.count <= counter.budget:
+        return
+    message = (
+        f"{scope['method']} {scope['path']} ran {counter.count} SQL statements "
+        f"(budget {counter.budget})"
+    )
+    if enforce:
+        raise QueryBudgetExceeded(message + ":\n" + "\n".join(counter.statements))
+    logger.warning(message)
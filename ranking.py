@@ -0,0 +1,152 @@
+import argparse
+import asyncio
+import logging
+import math
+import os
+import threading
+from datetime import datetime
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.orm import Session
+
+from database import SessionLocal, run_db_in_new_session
+from fragment_cache import fragment_cache
+from models import Answer, Like, Question
+
+# "hot" 정렬 점수 (reddit 방식)
+# score = log10(max(좋아요 + 답변 * HOT_ANSWER_WEIGHT, 1)) + (작성 시각 - HOT_EPOCH) / HOT_DECAY_SECONDS
+# 시간 감쇠를 "새 글일수록 기본 점수가 높다"로 바꿔 두었기 때문에, 점수는 좋아요/답변이 바뀔 때만
+# 다시 계산하면 되고 시간이 흐른다고 전체를 다시 계산할 필요가 없다.
+# 점수는 questions.hot_score 에 저장하고 (hot_score, id) 인덱스를 역순으로 읽어서 정렬한다.
+# HOT_DECAY_SECONDS(기본 12.5 시간)마다 좋아요/답변 가중합 10배와 같은 가치다.
+#
+# 좋아요/답변을 쓰는 요청은 점수를 직접 고치지 않고, commit 후 hot_scores.mark() 로 질문 id 만 남긴다.
+# HotScoreRefresher 가 HOT_REFRESH_INTERVAL 초마다 모인 질문들의 수를 다시 세서 한 번에 갱신한다.
+# - 인기 질문 행을 좋아요마다 UPDATE 하지 않는다 (행 잠금 경합 없음)
+# - 다시 세는 시점이 쓰기 commit 뒤이므로, 동시에 들어온 좋아요가 서로의 수를 못 봐서 점수가 어긋나는 일이 없다
+# 점수는 최대 HOT_REFRESH_INTERVAL 초 늦게 반영된다. 가중치를 바꿨으면 python -m ranking 으로 전체를 다시 계산한다.
+
+logger = logging.getLogger(__name__)
+
+HOT_EPOCH = datetime(2024, 1, 1)
+HOT_DECAY_SECONDS = float(os.getenv("HOT_DECAY_SECONDS", "45000"))
+HOT_ANSWER_WEIGHT = float(os.getenv("HOT_ANSWER_WEIGHT", "2"))
+HOT_REFRESH_INTERVAL = float(os.getenv("HOT_REFRESH_INTERVAL", "2"))  # 초
+
+
+def hot_score(likes: int, answers: int, created_at: datetime) -> float:
+    weight = max(likes + answers * HOT_ANSWER_WEIGHT, 1)
+    age = (created_at - HOT_EPOCH).total_seconds()
+    return round(math.log10(weight) + age / HOT_DECAY_SECONDS, 7)
+
+
+def refresh_hot_scores(db: Session, question_ids):
+    """질문들의 점수를 현재 좋아요/답변 수로 다시 계산한다 (commit 은 호출한 쪽에서)."""
+    question_ids = set(question_ids)
+    if not question_ids:
+        return
+    likes = select(func.count(Like.id)).where(Like.question_id == Question.id).scalar_subquery()
+    answers = select(func.count(Answer.id)).where(Answer.question_id == Question.id).scalar_subquery()
+    rows = db.execute(
+        select(Question.id, Question.created_at, likes, answers)
+        .where(Question.id.in_(question_ids))
+    ).all()
+    if rows:
+        # updated_at = updated_at 으로 onupdate=now() 를 막는다 (읽어 둔 값을 쓰면 그 사이의 수정을 되돌린다)
+        stmt = (
+            update(Question.__table__)
+            .where(Question.__table__.c.id == bindparam("question_id"))
+            .values(hot_score=bindparam("score"), updated_at=Question.__table__.c.updated_at)
+        )
+        db.connection().execute(
+            stmt,
+            [{"question_id": question_id, "score": hot_score(like_count, answer_count, created_at)}
+             for question_id, created_at, like_count, answer_count in rows],
+        )
+
+
+class HotScoreRefresher:
+    """점수를 다시 계산할 질문 id 를 모아 두었다가 주기적으로 한 번에 갱신한다."""
+
+    def __init__(self, interval: float = HOT_REFRESH_INTERVAL):
+        self.interval = interval
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._task = None
+        self.refreshed = 0
+
+    def mark(self, question_ids):
+        """좋아요/답변이 바뀐 질문들. 쓰기를 commit 한 뒤에 부른다."""
+        with self._lock:
+            self._dirty.update(question_ids)
+
+    def refresh(self, db: Session) -> int:
+        with self._lock:
+            question_ids, self._dirty = self._dirty, set()
+        if not question_ids:
+            return 0
+        try:
+            refresh_hot_scores(db, question_ids)
+            db.commit()
+        except Exception:
+            db.rollback()
+            with self._lock:
+                self._dirty |= question_ids
+            raise
+        # hot 정렬 목록 조각의 순서가 바뀌었을 수 있다
+        fragment_cache.invalidate_questions(question_ids)
+        self.refreshed += len(question_ids)
+        return len(question_ids)
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await run_db_in_new_session(self.refresh)
+            except Exception:
+                logger.exception("hot score refresh failed, will retry")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await run_db_in_new_session(self.refresh)
+
+
+hot_scores = HotScoreRefresher()
+
+
+def rebuild(db: Session, batch_size: int = 1000) -> int:
+    """모든 질문의 점수를 다시 계산한다 (가중치/감쇠 설정을 바꾼 뒤, 또는 워커가 죽어 갱신을 놓쳤을 때)."""
+    total = 0
+    last_id = 0
+    while True:
+        ids = db.scalars(
+            select(Question.id).where(Question.id > last_id).order_by(Question.id).limit(batch_size)
+        ).all()
+        if not ids:
+            return total
+        refresh_hot_scores(db, ids)
+        db.commit()
+        total += len(ids)
+        last_id = ids[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute questions.hot_score for every question")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    with SessionLocal() as db:
+        print(f"{rebuild(db, args.batch_size)} questions rescored")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,50 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 import models
 import schemas, crud
-from database import SessionLocal
-from typing import List
+from database import get_db, run_db
+from typing import List, Optional
 from auth.auth import get_current_user
+from conditional import is_not_modified, make_etag, not_modified_response, set_validators
+from query_budget import query_budget
+from serialization import fields_key, parse_fields, sparse_response
 
 router = APIRouter(prefix="/questions/{question_id}/answers", tags=["Answers"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.post("/", response_model=schemas.Answer)
-def create_answer(
+async def create_answer(
     question_id: int, 
     answer: schemas.AnswerCreate, 
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
     ):
-    # 임시 user_id
-    return crud.create_answer(
-        db=db, 
+    return await run_db(
+        db,
+        crud.create_answer,
         answer=answer, 
         question_id=question_id, 
         user_id=current_user.id
         )
 
-@router.get("/", response_model=List[schemas.Answer])
-def read_answers(question_id: int, db: Session = Depends(get_db)):
-    return crud.get_answers_by_question(db, question_id=question_id)
+# 답변 목록 (ETag 조건부 GET, fields= 로 필요한 필드만)
+# ETag 에는 개수, 최대 id, 최신 수정 시각이 모두 들어가므로 같은 초의 수정이나 삭제도 구분된다.
+@router.get("/", response_model=List[schemas.Answer], dependencies=[query_budget(2)])
+async def read_answers(
+    question_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    selected = parse_fields(schemas.Answer, fields)
+    count, max_id, last_modified = await run_db(db, crud.get_answers_version, question_id)
+    etag = make_etag("answers", question_id, fields_key(selected), count, max_id, last_modified)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
+    answers = await run_db(db, crud.get_answers_by_question, question_id=question_id, fields=selected)
+    set_validators(response, etag)
+    if selected:
+        return sparse_response(response, schemas.Answer, answers, selected)
+    return answers
 
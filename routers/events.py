@@ -0,0 +1,51 @@
+import asyncio
+import json
+import os
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from events import TooManySubscribers, hub
+
+router = APIRouter(tags=["Events"])
+
+EVENTS_HEARTBEAT = float(os.getenv("EVENTS_HEARTBEAT", "15"))  # 초
+
+# Server-Sent Events 스트림 (DB 를 읽지 않는다)
+# 새 답변은 event: answer, 좋아요 증감은 event: like (delta) 로 보낸다.
+# 연결이 살아 있는지 확인하고 프록시가 끊지 않도록 EVENTS_HEARTBEAT 초마다 주석 줄을 보낸다.
+# 구독은 스트림을 읽기 시작할 때 한다. 응답을 만들고 보내지 못한 경우(미들웨어 오류, 연결 끊김)에는
+# 생성기가 시작되지 않아 구독도 없으므로 풀어 줄 것이 없다. 시작된 뒤에는 async with 가 푼다.
+async def event_stream(request: Request, topic: str):
+    if hub.full():
+        raise HTTPException(status_code=503, detail="Too many event subscribers", headers={"Retry-After": "5"})
+
+    async def stream():
+        yield "retry: 3000\n\n"
+        try:
+            subscription = hub.subscribe(topic)
+        except TooManySubscribers:
+            return  # 확인한 뒤에 자리가 찼다. 클라이언트는 retry 뒤에 다시 붙는다
+        async with subscription:
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=EVENTS_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                data = json.dumps(event, ensure_ascii=False, default=str)
+                yield f"event: {event['type']}\ndata: {data}\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# 전체 피드
+@router.get("/events")
+async def all_events(request: Request):
+    return await event_stream(request, "all")
+
+# 질문 하나의 이벤트
+@router.get("/questions/{question_id}/events")
+async def question_events(question_id: int, request: Request):
+    return await event_stream(request, f"question:{question_id}")
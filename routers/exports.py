@@ -0,0 +1,34 @@
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Path, Query
+from fastapi.responses import StreamingResponse
+from database import DB_ASYNC
+from auth.auth import require_admin
+from bulk_export import MEDIA_TYPES, aiter_export, has_created_at, iter_export
+import models
+
+router = APIRouter(prefix="/export", tags=["Export"])
+
+# 내보내기: /export/questions, /export/answers, /export/likes (관리자만)
+# user_id 로 작성자, since/until 로 작성 시각 [since, until) 범위를 거른다 (좋아요는 시각이 없어 user_id 만)
+@router.get("/{kind}")
+async def export(
+    kind: str = Path(..., pattern="^(questions|answers|likes)$"),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    user_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    current_user: models.User = Depends(require_admin)
+):
+    filters = {"user_id": user_id}
+    if since is not None or until is not None:
+        if not has_created_at(kind):
+            raise HTTPException(status_code=400, detail=f"{kind} cannot be filtered by date")
+        filters.update(since=since, until=until)
+
+    rows = aiter_export(kind, format, **filters) if DB_ASYNC else iter_export(kind, format, **filters)
+    return StreamingResponse(
+        rows,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{kind}.{format}"'}
+    )
@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.orm import Session
+from database import get_db, run_db
+from auth.auth import require_admin
+from bulk_import import Importer, RowParser, iter_lines
+import models, schemas
+
+router = APIRouter(prefix="/import", tags=["Import"])
+
+# 요청 본문(NDJSON 또는 CSV)을 스트리밍으로 읽으면서 청크 단위로 넣는다.
+# 관리자만 쓸 수 있고, 작성자는 로그인한 관리자로 고정한다.
+async def import_stream(request: Request, kind: str, fmt: str, db: Session, user_id: int):
+    importer = Importer(kind, user_id=user_id)
+    parser = RowParser(fmt)
+    # 중간에 실패하거나 연결이 끊겨도 이미 넣은 청크만큼은 캐시를 비운다
+    try:
+        try:
+            async for line in iter_lines(request.stream()):
+                record = parser.feed(line)
+                if record is not None and importer.add(*record):
+                    await run_db(db, importer.flush)
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail=f"Body is not valid UTF-8 (after line {parser.line_no})")
+        record = parser.finish()
+        if record is not None:
+            importer.add(*record)
+        await run_db(db, importer.flush)
+    finally:
+        importer.invalidate()
+    return importer.result()
+
+# 질문 대량 생성
+@router.post("/questions", response_model=schemas.ImportResult)
+async def import_questions(
+    request: Request,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(require_admin)
+):
+    return await import_stream(request, "questions", format, db, current_user.id)
+
+# 답변 대량 생성
+@router.post("/answers", response_model=schemas.ImportResult)
+async def import_answers(
+    request: Request,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(require_admin)
+):
+    return await import_stream(request, "answers", format, db, current_user.id)
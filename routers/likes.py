@@ -1,52 +1,49 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from database import SessionLocal
+from database import get_db, run_db
 from auth.auth import get_current_user
+from like_buffer import like_buffer
 import models 
+import crud
 
 router = APIRouter(prefix="/questions", tags=["Likes"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 # 질문 좋아요
 @router.post("/{question_id}/like")
-def like_question(
+async def like_question(
     question_id: int, 
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    # 중복 좋아요 방지
-    existing = db.query(models.Like).filter_by(
-        user_id=current_user.id, question_id=question_id
-    ).first()
+    # LIKE_BUFFER 가 켜져 있으면 INSERT/commit 은 모아서 나중에 한다.
+    # DB 는 조회하지 않으므로 400 은 버퍼에 대기 중인 중복에만 낸다.
+    # 이미 DB 에 있는 좋아요는 flush 의 ON CONFLICT DO NOTHING 이 건너뛴다.
+    if like_buffer.enabled:
+        if not like_buffer.add(current_user.id, question_id):
+            raise HTTPException(status_code=400, detail="Already liked")
+        return {"message": "Liked"}
 
+    # 중복 좋아요 방지
+    existing = await run_db(db, crud.get_like, user_id=current_user.id, question_id=question_id)
     if existing:
         raise HTTPException(status_code=400, detail="Already liked")
-    
-    like = models.Like(user_id=current_user.id, question_id=question_id)
-    db.add(like)
-    db.commit()
+    await run_db(db, crud.create_like, user_id=current_user.id, question_id=question_id)
     return {"message": "Liked"}
 
 # 좋아요 취소
 @router.post("/{question_id}/unlike")
-def unlike_question(
+async def unlike_question(
     question_id: int,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    existing = db.query(models.Like).filter_by(
-        user_id=current_user.id, question_id=question_id
-    ).first()
+    # 아직 DB 에 쓰지 않은 좋아요는 버퍼에서만 지운다
+    if like_buffer.enabled and like_buffer.discard(current_user.id, question_id):
+        return {"message": "Unliked"}
+    existing = await run_db(db, crud.get_like, user_id=current_user.id, question_id=question_id)
 
     if not existing:
         raise HTTPException(status_code=404, detail="Like not found")
     
-    db.delete(existing)
-    db.commit()
+    await run_db(db, crud.delete_like, existing)
     return {"message": "Unliked"}
@@ -0,0 +1,23 @@
+import hmac
+import os
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+import metrics
+
+router = APIRouter(tags=["Metrics"])
+
+# METRICS_TOKEN 을 설정하면 Authorization: Bearer <token> 이 있어야 읽을 수 있다.
+# 토큰이 없으면 기본은 막는다(404). 수집기만 닿는 내부망에서는 METRICS_PUBLIC=1 로 토큰 없이 연다.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+METRICS_PUBLIC = os.getenv("METRICS_PUBLIC", "0") == "1"
+
+# Prometheus 수집용
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def read_metrics(authorization: str = Header("")):
+    if METRICS_TOKEN:
+        # 토큰 길이/앞부분이 응답 시간으로 드러나지 않도록 상수 시간 비교
+        if not hmac.compare_digest(authorization.encode(), f"Bearer {METRICS_TOKEN}".encode()):
+            raise HTTPException(status_code=401, detail="Invalid metrics token")
+    elif not METRICS_PUBLIC:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,32 @@
+import hmac
+
+from fastapi import APIRouter, Header, HTTPException
+import profiling
+
+router = APIRouter(prefix="/admin/profiles", tags=["Profiling"])
+
+
+# PROFILE_ADMIN_TOKEN 이 없으면 엔드포인트 자체를 숨긴다
+def check_admin(authorization: str):
+    if not profiling.PROFILE_ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    # 상수 시간 비교 (바이트로 바꿔서 비교하므로 ASCII 가 아닌 헤더도 401 이 된다)
+    if not hmac.compare_digest(authorization.encode(), f"Bearer {profiling.PROFILE_ADMIN_TOKEN}".encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+# 저장된 트레이스 목록 (최신순)
+@router.get("", include_in_schema=False)
+def list_profiles(authorization: str = Header("")):
+    check_admin(authorization)
+    return profiling.store.list()
+
+
+# 트레이스 하나 (SQL 목록 + 프로파일 결과)
+@router.get("/{trace_id}", include_in_schema=False)
+def read_profile(trace_id: str, authorization: str = Header("")):
+    check_admin(authorization)
+    data = profiling.store.get(trace_id)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    return data
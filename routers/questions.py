@@ -1,75 +1,175 @@
-from fastapi import APIRouter, Depends, HTTPException, Path
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 import models
-import schemas, crud
-from database import SessionLocal
+import schemas, crud, search
+from database import get_db, run_db
 from auth.auth import get_current_user
+from conditional import is_not_modified, make_etag, not_modified_response, set_validators
+from query_budget import query_budget
+from serialization import fields_key, parse_fields, sparse_response
 
 router = APIRouter(prefix="/questions", tags=["Questions"])
 
-# DB 세션 의존성
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 # 질문 생성
 @router.post("/", response_model=schemas.Question)
-def create_question(
+async def create_question(
     question: schemas.QuestionCreate, 
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
     ):
-    return crud.create_question(db=db, question=question, user_id=current_user.id)
+    return await run_db(db, crud.create_question, question=question, user_id=current_user.id)
+
+# 다음/이전 페이지 커서는 X-Next-Cursor / X-Prev-Cursor 헤더와 Link 헤더로 내려준다.
+def set_page_headers(request: Request, response: Response, page, limit: int):
+    links = []
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+        url = request.url.include_query_params(cursor=page.next_cursor, limit=limit)
+        links.append(f'<{url}>; rel="next"')
+    if page.prev_cursor:
+        response.headers["X-Prev-Cursor"] = page.prev_cursor
+        url = request.url.include_query_params(cursor=page.prev_cursor, limit=limit)
+        links.append(f'<{url}>; rel="prev"')
+    if links:
+        response.headers["Link"] = ", ".join(links)
+
+# 질문 전체 조회 (리스트, sort=new 최신순 / sort=hot 인기순)
+# 좋아요 수에는 수정 시각이 없으므로 질문 API 는 ETag(If-None-Match)로만 검증한다.
+# fields=id,title,likes_count 처럼 필요한 필드만 받을 수 있다 (user/content 를 빼면 DB 에서도 읽지 않음).
+# 예전 skip(offset) 파라미터는 없어졌다. skip=0 은 첫 페이지와 같으므로 받아 주고, 그 외에는 400 으로 cursor 를 안내한다.
+@router.get("/", response_model=List[schemas.Question], dependencies=[query_budget(2)])
+async def read_questions(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=100),
+    sort: str = Query("new", pattern="^(new|hot)$"),
+    fields: Optional[str] = None,
+    skip: Optional[int] = Query(None, deprecated=True, description="Removed: use cursor"),
+    db: Session = Depends(get_db)
+):
+    if skip:
+        raise HTTPException(
+            status_code=400,
+            detail="skip is no longer supported; follow the cursor from the X-Next-Cursor or Link header instead"
+        )
+    selected = parse_fields(schemas.Question, fields)
+    version = await run_db(db, crud.get_questions_version, cursor=cursor, limit=limit, sort=sort)
+    etag = make_etag("questions", sort, cursor, limit, fields_key(selected), version)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
+    page = await run_db(db, crud.get_questions, cursor=cursor, limit=limit, sort=sort, fields=selected)
+    set_page_headers(request, response, page, limit)
+    set_validators(response, etag)
+    if selected:
+        return sparse_response(response, schemas.Question, page.items, selected)
+    return page.items
+
+# 질문/답변 검색 (관련도순)
+@router.get("/search", response_model=List[schemas.Question], dependencies=[query_budget(2)])
+async def search_questions(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    cursor: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=100),
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    selected = parse_fields(schemas.Question, fields)
+    page = await run_db(db, search.search_questions, q, cursor=cursor, limit=limit, fields=selected)
+    set_page_headers(request, response, page, limit)
+    if selected:
+        return sparse_response(response, schemas.Question, page.items, selected)
+    return page.items
+
+# 여러 질문 한 번에 조회
+# 질문 1번 + (include_answers 면) 답변 1번, id 개수와 상관없이 쿼리 수가 고정이다.
+# 결과는 요청한 id 순서(중복 제거)를 따르고, 없는 id 는 found=false 로 표시한다.
+@router.post("/batch", response_model=List[schemas.QuestionBatchItem], dependencies=[query_budget(2)])
+async def read_questions_batch(batch: schemas.QuestionBatchRequest, db: Session = Depends(get_db)):
+    ids = list(dict.fromkeys(batch.ids))
+
+    def load(db: Session):
+        questions = crud.get_questions_by_ids(db, ids, with_authors=batch.include_authors)
+        answers = None
+        if batch.include_answers and questions:
+            answers = crud.get_answers_by_questions(db, list(questions), with_authors=batch.include_authors)
+        return questions, answers
 
-# 질문 전체 조회 (리스트)
-@router.get("/", response_model=List[schemas.Question])
-def read_questions(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
-    return crud.get_questions(db, skip=skip, limit=limit)
+    questions, answers = await run_db(db, load)
+    items = []
+    for question_id in ids:
+        question = questions.get(question_id)
+        item = schemas.QuestionBatchItem(id=question_id, found=question is not None)
+        if question is not None:
+            item.question = schemas.BatchQuestion.model_validate(question, from_attributes=True)
+            if answers is not None:
+                item.answers = [
+                    schemas.BatchAnswer.model_validate(answer, from_attributes=True)
+                    for answer in answers[question_id]
+                ]
+        items.append(item)
+    return items
 
 # 질문 하나 조회
-@router.get("/{question_id}", response_model=schemas.Question)
-def read_question(question_id: int, db: Session = Depends(get_db)):
-    db_question = crud.get_question(db, question_id=question_id)
+@router.get("/{question_id}", response_model=schemas.Question, dependencies=[query_budget(2)])
+async def read_question(
+    question_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    selected = parse_fields(schemas.Question, fields)
+    version = await run_db(db, crud.get_question_version, question_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Question not found")
+    etag = make_etag("question", fields_key(selected), version)
+    if is_not_modified(request, etag):
+        not_modified = not_modified_response(etag)
+        not_modified.headers["Vary"] = "Accept"
+        return not_modified
+
+    db_question = await run_db(db, crud.get_question, question_id=question_id, fields=selected)
     if db_question is None:
         raise HTTPException(status_code=404, detail="Question not found")
+    set_validators(response, etag)
+    # 같은 URL 이 브라우저에는 HTML 페이지를 준다 (main.py HTMLPageRoute)
+    response.headers["Vary"] = "Accept"
+    if selected:
+        return sparse_response(response, schemas.Question, db_question, selected, many=False)
     return db_question
 
 @router.put("/{question_id}", response_model=schemas.Question)
-def update_question(
+async def update_question(
     question_id: int = Path(...), 
     updated: schemas.QuestionCreate = ..., # 수정할 데이터
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    question = crud.get_question(db, question_id)
+    question = await run_db(db, crud.get_question, question_id)
     if not question:
         raise HTTPException(status_code=404, detail="Question not found")
     if question.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="You can only update your own questions")
     
     # 수정 내용 반영
-    question.title = updated.title
-    question.content = updated.content
-    db.commit()
-    db.refresh(question)
-    return question
+    return await run_db(db, crud.update_question, question, title=updated.title, content=updated.content)
 
 @router.delete("/{question_id}")
-def delete_question(
+async def delete_question(
     question_id: int, 
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    question = crud.get_question(db, question_id)
+    question = await run_db(db, crud.get_question, question_id)
     if not question:
         raise HTTPException(status_code=404, detail="Question not found")
     if question.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="You can only delete your own questions")
     
-    db.delete(question)
-    db.commit()
+    await run_db(db, crud.delete_question, question)
     return {"message": "Question deleted"}
\ No newline at end of file
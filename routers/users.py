@@ -1,63 +1,60 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-import schemas, models
-from database import SessionLocal
+from database import get_db, run_db
 from auth.hashing import Hasher
-from auth.auth import create_access_token, get_current_user
-import models, schemas
+from auth.auth import authenticate_user, create_access_token, get_current_user
+import models, schemas, crud
+from query_budget import query_budget
 from typing import List
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.post("/signup", response_model=schemas.User)
-def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(models.User).filter(models.User.email == user.email).first()
+async def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
+    db_user = await run_db(db, crud.get_user_by_email, user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    new_user = models.User(
+    # bcrypt 는 CPU 를 오래 쓰므로 전용 프로세스 풀에서 실행
+    password_hash = await Hasher.hash_password_async(user.password)
+    return await run_db(
+        db,
+        crud.create_user,
         username=user.username, 
         email=user.email,
-        password_hash=Hasher.hash_password(user.password)
+        password_hash=password_hash
     )
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    return new_user
 
 
 @router.post("/login", response_model=schemas.Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.email == form_data.username).first()
-    if not user or not Hasher.verify_password(form_data.password, user.password_hash):
+async def login(
+    background_tasks: BackgroundTasks,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: Session = Depends(get_db)
+):
+    user = await authenticate_user(db, form_data.username, form_data.password, background_tasks)
+    if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     token = create_access_token(data={"sub": str(user.id)})
     return {"access_token": token, "token_type": "bearer"}
 
 # 내가 쓴 질문 목록 조회
-@router.get("/me/questions", response_model=List[schemas.Question])
-def get_my_questions(
+@router.get("/me/questions", response_model=List[schemas.Question], dependencies=[query_budget(2)])
+async def get_my_questions(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    return db.query(models.Question).filter(models.Question.user_id == current_user.id).all()
+    return await run_db(db, crud.get_questions_by_user, user_id=current_user.id)
 
 # 내가 쓴 답변 목록 조회
-@router.get("/me/answers", response_model=List[schemas.Answer])
-def get_my_answers(
+@router.get("/me/answers", response_model=List[schemas.Answer], dependencies=[query_budget(2)])
+async def get_my_answers(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    return db.query(models.Answer).filter(models.Answer.user_id == current_user.id).all()
+    return await run_db(db, crud.get_answers_by_user, user_id=current_user.id)
  
 # 로그인한 사용자 정보 조회 API
 @router.get("/me", response_model=schemas.User)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 from typing import List, Optional
 
@@ -12,8 +12,7 @@ class User(BaseModel):
     username: str
     email: str
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class UserLogin(BaseModel):
     email: str
@@ -36,9 +35,9 @@ class Question(BaseModel):
     user: User
 
     likes_count: int
+    answers_count: int
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class AnswerCreate(BaseModel):
     content: str
@@ -50,6 +49,65 @@ class Answer(BaseModel):
     updated_at: Optional[datetime]
     user: User
 
-    class Config:
-        orm_mode = True
-        
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+        
+# 여러 질문 한 번에 조회 (POST /questions/batch)
+BATCH_MAX_IDS = 100
+
+class QuestionBatchRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=BATCH_MAX_IDS)
+    include_answers: bool = False
+    include_authors: bool = True
+
+# include_authors=False 이면 user 는 null
+class BatchAnswer(BaseModel):
+    id: int
+    content: str
+    created_at: datetime
+    updated_at: Optional[datetime]
+    user: Optional[User]
+
+    model_config = ConfigDict(from_attributes=True)
+
+class BatchQuestion(BaseModel):
+    id: int
+    title: str
+    content: str
+    created_at: datetime
+    updated_at: Optional[datetime]
+    user: Optional[User]
+
+    likes_count: int
+    answers_count: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+# 요청한 id 순서대로 하나씩. 없는 질문은 found=false, question=null
+class QuestionBatchItem(BaseModel):
+    id: int
+    found: bool
+    question: Optional[BatchQuestion] = None
+    answers: Optional[List[BatchAnswer]] = None
+
+# 대량 가져오기 (NDJSON/CSV 한 행)
+# user_id 는 CLI 에서만 행마다 지정한다. API 에서는 로그인한 사용자로 채운다.
+class QuestionImport(BaseModel):
+    title: str = Field(..., min_length=1, max_length=200)
+    content: str
+    user_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+
+class AnswerImport(BaseModel):
+    content: str
+    question_id: int
+    user_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+
+class ImportRowError(BaseModel):
+    line: int
+    error: str
+
+class ImportResult(BaseModel):
+    inserted: int
+    failed: int
+    errors: List[ImportRowError]
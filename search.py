@@ -0,0 +1,239 @@
+import math
+import os
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import event, func, literal_column, select, tuple_
+from sqlalchemy.orm import Session
+
+from models import Question, Answer
+from pagination import NEXT, Page, decode_cursor, encode_cursor
+from query_budget import uncounted
+import crud
+
+# 질문/답변 전문 검색
+# PostgreSQL 에서는 트리거가 질문마다 제목/본문/답변으로 채우는 tsvector 컬럼과 GIN 인덱스를 사용하고,
+# 그 밖의 DB(SQLite 테스트 환경)에서는 프로세스 안의 역색인(InvertedIndex)을 사용한다.
+# 결과는 (점수, id) 내림차순이며 커서로 다음 페이지를 이어 받는다.
+# 두 경우 모두 최신 매치 SEARCH_MAX_CANDIDATES 개 안에서만 순위를 매긴다 (그보다 오래된 매치는 나오지 않는다).
+
+TITLE_WEIGHT = 2.0
+CONTENT_WEIGHT = 1.0
+ANSWER_WEIGHT = 0.5
+# ts_rank 의 {D, C, B, A} 가중치. 질문 벡터는 제목 A, 본문 B, 답변 D 로 채운다 (C 는 쓰지 않는다)
+RANK_WEIGHTS = "'{%s, 0, %s, 1}'::float4[]" % (ANSWER_WEIGHT / TITLE_WEIGHT, CONTENT_WEIGHT / TITLE_WEIGHT)
+# 순위를 매길 후보 수 상한 (최신 매치부터). 흔한 단어도 페이지당 비용이 매치 수에 비례하지 않게 한다.
+SEARCH_MAX_CANDIDATES = int(os.getenv("SEARCH_MAX_CANDIDATES", "1000"))
+
+_token_re = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str):
+    return _token_re.findall((text or "").lower())
+
+
+def search_questions(db: Session, q: str, cursor: Optional[str] = None, limit: int = 10, fields=None) -> Page:
+    after = None
+    if cursor:
+        values, direction = decode_cursor(cursor, 2, "relevance")
+        if direction != NEXT:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        after = (float(values[0]), int(values[1]))
+
+    if db.get_bind().dialect.name == "postgresql":
+        ranked = _postgres_ranked(db, q, after, limit + 1)
+    else:
+        ranked = _fallback_ranked(db, q, after, limit + 1)
+
+    has_more = len(ranked) > limit
+    ranked = ranked[:limit]
+
+    # 순위가 정해진 id 만 한 번에 불러온다 (fields 에 없는 작성자/본문은 읽지 않는다, crud.field_options)
+    ids = [question_id for question_id, _ in ranked]
+    questions = {}
+    if ids:
+        rows = (
+            crud.with_counts(db.query(Question))
+            .options(*crud.field_options(Question, fields))
+            .filter(Question.id.in_(ids))
+            .all()
+        )
+        questions = {row.id: row for row in crud.merge_pending_likes(rows)}
+    items = [questions[question_id] for question_id in ids if question_id in questions]
+
+    next_cursor = None
+    if has_more and ranked:
+        last_id, last_rank = ranked[-1]
+        next_cursor = encode_cursor([last_rank, last_id], NEXT, "relevance")
+    return Page(items, next_cursor, None)
+
+
+def _postgres_ranked(db: Session, q: str, after, limit: int):
+    query = func.websearch_to_tsquery(literal_column("'simple'::regconfig"), q)
+    vector = Question.__table__.c.search_vector
+
+    # GIN 으로 찾은 매치 중 최신 SEARCH_MAX_CANDIDATES 개만 순위를 매긴다.
+    # ts_rank 는 행마다 tsvector 를 풀어서 계산하므로, 흔한 단어라도 페이지마다 후보 수만큼만 계산하고 정렬한다.
+    candidates = (
+        select(Question.id.label("id"), vector.label("vector"))
+        .where(vector.op("@@")(query))
+        .order_by(Question.id.desc())
+        .limit(SEARCH_MAX_CANDIDATES)
+        .subquery()
+    )
+    rank = func.ts_rank(literal_column(RANK_WEIGHTS), candidates.c.vector, query)
+    ranked = select(candidates.c.id, rank.label("rank")).subquery()
+
+    stmt = select(ranked.c.id, ranked.c.rank)
+    if after is not None:
+        stmt = stmt.where(tuple_(ranked.c.rank, ranked.c.id) < tuple_(*after))
+    stmt = stmt.order_by(ranked.c.rank.desc(), ranked.c.id.desc()).limit(limit)
+    return [(row.id, float(row.rank)) for row in db.execute(stmt)]
+
+
+class InvertedIndex:
+    """질문 제목/본문과 답변 본문에 대한 메모리 역색인.
+
+    PostgreSQL 의 질문별 벡터와 같이, 질문의 제목/본문/답변 어디에든 검색어가 모두 있으면 매치로 보고,
+    tf * idf * 필드 가중치를 질문 id 별로 합산해서 점수를 낸다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.built = False
+        self._docs = {}  # (kind, id) -> (question_id, Counter)
+        self._postings = defaultdict(dict)  # term -> {(kind, id): weighted tf}
+
+    def build(self, db: Session):
+        with self._lock:
+            if self.built:
+                return
+            with uncounted():
+                self._load(db)
+            self.built = True
+
+    def _load(self, db: Session):
+        for question_id, title, content in db.query(Question.id, Question.title, Question.content):
+            self._add_question(question_id, title, content)
+        for answer_id, question_id, content in db.query(Answer.id, Answer.question_id, Answer.content):
+            self._add_answer(answer_id, question_id, content)
+
+    def reset(self):
+        # 매퍼 이벤트를 거치지 않은 대량 INSERT 뒤에는 다음 검색 때 다시 만든다
+        with self._lock:
+            self.built = False
+            self._docs.clear()
+            self._postings.clear()
+
+    def _put(self, key, question_id: int, terms: Counter):
+        self._remove(key)
+        self._docs[key] = (question_id, terms)
+        for term, weight in terms.items():
+            self._postings[term][key] = weight
+
+    def _remove(self, key):
+        doc = self._docs.pop(key, None)
+        if doc is None:
+            return
+        for term in doc[1]:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(key, None)
+                if not postings:
+                    del self._postings[term]
+
+    def _add_question(self, question_id: int, title: str, content: str):
+        terms = Counter()
+        for token in tokenize(title):
+            terms[token] += TITLE_WEIGHT
+        for token in tokenize(content):
+            terms[token] += CONTENT_WEIGHT
+        self._put(("q", question_id), question_id, terms)
+
+    def _add_answer(self, answer_id: int, question_id: int, content: str):
+        terms = Counter()
+        for token in tokenize(content):
+            terms[token] += ANSWER_WEIGHT
+        self._put(("a", answer_id), question_id, terms)
+
+    def add_question(self, question_id: int, title: str, content: str):
+        with self._lock:
+            if self.built:
+                self._add_question(question_id, title, content)
+
+    def add_answer(self, answer_id: int, question_id: int, content: str):
+        with self._lock:
+            if self.built:
+                self._add_answer(answer_id, question_id, content)
+
+    def remove(self, kind: str, doc_id: int):
+        with self._lock:
+            if self.built:
+                self._remove((kind, doc_id))
+
+    def search(self, q: str):
+        terms = set(tokenize(q))
+        if not terms:
+            return []
+        with self._lock:
+            total = len(self._docs) or 1
+            postings = [self._postings.get(term, {}) for term in terms]
+            if not all(postings):
+                return []
+            # 질문 id 단위로, 가장 짧은 posting 부터 교집합
+            postings.sort(key=len)
+            matched = None
+            for posting in postings:
+                question_ids = {self._docs[key][0] for key in posting}
+                matched = question_ids if matched is None else matched & question_ids
+                if not matched:
+                    return []
+
+            scores = defaultdict(float)
+            for posting in postings:
+                idf = math.log(total / len(posting)) + 1.0
+                for key, weight in posting.items():
+                    question_id = self._docs[key][0]
+                    if question_id in matched:
+                        scores[question_id] += weight * idf
+        return sorted(scores.items(), key=lambda item: (item[1], item[0]), reverse=True)
+
+
+index = InvertedIndex()
+
+
+def _fallback_ranked(db: Session, q: str, after, limit: int):
+    index.build(db)
+    results = index.search(q)
+    if len(results) > SEARCH_MAX_CANDIDATES:
+        newest = set(sorted((question_id for question_id, _ in results), reverse=True)[:SEARCH_MAX_CANDIDATES])
+        results = [(question_id, score) for question_id, score in results if question_id in newest]
+    if after is not None:
+        results = [(question_id, score) for question_id, score in results if (score, question_id) < after]
+    return results[:limit]
+
+
+# 쓰기 경로에서 역색인 갱신 (역색인을 한 번이라도 만든 경우에만)
+@event.listens_for(Question, "after_insert")
+@event.listens_for(Question, "after_update")
+def _index_question(mapper, connection, target):
+    index.add_question(target.id, target.title, target.content)
+
+
+@event.listens_for(Answer, "after_insert")
+@event.listens_for(Answer, "after_update")
+def _index_answer(mapper, connection, target):
+    index.add_answer(target.id, target.question_id, target.content)
+
+
+@event.listens_for(Question, "after_delete")
+def _unindex_question(mapper, connection, target):
+    index.remove("q", target.id)
+
+
+@event.listens_for(Answer, "after_delete")
+def _unindex_answer(mapper, connection, target):
+    index.remove("a", target.id)
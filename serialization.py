@@ -0,0 +1,70 @@
+import json
+import os
+from functools import lru_cache
+from typing import List, Optional
+
+from fastapi import HTTPException, Response
+from fastapi.responses import JSONResponse
+from pydantic import ConfigDict, TypeAdapter, create_model
+
+# API 응답 직렬화
+# - FastJSONResponse: 앱 기본 응답 클래스. orjson 이 있으면 쓰고(선택 의존성), 없으면 공백 없는 표준 json.
+# - 희소 필드셋: ?fields=id,title,likes_count 처럼 필요한 필드만 요청하면, 그 필드만 가진 모델을 만들어
+#   pydantic-core 로 바로 JSON 바이트를 만든다. 빠진 user/content 는 검증도 직렬화도 하지 않는다.
+#   id 는 항상 포함한다.
+
+GZIP_MIN_SIZE = int(os.getenv("GZIP_MIN_SIZE", "1000"))  # 바이트, 이보다 작은 응답은 압축하지 않는다
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+
+try:
+    import orjson  # 선택 의존성
+except ImportError:
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def parse_fields(model, fields: Optional[str]) -> Optional[frozenset]:
+    """fields 쿼리 파라미터를 필드 이름 집합으로. 없으면 None (전체 필드)."""
+    if not fields:
+        return None
+    names = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = names - set(model.model_fields)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return frozenset(names | {"id"})
+
+
+def fields_key(fields: Optional[frozenset]) -> str:
+    """ETag 에 넣을 필드셋 표기 (필드셋이 다르면 본문도 다르다)."""
+    return ",".join(sorted(fields)) if fields else ""
+
+
+@lru_cache(maxsize=128)
+def sparse_model(model, fields: frozenset):
+    definitions = {
+        name: (info.annotation, info)
+        for name, info in model.model_fields.items()
+        if name in fields
+    }
+    return create_model(f"{model.__name__}Fields", __config__=ConfigDict(from_attributes=True), **definitions)
+
+
+@lru_cache(maxsize=128)
+def _adapter(model, fields: frozenset, many: bool) -> TypeAdapter:
+    sparse = sparse_model(model, fields)
+    return TypeAdapter(List[sparse] if many else sparse)
+
+
+def sparse_response(response: Response, model, data, fields: frozenset, many: bool = True) -> Response:
+    """요청한 필드만 담은 JSON 응답. 라우트에서 주입받은 response 의 헤더(ETag, Link 등)를 옮겨 담는다."""
+    adapter = _adapter(model, fields, many)
+    body = adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+    result = Response(content=body, media_type="application/json")
+    result.raw_headers.extend(response.raw_headers)
+    return result
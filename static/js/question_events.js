@@ -0,0 +1,40 @@
+// 질문 상세 페이지 실시간 갱신 (Server-Sent Events)
+// 새 답변은 목록 끝에 붙이고, 좋아요 수는 증감(delta)만큼 바꾼다.
+(function () {
+  var script = document.currentScript;
+  var questionId = script.dataset.questionId;
+  if (!window.EventSource || !questionId) return;
+
+  var likes = document.getElementById("likes-count");
+  var answers = document.getElementById("answers");
+  var source = new EventSource("/questions/" + questionId + "/events");
+
+  source.addEventListener("like", function (e) {
+    var event = JSON.parse(e.data);
+    if (likes) likes.textContent = Math.max(0, parseInt(likes.textContent, 10) + event.delta);
+  });
+
+  source.addEventListener("answer", function (e) {
+    var event = JSON.parse(e.data);
+    if (!answers) return;
+    // 본문이 너무 길어 빠진 이벤트면 새로 불러온다
+    if (event.truncated || !event.answer) {
+      location.reload();
+      return;
+    }
+    if (answers.querySelector('[data-answer-id="' + event.answer.id + '"]')) return;
+
+    var card = document.createElement("div");
+    card.className = "card mb-3";
+    card.dataset.answerId = event.answer.id;
+    var body = document.createElement("div");
+    body.className = "card-body";
+    body.appendChild(document.createTextNode(event.answer.content));
+    var author = document.createElement("div");
+    author.className = "text-muted mt-2";
+    author.textContent = "작성자: " + (event.answer.user ? event.answer.user.username : "");
+    body.appendChild(author);
+    card.appendChild(body);
+    answers.appendChild(card);
+  });
+})();
@@ -0,0 +1,177 @@
+"""정적 파일 빌드와 서빙.
+
+빌드 (배포할 때 한 번):
+
+    python -m static_assets
+
+static/ 의 파일마다 내용 해시를 붙인 사본(css/style.1a2b3c4d5e.css)과 .gz / .br 압축본을
+STATIC_BUILD_DIR 에 만들고, 원래 경로 -> 해시 경로 매니페스트(manifest.json)를 쓴다.
+템플릿은 static_url('css/style.css') 로 해시 경로를 얻는다. 내용이 바뀌면 URL 도 바뀌므로
+해시 경로는 1년짜리 immutable 캐시로 내보내고, 브라우저는 다시 확인하지 않는다.
+.br 은 brotli 패키지가 있을 때만 만든다 (선택 의존성).
+
+빌드 결과가 없으면(개발 환경) static/ 을 그대로 서빙하고 static_url 은 원래 경로를 돌려준다.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+from negotiation import qvalues
+
+STATIC_DIR = os.getenv("STATIC_DIR", "static")
+STATIC_BUILD_DIR = os.getenv("STATIC_BUILD_DIR", "static_build")
+STATIC_URL_PREFIX = "/static/"
+MANIFEST_NAME = "manifest.json"
+HASH_LENGTH = 10
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# 이미 압축된 형식은 다시 압축하지 않는다
+COMPRESSIBLE_EXTENSIONS = (".css", ".js", ".svg", ".html", ".json", ".txt", ".map")
+
+
+def _fingerprint(rel_path: str, data: bytes) -> str:
+    digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+    root, ext = os.path.splitext(rel_path)
+    return f"{root}.{digest}{ext}"
+
+
+def _write(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as file:
+        file.write(data)
+
+
+def _compress(path: str, data: bytes) -> list:
+    written = []
+    gz = gzip.compress(data, compresslevel=9, mtime=0)
+    if len(gz) < len(data):
+        _write(path + ".gz", gz)
+        written.append("gzip")
+    try:
+        import brotli  # 선택 의존성
+    except ImportError:
+        return written
+    br = brotli.compress(data, quality=11)
+    if len(br) < len(data):
+        _write(path + ".br", br)
+        written.append("br")
+    return written
+
+
+def build(src: str = STATIC_DIR, out: str = STATIC_BUILD_DIR) -> dict:
+    """src 의 모든 파일을 해시 이름으로 out 에 복사하고 압축본과 매니페스트를 만든다."""
+    if os.path.isdir(out):
+        shutil.rmtree(out)
+    manifest = {}
+    for root, _, files in os.walk(src):
+        for name in sorted(files):
+            full_path = os.path.join(root, name)
+            rel_path = os.path.relpath(full_path, src).replace(os.sep, "/")
+            with open(full_path, "rb") as file:
+                data = file.read()
+            hashed = _fingerprint(rel_path, data)
+            # 해시 없는 원래 경로도 둔다 (템플릿 밖에서 직접 참조하는 경우)
+            for target in (rel_path, hashed):
+                target_path = os.path.join(out, target)
+                _write(target_path, data)
+                if rel_path.endswith(COMPRESSIBLE_EXTENSIONS):
+                    _compress(target_path, data)
+            manifest[rel_path] = hashed
+    _write(os.path.join(out, MANIFEST_NAME), json.dumps(manifest, indent=2, sort_keys=True).encode())
+    return manifest
+
+
+def load_manifest(out: str = STATIC_BUILD_DIR) -> dict:
+    try:
+        with open(os.path.join(out, MANIFEST_NAME)) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+manifest = load_manifest()
+
+
+def static_url(path: str) -> str:
+    """템플릿 헬퍼: static/ 기준 경로 -> 빌드된 해시 URL (빌드가 없으면 원래 URL)."""
+    return STATIC_URL_PREFIX + manifest.get(path, path)
+
+
+class CachedStaticFiles(StaticFiles):
+    """해시 경로에는 immutable 캐시를, 나머지에는 no-cache(ETag 재검증)를 붙이고,
+    Accept-Encoding 에 맞는 .br / .gz 압축본이 있으면 그 파일을 보낸다."""
+
+    def __init__(self, *args, manifest: dict = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.immutable = set((manifest or {}).values())
+        # lookup_path 가 돌려주는 경로와 맞추기 위해 실제 경로로 비교한다
+        self.root = os.path.realpath(self.directory)
+        # 압축본 목록은 시작할 때 한 번만 만든다 (요청마다 stat 하지 않도록)
+        self.encoded = set()
+        for root, _, files in os.walk(self.root):
+            for name in files:
+                if name.endswith((".gz", ".br")):
+                    self.encoded.add(os.path.join(root, name))
+
+    def _pick_encoding(self, full_path: str, scope) -> tuple:
+        # Accept-Encoding 를 토큰과 q 값으로 나눠서, q 가 가장 높은 압축본을 고른다 (같으면 br).
+        # q=0 은 "보내지 말라" 는 뜻이다. 목록에 없으면 * 의 q 를 따른다.
+        accept = qvalues(Headers(scope=scope).get("accept-encoding"))
+        best_q, best = 0.0, (None, full_path)
+        for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+            q = accept.get(encoding, accept.get("*", 0.0))
+            if q > best_q and full_path + suffix in self.encoded:
+                best_q, best = q, (encoding, full_path + suffix)
+        return best
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        full_path = str(full_path)
+        encoding, path = self._pick_encoding(full_path, scope)
+        headers = {}
+        if full_path + ".gz" in self.encoded or full_path + ".br" in self.encoded:
+            headers["vary"] = "Accept-Encoding"
+        if encoding is not None:
+            headers["content-encoding"] = encoding
+            stat_result = os.stat(path)
+
+        rel_path = os.path.relpath(full_path, self.root).replace(os.sep, "/")
+        headers["cache-control"] = IMMUTABLE_CACHE_CONTROL if rel_path in self.immutable else REVALIDATE_CACHE_CONTROL
+
+        media_type = mimetypes.guess_type(full_path)[0] or "text/plain"
+        response = FileResponse(path, status_code=status_code, stat_result=stat_result, headers=headers, media_type=media_type)
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+def static_files() -> CachedStaticFiles:
+    """/static 마운트. 빌드 결과가 있으면 그것을, 없으면 static/ 을 서빙한다."""
+    if manifest:
+        return CachedStaticFiles(directory=STATIC_BUILD_DIR, manifest=manifest)
+    return CachedStaticFiles(directory=STATIC_DIR)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fingerprint and precompress static files")
+    parser.add_argument("--src", default=STATIC_DIR)
+    parser.add_argument("--out", default=STATIC_BUILD_DIR)
+    args = parser.parse_args()
+
+    built = build(args.src, args.out)
+    for rel_path, hashed in sorted(built.items()):
+        print(f"{rel_path} -> {hashed}")
+    print(f"{len(built)} files written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import logging
+import os
+import time
+
+from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+from metrics import instrument_templates
+from static_assets import static_url
+
+# Jinja2 환경 설정
+# - TEMPLATE_CACHE_DIR: 컴파일한 템플릿 바이트코드를 파일로 저장해서 워커끼리 나눠 쓴다
+#   (첫 워커가 컴파일하면 나머지 워커와 재시작한 워커는 파싱/컴파일 없이 불러온다, 빈 값이면 사용 안 함)
+# - TEMPLATE_AUTO_RELOAD: 1 이면 렌더링할 때마다 파일이 바뀌었는지 확인한다 (개발용, 기본은 끔)
+# - warmup(): 시작할 때 모든 템플릿을 미리 불러서 첫 요청이 컴파일 비용을 내지 않게 한다
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = os.getenv("TEMPLATE_DIR", "templates")
+TEMPLATE_CACHE_DIR = os.getenv("TEMPLATE_CACHE_DIR", ".template_cache")
+TEMPLATE_AUTO_RELOAD = os.getenv("TEMPLATE_AUTO_RELOAD", "0") == "1"
+TEMPLATE_CACHE_SIZE = int(os.getenv("TEMPLATE_CACHE_SIZE", "400"))
+
+
+def create_environment(directory: str = TEMPLATE_DIR, cache_dir: str = TEMPLATE_CACHE_DIR,
+                       auto_reload: bool = TEMPLATE_AUTO_RELOAD) -> Environment:
+    bytecode_cache = None
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(cache_dir)
+    env = Environment(
+        loader=FileSystemLoader(directory),
+        autoescape=True,
+        auto_reload=auto_reload,
+        cache_size=TEMPLATE_CACHE_SIZE,
+        bytecode_cache=bytecode_cache,
+    )
+    env.globals["static_url"] = static_url
+    # 렌더링 시간 지표 (template_class 는 템플릿을 불러오기 전에 바꿔야 한다)
+    instrument_templates(env)
+    return env
+
+
+def warmup(env: Environment) -> int:
+    """모든 템플릿을 미리 불러온다. 불러온 템플릿 수를 돌려준다."""
+    start = time.perf_counter()
+    names = env.list_templates(extensions=["html"])
+    for name in names:
+        env.get_template(name)
+    logger.info("warmed up %d templates in %.1f ms", len(names), (time.perf_counter() - start) * 1000)
+    return len(names)
+
+
+templates = Jinja2Templates(env=create_environment())
@@ -0,0 +1,91 @@
+import os
+import sys
+import tempfile
+
+# 설정은 모듈을 불러올 때 환경 변수에서 읽으므로, 앱 모듈보다 먼저 정한다.
+# primary 와 복제본 모두 임시 SQLite 파일을 쓴다 (복제본 파일은 primary 와 따로 채운다).
+TEST_DIR = tempfile.mkdtemp(prefix="qna-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{TEST_DIR}/primary.sqlite"
+os.environ["DATABASE_REPLICA_URLS"] = f"sqlite:///{TEST_DIR}/replica.sqlite"
+os.environ.setdefault("TEMPLATE_CACHE_DIR", "")
+# 라우트가 선언한 쿼리 예산을 넘으면 경고 대신 예외 (N+1 이 다시 생기면 테스트가 깨진다)
+os.environ.setdefault("QUERY_BUDGET_ENFORCE", "1")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import pytest  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+import database  # noqa: E402
+import models  # noqa: E402
+import search  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def fresh_databases():
+    engines = [database.engine] + [replica.engine for replica in database.replicas.replicas]
+    for eng in engines:
+        models.Base.metadata.drop_all(eng)
+        models.Base.metadata.create_all(eng)
+    # 복제본 라우팅은 test_replicas.py 에서만 켠다 (나머지 테스트는 primary 만 채운다)
+    for replica in database.replicas.replicas:
+        replica.healthy = False
+    # 검색 역색인은 프로세스에 하나이므로 새 DB 에서 다시 만들게 한다
+    search.index.reset()
+    yield
+
+
+@pytest.fixture
+def sql():
+    """테스트 동안 primary 에서 실행한 SQL 문 (쿼리 수와 읽은 컬럼을 확인할 때)."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(database.engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(database.engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+
+    import main
+
+    return TestClient(main.app)
+
+
+@pytest.fixture
+def login(client):
+    """client 를 user_id 로 로그인시킨다 (access_token 쿠키)."""
+    from auth.tokens import create_access_token
+
+    def login(user_id):
+        client.cookies.set("access_token", create_access_token(data={"sub": str(user_id)}))
+    return login
+
+
+@pytest.fixture
+def page(client):
+    """브라우저처럼 HTML 을 요청한다 (/questions/{id} 는 Accept 에 따라 JSON 이나 HTML 을 준다)."""
+    accept = "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8"
+
+    def page(url, **kwargs):
+        return client.get(url, headers={"Accept": accept, **kwargs.pop("headers", {})}, **kwargs)
+    return page
+
+
+@pytest.fixture
+def question():
+    from crud import create_question
+    from schemas import QuestionCreate
+
+    with database.SessionLocal() as db:
+        user = models.User(username="alice", email="alice@example.com", password_hash="x")
+        db.add(user)
+        db.commit()
+        return create_question(db, QuestionCreate(title="first question", content="body " * 400), user_id=user.id)
@@ -0,0 +1,74 @@
+import queue
+import threading
+import time
+
+
+class FakeRedis:
+    """테스트용 Redis 대용. redis-py 에서 쓰는 get/set/delete/publish/pubsub 만 흉내 낸다.
+
+    pubsub 구독자는 같은 FakeRedis 를 쓰는 모든 "워커"(UserCache) 사이에서 공유된다.
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+        self._subscribers = []
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value, ex=None):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ex if ex else None, value.encode() if isinstance(value, str) else value)
+        return True
+
+    def delete(self, *keys):
+        with self._lock:
+            return sum(self._data.pop(key, None) is not None for key in keys)
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscribers = [pubsub for pubsub in self._subscribers if channel in pubsub.channels]
+        for pubsub in subscribers:
+            pubsub.messages.put({"type": "message", "channel": channel.encode(), "data": str(message).encode()})
+        return len(subscribers)
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        pubsub = FakePubSub(self, ignore_subscribe_messages)
+        with self._lock:
+            self._subscribers.append(pubsub)
+        return pubsub
+
+
+class FakePubSub:
+    def __init__(self, redis: FakeRedis, ignore_subscribe_messages: bool):
+        self.redis = redis
+        self.ignore_subscribe_messages = ignore_subscribe_messages
+        self.channels = set()
+        self.messages = queue.Queue()
+
+    def subscribe(self, *channels):
+        self.channels.update(channels)
+        if not self.ignore_subscribe_messages:
+            for channel in channels:
+                self.messages.put({"type": "subscribe", "channel": channel.encode(), "data": len(self.channels)})
+
+    def get_message(self, ignore_subscribe_messages=False, timeout=0.0):
+        try:
+            return self.messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        with self.redis._lock:
+            if self in self.redis._subscribers:
+                self.redis._subscribers.remove(self)
+        self.channels.clear()
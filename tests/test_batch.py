@@ -0,0 +1,70 @@
+import pytest
+
+import database
+import models
+
+
+@pytest.fixture
+def forum():
+    """작성자 둘, 질문 다섯 개, 질문마다 답변 두 개. 질문 id 목록을 돌려준다."""
+    with database.SessionLocal() as db:
+        users = [models.User(username=f"u{i}", email=f"u{i}@example.com", password_hash="x") for i in range(2)]
+        db.add_all(users)
+        db.flush()
+        questions = []
+        for i in range(5):
+            question = models.Question(title=f"q{i}", content="c", user_id=users[i % 2].id)
+            question.answers = [models.Answer(content=f"q{i} a{j}", user_id=user.id) for j, user in enumerate(users)]
+            questions.append(question)
+        db.add_all(questions)
+        db.commit()
+        return [question.id for question in questions]
+
+
+def batch(client, **body):
+    response = client.post("/questions/batch", json=body)
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.parametrize("size", [1, 5])
+def test_query_count_does_not_grow_with_ids(client, forum, sql, size):
+    items = batch(client, ids=forum[:size], include_answers=True)
+    assert len(items) == size
+    assert len(sql) == 2  # 질문 한 번, 답변 한 번
+
+
+def test_results_follow_request_order_without_duplicates(client, forum):
+    ids = [forum[3], forum[0], forum[3], forum[1]]
+    assert [item["id"] for item in batch(client, ids=ids)] == [forum[3], forum[0], forum[1]]
+
+
+def test_unknown_ids_are_reported_not_found(client, forum):
+    items = batch(client, ids=[forum[0], 9999], include_answers=True)
+    assert items[0]["found"] is True
+    assert items[0]["question"]["title"] == "q0"
+    assert items[0]["question"]["answers_count"] == 2
+    assert [answer["content"] for answer in items[0]["answers"]] == ["q0 a0", "q0 a1"]
+    assert items[1] == {"id": 9999, "found": False, "question": None, "answers": None}
+
+
+def test_authors_can_be_left_out(client, forum, sql):
+    items = batch(client, ids=forum, include_answers=True, include_authors=False)
+    assert all(item["question"]["user"] is None for item in items)
+    assert all(answer["user"] is None for item in items for answer in item["answers"])
+    assert not any("FROM users" in statement or "JOIN users" in statement for statement in sql)
+
+    with_authors = batch(client, ids=forum[:1], include_answers=True)
+    assert with_authors[0]["question"]["user"]["username"] == "u0"
+    assert with_authors[0]["answers"][1]["user"]["username"] == "u1"
+
+
+def test_answers_only_when_asked(client, forum, sql):
+    items = batch(client, ids=forum)
+    assert all(item["answers"] is None for item in items)
+    assert len(sql) == 1
+
+
+def test_too_many_ids_is_rejected(client):
+    assert client.post("/questions/batch", json={"ids": list(range(101))}).status_code == 422
+    assert client.post("/questions/batch", json={"ids": []}).status_code == 422
@@ -0,0 +1,40 @@
+import pytest
+
+import database
+import models
+from auth.admin import set_admin
+
+
+@pytest.fixture
+def users():
+    with database.SessionLocal() as db:
+        admin = models.User(username="admin", email="admin@example.com", password_hash="x")
+        member = models.User(username="member", email="member@example.com", password_hash="x")
+        db.add_all([admin, member])
+        db.commit()
+    assert set_admin("admin@example.com", True)
+    return admin, member
+
+
+@pytest.mark.parametrize("method, path", [
+    ("post", "/import/questions"),
+    ("post", "/import/answers"),
+    ("get", "/export/questions"),
+    ("get", "/export/likes"),
+])
+def test_bulk_routes_are_admin_only(client, login, users, method, path):
+    admin, member = users
+    login(member.id)
+    assert getattr(client, method)(path).status_code == 403
+
+    login(admin.id)
+    assert getattr(client, method)(path).status_code == 200
+
+
+def test_revoking_admin_takes_effect_despite_the_user_cache(client, login, users):
+    admin, _ = users
+    login(admin.id)
+    assert client.post("/import/questions").status_code == 200
+
+    set_admin("admin@example.com", False)
+    assert client.post("/import/questions").status_code == 403
@@ -0,0 +1,81 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+
+import bulk_export
+import database
+import models
+from auth.admin import set_admin
+
+
+@pytest.fixture
+def data():
+    """작성자 둘의 질문 세 개(2026-01-01, 01-02, 01-03)와 답변, 좋아요. (관리자 id, 다른 작성자 id)"""
+    with database.SessionLocal() as db:
+        admin = models.User(username="admin", email="admin@example.com", password_hash="x")
+        other = models.User(username="other", email="other@example.com", password_hash="x")
+        db.add_all([admin, other])
+        db.flush()
+        for day, author in zip((1, 2, 3), (admin, other, other)):
+            question = models.Question(
+                title=f"day {day}", content="다음 줄,\n쉼표", user_id=author.id, created_at=datetime(2026, 1, day)
+            )
+            question.answers = [models.Answer(content="answer", user_id=admin.id, created_at=datetime(2026, 1, day))]
+            question.likes = [models.Like(user_id=admin.id)]
+            db.add(question)
+        db.commit()
+    set_admin("admin@example.com", True)
+    return admin.id, other.id
+
+
+@pytest.fixture
+def admin_client(client, login, data):
+    login(data[0])
+    return client
+
+
+def ndjson(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_ndjson_streams_one_object_per_row(admin_client):
+    response = admin_client.get("/export/questions")
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.headers["content-disposition"] == 'attachment; filename="questions.ndjson"'
+    rows = ndjson(response)
+    assert [row["title"] for row in rows] == ["day 1", "day 2", "day 3"]
+    assert rows[0]["content"] == "다음 줄,\n쉼표"
+    assert rows[0]["created_at"] == "2026-01-01T00:00:00"
+
+
+def test_csv_has_a_header_and_round_trips_quoted_values(admin_client):
+    response = admin_client.get("/export/answers", params={"format": "csv"})
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert list(rows[0]) == ["id", "question_id", "user_id", "content", "created_at", "updated_at"]
+    assert len(rows) == 3
+
+
+def test_filters_by_author_and_date_range(admin_client, data):
+    _, other = data
+    rows = ndjson(admin_client.get("/export/questions", params={"user_id": other}))
+    assert [row["title"] for row in rows] == ["day 2", "day 3"]
+
+    # [since, until) 범위, timezone 이 있으면 UTC 로 바꿔 비교한다
+    params = {"since": "2026-01-02T00:00:00", "until": "2026-01-03T09:00:00+09:00"}
+    assert [row["title"] for row in ndjson(admin_client.get("/export/questions", params=params))] == ["day 2"]
+
+
+def test_likes_cannot_be_filtered_by_date(admin_client):
+    assert len(ndjson(admin_client.get("/export/likes"))) == 3
+    assert admin_client.get("/export/likes", params={"since": "2026-01-01T00:00:00"}).status_code == 400
+
+
+def test_rows_are_read_and_encoded_in_batches(data, monkeypatch):
+    monkeypatch.setattr(bulk_export, "EXPORT_BATCH_SIZE", 2)
+    chunks = list(bulk_export.iter_export("questions", "csv"))
+    assert chunks[0].startswith("id,user_id,title")
+    assert [chunk.count("day ") for chunk in chunks[1:]] == [2, 1]
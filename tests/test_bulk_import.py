@@ -0,0 +1,81 @@
+import io
+
+import pytest
+
+import bulk_import
+import database
+import models
+from bulk_import import RowParser, import_file
+
+
+@pytest.fixture
+def author():
+    with database.SessionLocal() as db:
+        user = models.User(username="alice", email="alice@example.com", password_hash="x")
+        db.add(user)
+        db.commit()
+        return user.id
+
+
+def rows(fmt, text):
+    parser = RowParser(fmt)
+    records = [parser.feed(line) for line in io.StringIO(text)]
+    return [record for record in records + [parser.finish()] if record is not None]
+
+
+def test_csv_keeps_empty_cells_distinct_from_missing_columns():
+    assert rows("csv", 'title,content\nhello,""\n') == [(2, {"title": "hello", "content": ""})]
+    assert rows("csv", "title\nhello\n") == [(2, {"title": "hello"})]
+
+
+def test_csv_quoted_newlines_and_column_count():
+    assert rows("csv", 'title,content\n"two\nlines",x\nonly-one\n') == [
+        (2, {"title": "two\nlines", "content": "x"}),
+        (4, "expected 2 columns, got 1"),
+    ]
+
+
+def test_empty_content_is_imported_and_missing_content_is_not(author):
+    text = f"title,content,user_id,created_at\nempty,,{author},\n"
+    with database.SessionLocal() as db:
+        assert import_file(db, "questions", io.StringIO(text), "csv")["inserted"] == 1
+        assert db.query(models.Question.content).filter_by(title="empty").scalar() == ""
+
+        result = import_file(db, "questions", io.StringIO(f"title,user_id\nno content,{author}\n"), "csv")
+    assert result["inserted"] == 0
+    assert result["errors"] == [{"line": 2, "error": "content: Field required"}]
+
+
+def test_bad_rows_are_reported_and_the_rest_inserted(author):
+    text = "\n".join([
+        f'{{"title": "ok", "content": "c", "user_id": {author}}}',
+        '{"title": "", "content": "c"}',
+        "not json",
+        f'{{"title": "ghost", "content": "c", "user_id": {author + 1}}}',
+    ])
+    with database.SessionLocal() as db:
+        result = import_file(db, "questions", io.StringIO(text), "ndjson", chunk_size=2)
+    assert result["inserted"] == 1
+    assert [error["line"] for error in result["errors"]] == [2, 3, 4]
+
+
+def test_caches_are_cleared_once_after_the_last_chunk(author, monkeypatch):
+    calls = []
+    monkeypatch.setattr(bulk_import.fragment_cache, "clear", lambda: calls.append("cache"))
+    monkeypatch.setattr(bulk_import.search.index, "reset", lambda: calls.append("index"))
+
+    text = "".join(f'{{"title": "q{i}", "content": "c", "user_id": {author}}}\n' for i in range(5))
+    with database.SessionLocal() as db:
+        assert import_file(db, "questions", io.StringIO(text), "ndjson", chunk_size=2)["inserted"] == 5
+    assert calls == ["cache", "index"]
+
+
+def test_import_route_streams_chunks_as_the_admin(client, login, author):
+    from auth.admin import set_admin
+
+    set_admin("alice@example.com", True)
+    login(author)
+    body = "title,content\nfirst,\nsecond,body\n"
+    response = client.post("/import/questions?format=csv", content=body)
+    assert response.json() == {"inserted": 2, "failed": 0, "errors": []}
+    assert client.get("/questions/search", params={"q": "second"}).json()[0]["content"] == "body"
@@ -0,0 +1,89 @@
+def test_question_url_serves_json_to_api_clients_and_html_to_browsers(client, page, login, question):
+    response = client.get(f"/questions/{question.id}")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json()["title"] == "first question"
+    assert "Accept" in response.headers["vary"]
+
+    login(question.user_id)
+    html = page(f"/questions/{question.id}")
+    assert html.status_code == 200
+    assert html.headers["content-type"].startswith("text/html")
+    assert "Accept" in html.headers["vary"]
+
+    explicit_json = client.get(f"/questions/{question.id}", headers={"Accept": "application/json, text/html;q=0.5"})
+    assert explicit_json.headers["content-type"] == "application/json"
+
+
+def test_answer_redirects_back_to_the_question_url(client, login, question):
+    login(question.user_id)
+    response = client.post(f"/questions/{question.id}/answer", data={"content": "hi"}, follow_redirects=False)
+    assert response.headers["location"] == f"/questions/{question.id}"
+
+
+def test_prefers_html():
+    from negotiation import prefers_html, qvalues
+
+    assert qvalues("text/html;q=0.5, */*") == {"text/html": 0.5, "*/*": 1.0}
+    assert prefers_html("text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8")
+    assert not prefers_html("*/*")
+    assert not prefers_html(None)
+    assert not prefers_html("application/json, text/html;q=0.9")
+    assert not prefers_html("text/html;q=0")
+
+
+def test_question_api_returns_304_for_matching_etag(client, question):
+    etag = client.get(f"/questions/{question.id}").headers["etag"]
+
+    response = client.get(f"/questions/{question.id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+
+def test_etag_is_weak_because_gzip_and_identity_bodies_share_it(client, question):
+    gzipped = client.get(f"/questions/{question.id}", headers={"Accept-Encoding": "gzip"})
+    identity = client.get(f"/questions/{question.id}", headers={"Accept-Encoding": "identity"})
+    assert gzipped.headers.get("content-encoding") == "gzip"
+    assert "content-encoding" not in identity.headers
+    assert gzipped.headers["etag"] == identity.headers["etag"]
+    assert gzipped.headers["etag"].startswith('W/"')
+
+
+def test_question_list_returns_304_and_changes_etag_after_a_write(client, question):
+    etag = client.get("/questions/").headers["etag"]
+    assert client.get("/questions/", headers={"If-None-Match": etag}).status_code == 304
+
+    import database
+    import models
+
+    with database.SessionLocal() as db:
+        db.get(models.Question, question.id).title = "edited"
+        db.commit()
+    assert client.get("/questions/", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_answers_are_validated_by_etag_only(client, question):
+    import database
+    import models
+
+    with database.SessionLocal() as db:
+        db.add_all([
+            models.Answer(content="one", question_id=question.id, user_id=question.user_id),
+            models.Answer(content="two", question_id=question.id, user_id=question.user_id),
+        ])
+        db.commit()
+    url = f"/questions/{question.id}/answers/"
+    response = client.get(url)
+    etag = response.headers["etag"]
+    assert "last-modified" not in response.headers
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    assert client.get(url, headers={"If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"}).status_code == 200
+
+    # 최신 답변을 지우면 최신 시각은 그대로이거나 뒤로 간다. ETag 는 바뀌어야 한다.
+    with database.SessionLocal() as db:
+        newest = db.query(models.Answer).order_by(models.Answer.id.desc()).first()
+        db.delete(newest)
+        db.commit()
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert [answer["content"] for answer in response.json()] == ["one"]
@@ -0,0 +1,47 @@
+import pytest
+
+import database
+import models
+
+
+@pytest.fixture
+def questions():
+    """좋아요/답변 수가 질문마다 다른 질문 5개 (i 번째 질문은 좋아요 i 개, 답변 4 - i 개)."""
+    with database.SessionLocal() as db:
+        users = [models.User(username=f"u{i}", email=f"u{i}@example.com", password_hash="x") for i in range(4)]
+        db.add_all(users)
+        db.flush()
+        rows = []
+        for i in range(5):
+            question = models.Question(title=f"q{i}", content="c", user_id=users[0].id)
+            question.likes = [models.Like(user_id=user.id) for user in users[:i]]
+            question.answers = [models.Answer(content="a", user_id=users[0].id) for _ in range(4 - i)]
+            rows.append(question)
+        db.add_all(rows)
+        db.commit()
+        return {q.id: (i, 4 - i) for i, q in enumerate(rows)}
+
+
+def counts(items):
+    return {item["id"]: (item["likes_count"], item["answers_count"]) for item in items}
+
+
+def test_list_counts_come_from_one_select(client, questions, sql):
+    response = client.get("/questions/", params={"limit": 10})
+    assert counts(response.json()) == questions
+
+    # 버전 조회 1번 + 목록 1번. 좋아요/답변 행을 질문마다 따로 읽지 않는다.
+    assert len(sql) == 2
+    assert all("count(" in statement for statement in sql)
+
+
+def test_paged_list_keeps_the_counts(client, questions):
+    first = client.get("/questions/", params={"limit": 3})
+    second = client.get("/questions/", params={"limit": 3, "cursor": first.headers["x-next-cursor"]})
+    assert counts(first.json() + second.json()) == questions
+
+
+def test_detail_counts_match_the_list(client, questions):
+    for question_id, expected in questions.items():
+        item = client.get(f"/questions/{question_id}").json()
+        assert (item["likes_count"], item["answers_count"]) == expected
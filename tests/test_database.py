@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+import database
+from database import TimedAsyncQueuePool, TimedQueuePool, _engine_options, _track_pool
+
+
+def test_postgres_engines_use_the_configured_pool(monkeypatch):
+    monkeypatch.setattr(database, "DB_POOL_SIZE", 7)
+    monkeypatch.setattr(database, "DB_MAX_OVERFLOW", 3)
+    monkeypatch.setattr(database, "DB_POOL_TIMEOUT", 2.5)
+    monkeypatch.setattr(database, "DB_STATEMENT_TIMEOUT_MS", 1500)
+
+    options = _engine_options("postgresql://db/app")
+    assert options["poolclass"] is TimedQueuePool
+    assert (options["pool_size"], options["max_overflow"], options["pool_timeout"]) == (7, 3, 2.5)
+    assert options["echo"] is False
+    assert options["connect_args"] == {"options": "-c statement_timeout=1500"}
+
+    async_options = _engine_options("postgresql+asyncpg://db/app", is_async=True)
+    assert async_options["poolclass"] is TimedAsyncQueuePool
+    assert async_options["connect_args"] == {"server_settings": {"statement_timeout": "1500"}}
+
+
+def test_sqlite_keeps_the_default_pool():
+    assert _engine_options("sqlite:///app.sqlite") == {"echo": False}
+
+
+def test_pool_stats_count_checkouts_and_timeouts(tmp_path):
+    eng = create_engine(
+        f"sqlite:///{tmp_path}/pool.sqlite", poolclass=TimedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.05
+    )
+    _track_pool(eng)
+    with eng.connect():
+        with pytest.raises(PoolTimeoutError):
+            eng.connect()
+    stats = eng.pool.stats.snapshot()
+    assert stats["checkouts"] == 1
+    assert stats["checkins"] == 1
+    assert stats["timeouts"] == 1
+    assert stats["wait_seconds_max"] >= 0.05
+    eng.dispose()
+
+
+def test_every_route_shares_one_session_dependency():
+    import main
+
+    def dependencies(dependant):
+        for sub in dependant.dependencies:
+            yield sub.call
+            yield from dependencies(sub)
+
+    session_deps = {
+        call for route in main.app.routes if hasattr(route, "dependant")
+        for call in dependencies(route.dependant) if getattr(call, "__name__", "") == "get_db"
+    }
+    assert session_deps == {database.get_db}
+
+
+def test_session_is_closed_after_the_request(monkeypatch):
+    closed = []
+
+    class Session(database.RoutingSession):
+        def close(self):
+            closed.append(self)
+            super().close()
+
+    monkeypatch.setattr(database, "SessionLocal", database.sessionmaker(bind=database.engine, class_=Session))
+
+    async def request():
+        dependency = database.get_db()
+        db = await dependency.__anext__()
+        with pytest.raises(StopAsyncIteration):
+            await dependency.__anext__()
+        return db
+
+    db = asyncio.run(request())
+    assert closed == [db]
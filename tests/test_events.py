@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+import events
+from events import EventHub
+from routers import events as event_routes
+
+
+class FakeRequest:
+    """is_disconnected() 가 disconnect_after 번째 호출부터 True 를 돌려준다."""
+
+    def __init__(self, disconnect_after: int):
+        self.calls = 0
+        self.disconnect_after = disconnect_after
+
+    async def is_disconnected(self):
+        self.calls += 1
+        return self.calls > self.disconnect_after
+
+
+@pytest.fixture
+def hub(monkeypatch):
+    hub = EventHub()
+    monkeypatch.setattr(event_routes, "hub", hub)
+    return hub
+
+
+def test_publish_fans_out_to_the_feed_and_the_question_topic(hub):
+    async def run():
+        await hub.start()
+        feed, question, other = hub.subscribe("all"), hub.subscribe("question:1"), hub.subscribe("question:2")
+        hub.publish(events.likes_changed(1, 1))
+        await asyncio.sleep(0)
+        await hub.stop()
+        return feed.queue.qsize(), question.queue.qsize(), other.queue.qsize()
+
+    assert asyncio.run(run()) == (1, 1, 0)
+
+
+def test_slow_subscriber_drops_the_oldest_event(hub, monkeypatch):
+    monkeypatch.setattr(events, "EVENTS_QUEUE_SIZE", 2)
+    subscription = hub.subscribe("all")
+    for delta in (1, 2, 3):
+        hub.dispatch(events.likes_changed(1, delta))
+    assert subscription.dropped == 1
+    assert [subscription.queue.get_nowait()["delta"] for _ in range(2)] == [2, 3]
+
+
+def test_stream_subscribes_only_while_it_is_read(hub):
+    async def run():
+        response = await event_routes.event_stream(FakeRequest(disconnect_after=1), "question:1")
+        assert hub._count == 0  # 응답만 만들고 보내지 않으면 구독도 없다
+
+        chunks = response.body_iterator
+        assert await chunks.__anext__() == "retry: 3000\n\n"
+        hub.dispatch(events.likes_changed(1, 1))  # 구독 전 이벤트는 받지 않는다
+        pending = asyncio.ensure_future(chunks.__anext__())
+        await asyncio.sleep(0)
+        assert hub._count == 1
+        hub.dispatch(events.likes_changed(1, 5))
+        chunk = await pending
+        rest = [chunk async for chunk in chunks]
+        return chunk, rest
+
+    chunk, rest = asyncio.run(run())
+    assert chunk.startswith("event: like\ndata: ") and '"delta": 5' in chunk
+    assert rest == []
+    assert hub._count == 0
+
+
+def test_full_hub_returns_503(client, hub, monkeypatch):
+    monkeypatch.setattr(events, "EVENTS_MAX_SUBSCRIBERS", 0)
+    response = client.get("/events")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "5"
@@ -0,0 +1,73 @@
+import pytest
+
+import database
+import models
+from fragment_cache import FragmentCache, fragment_cache
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    fragment_cache.clear()
+    yield
+    fragment_cache.clear()
+
+
+@pytest.fixture
+def bob():
+    with database.SessionLocal() as db:
+        user = models.User(username="bob", email="bob@example.com", password_hash="x")
+        db.add(user)
+        db.commit()
+        return user.id
+
+
+def question_reads(statements):
+    return [s for s in statements if "FROM questions" in s or "FROM answers" in s]
+
+
+def test_detail_page_requires_login(client, page, question):
+    assert page(f"/questions/{question.id}").status_code == 401
+
+
+def test_fragment_filled_by_one_user_serves_another(client, page, login, question, bob, sql):
+    login(question.user_id)
+    assert "first question" in page(f"/questions/{question.id}").text
+    assert question_reads(sql)
+
+    sql.clear()
+    login(bob)
+    response = page(f"/questions/{question.id}")
+    assert "first question" in response.text
+    assert question_reads(sql) == []  # 질문/답변은 캐시에서, 로그인 확인만 DB 를 본다
+
+
+def test_writes_invalidate_the_detail_and_index_fragments(client, page, login, question):
+    login(question.user_id)
+    page(f"/questions/{question.id}")
+    client.get("/")
+    assert fragment_cache.get(("question", question.id)) is not None
+
+    client.post(f"/questions/{question.id}/answer", data={"content": "fresh answer"}, follow_redirects=False)
+    assert fragment_cache.get(("question", question.id)) is None
+    assert "fresh answer" in page(f"/questions/{question.id}").text
+
+
+def test_render_that_raced_an_invalidation_is_not_stored():
+    cache = FragmentCache(maxsize=10, ttl=0)
+    version = cache.version
+    cache.invalidate_question(1)  # 렌더링 도중 다른 요청이 질문 1을 수정
+    cache.set(("question", 1), ("old", "<p>old</p>"), version)
+    assert cache.get(("question", 1)) is None
+
+
+def test_lru_and_ttl_bound_the_cache(monkeypatch):
+    cache = FragmentCache(maxsize=2, ttl=60)
+    for question_id in (1, 2, 3):
+        cache.set(("question", question_id), ("t", "h"), cache.version)
+    assert cache.get(("question", 1)) is None
+    assert cache.get(("question", 3)) is not None
+
+    import fragment_cache as module
+    now = module.time.monotonic()
+    monkeypatch.setattr(module.time, "monotonic", lambda: now + 61)
+    assert cache.get(("question", 3)) is None
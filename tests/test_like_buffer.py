@@ -0,0 +1,116 @@
+import os
+
+import pytest
+
+import crud
+import database
+import events
+import models
+from fragment_cache import fragment_cache
+from like_buffer import Journal, LikeBuffer
+
+
+@pytest.fixture
+def buffer(monkeypatch):
+    buffer = LikeBuffer(enabled=True, journal_dir="")
+    monkeypatch.setattr(crud, "like_buffer", buffer)
+    return buffer
+
+
+def likes(question_id, **kwargs):
+    with database.SessionLocal() as db:
+        return crud.get_question_detail(db, question_id, **kwargs).likes_count
+
+
+def test_cached_fragments_do_not_count_this_workers_pending_likes(buffer, question):
+    buffer.add(question.user_id, question.id)
+
+    assert likes(question.id) == 1  # API 응답에는 대기분을 더한다
+    assert likes(question.id, pending=False) == 0  # 워커끼리 같아야 하는 HTML 조각은 DB 값만
+
+
+def test_flush_invalidates_cached_fragments(buffer, question):
+    key = ("question", question.id)
+    buffer.add(question.user_id, question.id)
+    fragment_cache.set(key, ("title", "<p>0 likes</p>"), fragment_cache.version)
+    assert fragment_cache.get(key) is not None  # 대기 중에는 조각을 지우지 않는다 (DB 값이 그대로다)
+
+    with database.SessionLocal() as db:
+        buffer.flush(db)
+
+    assert fragment_cache.get(key) is None
+    assert likes(question.id, pending=False) == 1
+
+
+@pytest.fixture
+def routes_buffer(buffer, monkeypatch):
+    import main
+    from routers import likes
+
+    monkeypatch.setattr(main, "like_buffer", buffer)
+    monkeypatch.setattr(likes, "like_buffer", buffer)
+    return buffer
+
+
+@pytest.fixture
+def published(monkeypatch):
+    deltas = []
+    monkeypatch.setattr(events.hub, "publish", lambda event: deltas.append(event["delta"]))
+    return deltas
+
+
+def stored_likes(question_id):
+    with database.SessionLocal() as db:
+        return db.query(models.Like).filter_by(question_id=question_id).count()
+
+
+def store_like(user_id, question_id):
+    with database.SessionLocal() as db:
+        db.add(models.Like(user_id=user_id, question_id=question_id))
+        db.commit()
+
+
+def test_buffered_like_routes_do_not_read_likes(client, login, question, routes_buffer, sql):
+    login(question.user_id)
+    assert client.post(f"/questions/{question.id}/like").status_code == 200
+    assert client.post(f"/questions/{question.id}/like").status_code == 400  # 버퍼에 대기 중인 중복
+    assert client.get(f"/questions/{question.id}/like", follow_redirects=False).status_code == 302
+    assert not [statement for statement in sql if "FROM likes" in statement]
+    assert routes_buffer.pending_count(question.id) == 1
+
+
+def test_relike_of_a_stored_like_is_skipped_at_flush(buffer, question, published):
+    store_like(question.user_id, question.id)
+    buffer.add(question.user_id, question.id)
+    with database.SessionLocal() as db:
+        buffer.flush(db)
+
+    assert stored_likes(question.id) == 1
+    assert buffer.flushed == 0
+    assert published == [1, -1]  # 대기분으로 센 +1 을 flush 가 되돌린다
+
+
+def test_unlike_after_relike_removes_the_stored_like(buffer, question):
+    store_like(question.user_id, question.id)
+    buffer.add(question.user_id, question.id)
+    assert buffer.discard(question.user_id, question.id)
+    with database.SessionLocal() as db:
+        buffer.flush(db)
+    assert stored_likes(question.id) == 0
+
+
+def test_recovery_applies_unlikes_journaled_before_the_crash(question, tmp_path):
+    crashed = LikeBuffer(enabled=True, journal_dir=str(tmp_path))
+    crashed.journal = Journal(str(tmp_path))
+    crashed.add(question.user_id, question.id)
+    crashed.discard(question.user_id, question.id)
+    # insert 는 commit 됐지만 취소분 delete 전에 죽었다
+    store_like(question.user_id, question.id)
+    crashed.journal._file.close()
+
+    restarted = LikeBuffer(enabled=True, journal_dir=str(tmp_path))
+    restarted.journal = Journal(str(tmp_path))
+    with database.SessionLocal() as db:
+        restarted.recover(db)
+    assert stored_likes(question.id) == 0
+    assert [os.path.basename(path) for path in tmp_path.iterdir()] == [os.path.basename(restarted.journal.path)]
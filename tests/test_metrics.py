@@ -0,0 +1,46 @@
+import pytest
+
+from metrics import Histogram
+from routers import metrics as metrics_routes
+
+
+def test_metrics_are_hidden_without_a_token(client):
+    assert client.get("/metrics").status_code == 404
+
+
+def test_metrics_can_be_opened_explicitly(client, monkeypatch):
+    monkeypatch.setattr(metrics_routes, "METRICS_PUBLIC", True)
+    assert client.get("/metrics").status_code == 200
+
+
+@pytest.mark.parametrize("authorization, status", [
+    ("", 401),
+    ("Bearer wrong", 401),
+    ("Bearer s3cret-but-longer", 401),
+    ("Bearer s3cr\xe9t", 401),  # latin-1 로 풀린 헤더도 500 이 아니라 401
+    ("Bearer s3cret", 200),
+])
+def test_metrics_token(client, monkeypatch, authorization, status):
+    monkeypatch.setattr(metrics_routes, "METRICS_TOKEN", "s3cret")
+    headers = {"Authorization": authorization.encode("latin-1")} if authorization else {}
+    assert client.get("/metrics", headers=headers).status_code == status
+
+
+def test_requests_are_labelled_by_route_pattern(client, question, monkeypatch):
+    monkeypatch.setattr(metrics_routes, "METRICS_PUBLIC", True)
+    client.get(f"/questions/{question.id}")
+    body = client.get("/metrics").text
+    assert 'http_request_duration_seconds_count{method="GET",route="/questions/{question_id}",status="200"}' in body
+    assert f"/questions/{question.id}\"" not in body
+    assert 'db_statements_per_request_count{route="/questions/{question_id}"}' in body
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("h", "help", ("route",), buckets=(1, 5))
+    for value in (0.5, 3, 3, 10):
+        histogram.observe(value, route="r")
+    lines = list(histogram.render())
+    assert 'h_bucket{route="r",le="1"} 1' in lines
+    assert 'h_bucket{route="r",le="5"} 3' in lines
+    assert 'h_bucket{route="r",le="+Inf"} 4' in lines
+    assert 'h_sum{route="r"} 16.5' in lines
@@ -0,0 +1,65 @@
+import pytest
+
+import database
+import models
+
+
+@pytest.fixture
+def question_ids():
+    """같은 초에 만든 질문 5개 (server_default 시각이 모두 같다). 최신순 id 목록."""
+    with database.SessionLocal() as db:
+        user = models.User(username="alice", email="alice@example.com", password_hash="x")
+        db.add(user)
+        db.flush()
+        questions = [models.Question(title=f"q{i}", content="c", user_id=user.id) for i in range(5)]
+        db.add_all(questions)
+        db.commit()
+        return sorted((q.id for q in questions), reverse=True)
+
+
+def walk(client, path, limit):
+    pages = []
+    params = {"limit": limit}
+    for _ in range(10):  # 커서가 앞으로 가지 않으면 무한히 같은 페이지를 돈다
+        response = client.get(path, params=params)
+        assert response.status_code == 200
+        pages.append(response)
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            return pages
+        params = {"limit": limit, "cursor": cursor}
+    raise AssertionError("cursor did not advance")
+
+
+def test_next_cursor_walks_every_row_once(client, question_ids):
+    pages = walk(client, "/questions/", limit=2)
+    assert [[q["id"] for q in page.json()] for page in pages] == [question_ids[0:2], question_ids[2:4], question_ids[4:]]
+
+
+def test_prev_cursor_returns_the_previous_page(client, question_ids):
+    pages = walk(client, "/questions/", limit=2)
+    for page, previous in zip(pages[1:], pages):
+        back = client.get("/questions/", params={"limit": 2, "cursor": page.headers["x-prev-cursor"]})
+        assert back.json() == previous.json()
+    assert "x-prev-cursor" not in pages[0].headers
+
+
+def test_rows_inserted_with_an_explicit_time_page_with_server_defaults(client, question_ids):
+    # bulk_import 처럼 created_at 을 직접 넣은 행도 같은 형식으로 저장되어 순서가 섞이지 않는다
+    with database.SessionLocal() as db:
+        newest = db.get(models.Question, question_ids[0])
+        created_at, user_id = newest.created_at, newest.user_id
+        extra = models.Question(title="explicit", content="c", user_id=user_id, created_at=created_at.replace(microsecond=0))
+        db.add(extra)
+        db.commit()
+        extra_id = extra.id
+
+    ids = [q["id"] for page in walk(client, "/questions/", limit=2) for q in page.json()]
+    assert ids == [extra_id] + question_ids
+
+
+def test_html_index_pages_with_the_same_cursor(client, question_ids):
+    first = client.get("/", params={"limit": 2})
+    assert first.status_code == 200
+    assert f"/questions/{question_ids[0]}" in first.text
+    assert f"/questions/{question_ids[2]}" not in first.text
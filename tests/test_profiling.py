@@ -0,0 +1,36 @@
+import pytest
+
+import profiling
+from profiling import sign_profile_token, verify_profile_token
+
+
+def test_valid_token_is_accepted():
+    assert verify_profile_token(sign_profile_token(60, "secret"), "secret")
+
+
+def test_expired_or_tampered_token_is_rejected():
+    assert verify_profile_token(sign_profile_token(-1, "secret"), "secret") is False
+    assert verify_profile_token(sign_profile_token(60, "other"), "secret") is False
+
+
+def test_non_ascii_token_is_rejected_instead_of_raising():
+    # 미들웨어는 X-Profile 헤더를 latin-1 로 풀어서 넘긴다
+    assert verify_profile_token(b"1.\xe9".decode("latin-1"), "secret") is False
+    assert verify_profile_token("²." + "0" * 64, "secret") is False
+
+
+@pytest.mark.parametrize("authorization, status", [
+    (None, 401),
+    ("Bearer nope", 401),
+    ("Bearer adm\xefn", 401),
+    ("Bearer admin-token", 200),
+])
+def test_admin_token(client, monkeypatch, authorization, status):
+    monkeypatch.setattr(profiling, "PROFILE_ADMIN_TOKEN", "admin-token")
+    headers = {"Authorization": authorization.encode("latin-1")} if authorization else {}
+    assert client.get("/admin/profiles", headers=headers).status_code == status
+
+
+def test_profiles_are_hidden_without_an_admin_token(client, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_ADMIN_TOKEN", "")
+    assert client.get("/admin/profiles", headers={"Authorization": "Bearer "}).status_code == 404
@@ -0,0 +1,74 @@
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+import database
+import models
+import query_budget
+from auth.tokens import create_access_token
+from query_budget import QueryBudgetExceeded, QueryBudgetMiddleware
+
+
+@pytest.fixture
+def forum():
+    """작성자 3명이 서로 질문/답변/좋아요를 남긴 데이터. 첫 번째 작성자 id 를 돌려준다."""
+    with database.SessionLocal() as db:
+        users = [models.User(username=f"u{i}", email=f"u{i}@example.com", password_hash="x") for i in range(3)]
+        db.add_all(users)
+        db.flush()
+        for i in range(6):
+            author = users[i % 3]
+            question = models.Question(title=f"q{i}", content="c", user_id=author.id)
+            question.answers = [models.Answer(content=f"a{j}", user_id=user.id) for j, user in enumerate(users)]
+            question.likes = [models.Like(user_id=user.id) for user in users if user is not author]
+            db.add(question)
+        db.commit()
+        return users[0].id
+
+
+@pytest.mark.parametrize("path", [
+    "/",
+    "/questions/",
+    "/questions/1",
+    "/questions/1/answers/",
+    "/users/me/questions",
+    "/users/me/answers",
+    "/my/questions",
+    "/my/answers",
+])
+def test_pages_stay_within_their_budget(client, forum, path):
+    # conftest 가 QUERY_BUDGET_ENFORCE=1 로 두므로, 작성자/답변/좋아요를 행마다 읽으면 예외가 난다
+    client.cookies.set("access_token", create_access_token(data={"sub": str(forum)}))
+    assert client.get(path).status_code == 200
+
+
+def budget_app(limit):
+    app = FastAPI()
+    app.add_middleware(QueryBudgetMiddleware)
+
+    @app.get("/", dependencies=[query_budget.query_budget(limit)])
+    def two_queries():
+        with database.engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+        return {}
+
+    return TestClient(app)
+
+
+def test_overrun_raises_when_enforced():
+    query_budget.instrument(database.engine)
+    assert budget_app(2).get("/").status_code == 200
+    with pytest.raises(QueryBudgetExceeded, match="ran 2 SQL statements"):
+        budget_app(1).get("/")
+
+
+def test_overrun_only_logs_when_not_enforced(monkeypatch, caplog):
+    query_budget.instrument(database.engine)
+    monkeypatch.setattr(query_budget, "enforce", False)
+    with caplog.at_level(logging.WARNING, logger="query_budget"):
+        assert budget_app(1).get("/").status_code == 200
+    assert "budget 1" in caplog.text
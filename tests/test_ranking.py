@@ -0,0 +1,54 @@
+import database
+import models
+from crud import create_like
+from ranking import HotScoreRefresher, hot_score
+
+
+def score(question_id):
+    with database.SessionLocal() as db:
+        return db.get(models.Question, question_id).hot_score
+
+
+def test_like_is_scored_by_the_batch_refresh_not_the_request(question, monkeypatch):
+    import crud
+
+    refresher = HotScoreRefresher()
+    monkeypatch.setattr(crud, "hot_scores", refresher)
+    before = score(question.id)
+
+    with database.SessionLocal() as db:
+        create_like(db, user_id=question.user_id, question_id=question.id)
+    assert score(question.id) == before  # 요청은 질문 행을 UPDATE 하지 않는다
+
+    with database.SessionLocal() as db:
+        assert refresher.refresh(db) == 1
+    assert score(question.id) == hot_score(1, 0, question.created_at)
+
+
+def test_refresh_leaves_the_edit_time_alone(question):
+    refresher = HotScoreRefresher()
+    refresher.mark([question.id])
+    with database.SessionLocal() as db:
+        db.get(models.Question, question.id).title = "edited"
+        db.commit()
+        edited_at = db.get(models.Question, question.id).updated_at
+
+        refresher.refresh(db)
+        db.expire_all()
+        row = db.get(models.Question, question.id)
+    assert row.title == "edited"
+    assert row.updated_at == edited_at
+
+
+def test_cursor_from_another_sort_is_rejected(client, question):
+    with database.SessionLocal() as db:
+        for i in range(3):
+            db.add(models.Question(title=f"q{i}", content="c", user_id=question.user_id))
+        db.commit()
+
+    new_cursor = client.get("/questions/", params={"limit": 1, "sort": "new"}).headers["x-next-cursor"]
+    assert client.get("/questions/", params={"limit": 1, "sort": "new", "cursor": new_cursor}).status_code == 200
+
+    response = client.get("/questions/", params={"limit": 1, "sort": "hot", "cursor": new_cursor})
+    assert response.status_code == 400
+    assert client.get("/", params={"limit": 1, "sort": "hot", "cursor": new_cursor}).status_code == 400
@@ -0,0 +1,98 @@
+import os
+import shutil
+
+import pytest
+
+import database
+import models
+from database import DB_PRIMARY_PIN_COOKIE, ReplicaSet, replicas
+from fragment_cache import fragment_cache
+
+# conftest.py 가 primary.sqlite 와 replica.sqlite 두 파일을 만든다.
+# 복제는 흉내 내지 않는다. 복제본에는 같은 id 의 질문을 다른 제목으로 넣어서, 응답으로 어느 DB 를 읽었는지 구분한다.
+
+
+@pytest.fixture
+def replica():
+    replica = replicas.replicas[0]
+    replica.healthy = True
+    return replica
+
+
+@pytest.fixture
+def question(replica):
+    for eng, title in ((database.engine, "from primary"), (replica.engine, "from replica")):
+        with database.Session(bind=eng) as db:
+            db.add(models.User(id=1, username="alice", email="alice@example.com", password_hash="x"))
+            db.add(models.Question(id=1, title=title, content="body", user_id=1))
+            db.commit()
+    fragment_cache.clear()
+    return 1
+
+
+def test_get_reads_from_the_replica(client, question):
+    assert client.get(f"/questions/{question}").json()["title"] == "from replica"
+
+
+def test_write_reads_primary_and_pins_the_browser(client, login, question):
+    login(question)
+    response = client.post(f"/questions/{question}/like")
+    assert response.status_code == 200
+    assert DB_PRIMARY_PIN_COOKIE in response.cookies
+
+    # 쿠키가 있는 동안의 GET 은 primary 에서 읽는다
+    assert client.get(f"/questions/{question}").json()["title"] == "from primary"
+    client.cookies.delete(DB_PRIMARY_PIN_COOKIE)
+    assert client.get(f"/questions/{question}").json()["title"] == "from replica"
+
+
+def test_plain_get_does_not_pin(client, question):
+    response = client.get(f"/questions/{question}")
+    assert DB_PRIMARY_PIN_COOKIE not in response.cookies
+
+
+def test_failed_health_check_routes_reads_to_primary(client, question, replica):
+    path = replica.engine.url.database
+    replica.engine.dispose()
+    shutil.move(path, path + ".down")
+    os.mkdir(path)  # 열 수 없는 DB 파일
+    try:
+        replicas.check()
+        assert replica.healthy is False
+        assert client.get(f"/questions/{question}").json()["title"] == "from primary"
+    finally:
+        os.rmdir(path)
+        shutil.move(path + ".down", path)
+
+    replicas.check()
+    assert replica.healthy is True
+    assert client.get(f"/questions/{question}").json()["title"] == "from replica"
+
+
+def test_html_fragments_are_filled_from_primary_only(client, page, login, question):
+    login(question)
+    response = page(f"/questions/{question}")
+    assert "from primary" in response.text
+    assert fragment_cache.get(("question", question))[0] == "from primary"
+
+
+def test_pinned_browser_skips_the_fragment_cache(client, page, login, question):
+    login(question)
+    fragment_cache.set(("question", question), ("stale title", "<p>stale</p>"), fragment_cache.version)
+    assert "stale title" in page(f"/questions/{question}").text
+
+    client.cookies.set(DB_PRIMARY_PIN_COOKIE, "1")
+    assert "from primary" in page(f"/questions/{question}").text
+
+
+def test_weighted_round_robin(tmp_path):
+    urls = [f"sqlite:///{tmp_path}/a.sqlite", f"sqlite:///{tmp_path}/b.sqlite"]
+    replica_set = ReplicaSet(urls, [3, 1])
+    picks = [replica_set.choose().engine.url.database for _ in range(8)]
+    assert picks.count(f"{tmp_path}/a.sqlite") == 6
+    assert picks.count(f"{tmp_path}/b.sqlite") == 2
+
+    replica_set.replicas[0].healthy = False
+    assert {replica_set.choose().engine.url.database for _ in range(4)} == {f"{tmp_path}/b.sqlite"}
+    replica_set.replicas[1].healthy = False
+    assert replica_set.choose() is None
@@ -0,0 +1,96 @@
+import pytest
+from sqlalchemy import inspect
+
+import database
+import models
+import search
+
+
+@pytest.fixture
+def author():
+    with database.SessionLocal() as db:
+        user = models.User(username="alice", email="alice@example.com", password_hash="x")
+        db.add(user)
+        db.commit()
+        return user.id
+
+
+def add_question(author, title, content="", answers=()):
+    with database.SessionLocal() as db:
+        question = models.Question(title=title, content=content, user_id=author)
+        question.answers = [models.Answer(content=text, user_id=author) for text in answers]
+        db.add(question)
+        db.commit()
+        return question.id
+
+
+def ids(client, q, **params):
+    response = client.get("/questions/search", params={"q": q, **params})
+    assert response.status_code == 200
+    return [item["id"] for item in response.json()]
+
+
+def test_title_outranks_content_outranks_answers(client, author):
+    in_answer = add_question(author, "other", answers=["postgres tuning"])
+    in_content = add_question(author, "other", content="postgres tuning")
+    in_title = add_question(author, "postgres tuning")
+    add_question(author, "unrelated", content="nothing here")
+
+    assert ids(client, "postgres") == [in_title, in_content, in_answer]
+
+
+def test_terms_may_match_across_the_question_and_its_answers(client, author):
+    split = add_question(author, "slow query", answers=["add an index"])
+    add_question(author, "slow page")
+
+    assert ids(client, "slow index") == [split]
+
+
+def test_index_follows_writes(client, author):
+    question_id = add_question(author, "before")
+    assert ids(client, "before") == [question_id]
+
+    with database.SessionLocal() as db:
+        question = db.get(models.Question, question_id)
+        question.title = "after"
+        db.add(models.Answer(content="reply", question_id=question_id, user_id=author))
+        db.commit()
+    assert ids(client, "before") == []
+    assert ids(client, "after") == [question_id]
+    assert ids(client, "reply") == [question_id]
+
+    with database.SessionLocal() as db:
+        db.delete(db.get(models.Question, question_id))
+        db.commit()
+    assert ids(client, "after") == []
+
+
+def test_cursor_walks_the_ranking(client, author):
+    expected = sorted((add_question(author, f"topic {i}") for i in range(5)), reverse=True)
+
+    seen = []
+    params = {"limit": 2}
+    for _ in range(5):
+        response = client.get("/questions/search", params={"q": "topic", **params})
+        seen += [item["id"] for item in response.json()]
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+        params = {"limit": 2, "cursor": cursor}
+    assert seen == expected
+
+
+def test_only_the_newest_matches_are_ranked(client, author, monkeypatch):
+    monkeypatch.setattr(search, "SEARCH_MAX_CANDIDATES", 2)
+    oldest = add_question(author, "cache cache cache")  # 점수는 가장 높지만 후보 밖이다
+    middle = add_question(author, "cache")
+    newest = add_question(author, "cache", content="cache")
+
+    assert ids(client, "cache") == [newest, middle]
+    assert oldest not in ids(client, "cache")
+
+
+def test_gin_index_is_postgres_only():
+    names = {index["name"] for index in inspect(database.engine).get_indexes("questions")}
+    assert "ix_questions_search_vector" not in names
+    assert "ix_questions_created_at_id" in names
@@ -0,0 +1,27 @@
+def _question_select(statements):
+    return [s for s in statements if s.lstrip().upper().startswith("SELECT") and "FROM questions" in s]
+
+
+def test_question_fields_skip_author_and_content(client, question, sql):
+    response = client.get(f"/questions/{question.id}?fields=title")
+    assert response.status_code == 200
+    assert response.json() == {"id": question.id, "title": "first question"}
+    selects = _question_select(sql)
+    assert selects
+    assert not any("questions.content" in s or "JOIN users" in s for s in selects)
+
+
+def test_search_fields_skip_author_and_content(client, question, sql):
+    client.get("/questions/search?q=first")  # 역색인 만들기
+    sql.clear()
+
+    response = client.get("/questions/search?q=first&fields=title,likes_count")
+    assert response.status_code == 200
+    assert response.json() == [{"id": question.id, "title": "first question", "likes_count": 0}]
+    selects = _question_select(sql)
+    assert selects
+    assert not any("questions.content" in s or "JOIN users" in s for s in selects)
+
+    full = client.get("/questions/search?q=first").json()
+    assert full[0]["user"]["username"] == "alice"
+    assert full[0]["content"].startswith("body")
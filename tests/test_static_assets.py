@@ -0,0 +1,85 @@
+import gzip
+
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+
+import static_assets
+from static_assets import CachedStaticFiles, build, load_manifest
+
+
+@pytest.fixture
+def built(tmp_path):
+    src, out = tmp_path / "src", tmp_path / "out"
+    (src / "css").mkdir(parents=True)
+    (src / "css" / "site.css").write_text("body { color: black; }\n" * 50)
+    (src / "logo.png").write_bytes(b"\x89PNG" + bytes(200))
+    manifest = build(str(src), str(out))
+    return out, manifest
+
+
+@pytest.fixture
+def static_client(built):
+    out, manifest = built
+    app = Starlette(routes=[Mount("/static", CachedStaticFiles(directory=str(out), manifest=manifest))])
+    return TestClient(app), manifest
+
+
+def test_build_fingerprints_and_precompresses(built):
+    out, manifest = built
+    hashed = manifest["css/site.css"]
+    assert hashed.startswith("css/site.") and hashed.endswith(".css") and hashed != "css/site.css"
+    assert load_manifest(str(out)) == manifest
+    assert gzip.decompress((out / (hashed + ".gz")).read_bytes()) == (out / hashed).read_bytes()
+    assert not (out / (manifest["logo.png"] + ".gz")).exists()  # 이미 압축된 형식
+
+
+def test_static_url_uses_the_manifest(monkeypatch):
+    monkeypatch.setattr(static_assets, "manifest", {"css/style.css": "css/style.0123456789.css"})
+    assert static_assets.static_url("css/style.css") == "/static/css/style.0123456789.css"
+    assert static_assets.static_url("js/unbuilt.js") == "/static/js/unbuilt.js"
+
+
+def test_hashed_paths_are_immutable_and_originals_revalidate(static_client):
+    client, manifest = static_client
+    hashed = client.get(f"/static/{manifest['css/site.css']}")
+    assert hashed.headers["cache-control"] == static_assets.IMMUTABLE_CACHE_CONTROL
+    original = client.get("/static/css/site.css")
+    assert original.headers["cache-control"] == static_assets.REVALIDATE_CACHE_CONTROL
+    assert client.get("/static/css/site.css", headers={"If-None-Match": original.headers["etag"]}).status_code == 304
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ("gzip, deflate", "gzip"),
+    ("GZIP;q=0.5", "gzip"),
+    ("*", "gzip"),
+    ("identity", None),
+    ("gzip;q=0", None),
+    ("*;q=0", None),
+    ("xgzip", None),  # 부분 문자열이 아니라 토큰으로 비교한다
+    ("", None),
+])
+def test_precompressed_file_follows_accept_encoding(static_client, accept_encoding, expected):
+    client, manifest = static_client
+    response = client.get(f"/static/{manifest['css/site.css']}", headers={"Accept-Encoding": accept_encoding})
+    assert response.headers.get("content-encoding") == expected
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.text.startswith("body { color: black; }")  # httpx 가 gzip 을 풀어 준다
+
+
+def test_brotli_is_preferred_unless_refused(static_client, built):
+    client, manifest = static_client
+    out, _ = built
+    hashed = manifest["css/site.css"]
+    app = client.app.routes[0].app
+    app.encoded.add(str(out.resolve() / hashed) + ".br")
+    (out / (hashed + ".br")).write_bytes(b"brotli bytes")
+
+    def encoding(header):
+        full_path = str(out.resolve() / hashed)
+        return app._pick_encoding(full_path, {"type": "http", "headers": [(b"accept-encoding", header.encode())]})[0]
+
+    assert encoding("gzip, br") == "br"
+    assert encoding("br;q=0, gzip") == "gzip"
+    assert encoding("br;q=0.4, gzip;q=0.8") == "gzip"
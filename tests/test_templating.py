@@ -0,0 +1,43 @@
+import pytest
+
+import templating
+from templating import create_environment, warmup
+
+
+def template_names():
+    return create_environment(cache_dir="").list_templates(extensions=["html"])
+
+
+def test_warmup_loads_every_template():
+    env = create_environment(cache_dir="")
+    assert warmup(env) == len(template_names())
+    assert len(env.cache) == len(template_names())
+
+
+def test_bytecode_cache_is_shared_between_environments(tmp_path):
+    first = create_environment(cache_dir=str(tmp_path))
+    warmup(first)
+    assert len(list(tmp_path.iterdir())) == len(template_names())
+
+    # 같은 캐시 디렉터리를 쓰는 다른 워커는 템플릿을 다시 컴파일하지 않는다
+    second = create_environment(cache_dir=str(tmp_path))
+
+    def compile(*args, **kwargs):
+        raise AssertionError("template compiled despite the bytecode cache")
+
+    second.compile = compile
+    assert warmup(second) == len(template_names())
+    assert second.get_template("login.html").render(request=None)
+
+
+def test_templates_are_not_reloaded_by_default():
+    assert templating.TEMPLATE_AUTO_RELOAD is False
+    assert create_environment(cache_dir="").auto_reload is False
+
+
+@pytest.mark.parametrize("path", ["/form-login", "/form-signup"])
+def test_pages_render_without_deprecated_template_calls(client, recwarn, path):
+    response = client.get(path)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/html")
+    assert not [warning for warning in recwarn if "TemplateResponse" in str(warning.message)]
@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import crud
+import database
+from auth import tokens
+from models import RevokedToken
+from auth.tokens import InvalidToken, RevocationList, TokenVerifier
+
+
+def test_replace_keeps_jtis_revoked_during_refresh(monkeypatch):
+    revocations = RevocationList()
+
+    def get_revoked_jtis(db):
+        # DB 를 읽은 뒤, 목록을 바꾸기 전에 이 워커에서 로그아웃이 일어난다
+        revocations.add("late")
+        return ["old"]
+
+    monkeypatch.setattr(crud, "get_revoked_jtis", get_revoked_jtis)
+    revocations.refresh(None)
+    assert revocations.is_revoked("old")
+    assert revocations.is_revoked("late")
+
+    # 다음 갱신은 DB 목록을 그대로 쓴다
+    monkeypatch.setattr(crud, "get_revoked_jtis", lambda db: ["old"])
+    revocations.refresh(None)
+    assert not revocations.is_revoked("late")
+
+
+def test_revoked_token_is_rejected(monkeypatch):
+    monkeypatch.setattr(tokens, "revocations", RevocationList())
+    monkeypatch.setattr(tokens, "verifier", TokenVerifier())
+    token = tokens.create_access_token({"sub": "alice@example.com"})
+    assert tokens.verifier.verify(token)["sub"] == "alice@example.com"
+    with database.SessionLocal() as db:
+        assert tokens.revoke(db, token)
+    with pytest.raises(InvalidToken):
+        tokens.verifier.verify(token)
+
+
+def test_cached_token_is_rejected_after_its_key_is_removed():
+    keys = {"old": "old-secret", "new": "new-secret"}
+    verifier = TokenVerifier(keys=keys)
+    token = tokens.jwt.encode({"sub": "alice@example.com"}, "old-secret", algorithm=tokens.ALGORITHM,
+                              headers={"kid": "old"})
+    assert verifier.verify(token)["sub"] == "alice@example.com"
+    assert verifier.verify(token)["sub"] == "alice@example.com"
+    assert verifier.hits == 1
+
+    del keys["old"]
+    with pytest.raises(InvalidToken):
+        verifier.verify(token)
+    with pytest.raises(InvalidToken):
+        verifier.verify(token)
+
+
+def test_refresh_only_reads_and_logout_purges_expired_rows(sql):
+    now = datetime.utcnow()
+    with database.SessionLocal() as db:
+        db.add_all([
+            RevokedToken(jti="expired", expires_at=now - timedelta(minutes=1)),
+            RevokedToken(jti="live", expires_at=now + timedelta(minutes=1)),
+        ])
+        db.commit()
+
+        sql.clear()
+        assert crud.get_revoked_jtis(db) == ["live"]
+        assert all(statement.lstrip().upper().startswith("SELECT") for statement in sql)
+
+        crud.revoke_token(db, "new", now + timedelta(minutes=1))
+        assert sorted(jti for (jti,) in db.query(RevokedToken.jti)) == ["live", "new"]
@@ -0,0 +1,110 @@
+import time
+
+import pytest
+
+import database
+import models
+from auth import user_cache as user_cache_module
+from auth.user_cache import MemoryBackend, RedisBackend, UserCache
+from tests.fake_redis import FakeRedis
+
+
+def wait_until(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.fixture
+def redis():
+    return FakeRedis()
+
+
+@pytest.fixture
+def workers(redis, monkeypatch):
+    """같은 Redis 를 쓰는 워커 두 개. 앱 쪽 리스너는 첫 번째 워커의 캐시를 쓴다."""
+    caches = [UserCache(MemoryBackend(), RedisBackend(redis)) for _ in range(2)]
+    for cache in caches:
+        cache.start()
+    monkeypatch.setattr(user_cache_module, "user_cache", caches[0])
+    yield caches
+    for cache in caches:
+        cache.stop()
+
+
+@pytest.fixture
+def user():
+    with database.SessionLocal() as db:
+        user = models.User(username="alice", email="alice@example.com", password_hash="x")
+        db.add(user)
+        db.commit()
+        return user
+
+
+def cached_everywhere(workers, redis, user_id):
+    for cache in workers:
+        cache.put(models.User(id=user_id, username="alice", email="alice@example.com"))
+    assert all(cache.local.get(str(user_id)) is not None for cache in workers)
+    assert redis.get(f"qna:user:{user_id}") is not None
+
+
+def evicted_everywhere(workers, redis, user_id):
+    return (
+        redis.get(f"qna:user:{user_id}") is None
+        and all(cache.local.get(str(user_id)) is None for cache in workers)
+    )
+
+
+def test_update_evicts_shared_and_every_local_cache(workers, redis, user):
+    cached_everywhere(workers, redis, user.id)
+
+    with database.SessionLocal() as db:
+        db.get(models.User, user.id).username = "alice2"
+        db.commit()
+
+    assert wait_until(lambda: evicted_everywhere(workers, redis, user.id))
+    assert workers[1].get(user.id) is None
+
+
+def test_delete_evicts_shared_and_every_local_cache(workers, redis, user):
+    cached_everywhere(workers, redis, user.id)
+
+    with database.SessionLocal() as db:
+        db.delete(db.get(models.User, user.id))
+        db.commit()
+
+    assert wait_until(lambda: evicted_everywhere(workers, redis, user.id))
+
+
+def test_entry_cached_before_commit_is_evicted_again_after_commit(workers, redis, user):
+    with database.SessionLocal() as db:
+        db.get(models.User, user.id).username = "alice2"
+        db.flush()
+        # flush 와 commit 사이에 다른 요청이 옛 값을 다시 캐시한 경우
+        cached_everywhere(workers, redis, user.id)
+        db.commit()
+
+    assert wait_until(lambda: evicted_everywhere(workers, redis, user.id))
+
+
+def test_resubscribe_clears_local_cache(redis):
+    class FlakyRedis(FakeRedis):
+        failures = 1
+
+        def pubsub(self, ignore_subscribe_messages=False):
+            if self.failures:
+                self.failures -= 1
+                raise ConnectionError("redis is down")
+            return super().pubsub(ignore_subscribe_messages)
+
+    cache = UserCache(MemoryBackend(), RedisBackend(FlakyRedis()))
+    cache.local.set("1", {"id": 1, "username": "alice", "email": "alice@example.com"})
+    cache.start()
+    try:
+        # 구독이 끊긴 동안 놓친 무효화가 있을 수 있으므로 다시 구독하면 프로세스 캐시를 비운다
+        assert wait_until(lambda: cache.local.get("1") is None)
+    finally:
+        cache.stop()